@@ -0,0 +1,116 @@
+"""Benchmark scanning a (synthetic) CVMFS images directory for an image's tags.
+
+Compares the old `Path.glob` scan with `scan_image_tags` (one `os.scandir`
+pass), then times `CVMFSRegistryTools` resolution with & without its index.
+
+Usage:
+    python benchmarks/container_registry_tools_benchmark.py [--n-entries N] [--repeat R]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from wipac_dev_tools.container_registry_tools import (
+    CVMFSRegistryTools,
+    scan_image_tags,
+)
+
+IMAGE_NAME = "skymap_scanner"
+OTHER_IMAGES = ["realtime_tools", "skymap_scanner_dev", "icetray", "pisa"]
+
+
+def make_images_dir(root: Path, n_entries: int) -> None:
+    """Make `n_entries` image directories; 1/5 are the image, mostly 'X.Y.Z' tags."""
+    for i in range(n_entries):
+        name = IMAGE_NAME if i % 5 == 0 else OTHER_IMAGES[i % len(OTHER_IMAGES)]
+        tag = f"{i % 7}.{i % 13}.{i}" if i % 10 else f"test-{i}"
+        (root / f"{name}:{tag}").mkdir()
+
+
+def glob_image_tags(images_dir: Path, image_name: str) -> list[str]:
+    """The scan from before `scan_image_tags`."""
+    return [
+        p.name.split(":", maxsplit=1)[1]
+        for p in images_dir.glob(f"{image_name}:*")
+        if ":" in p.name
+    ]
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """Get the best wall time (seconds) of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(title: str, results: dict[str, float]) -> None:
+    """Print the time per call, with each relative to the first."""
+    print(f"\n{title}")
+    baseline = next(iter(results.values()))
+    for name, secs in results.items():
+        print(f"  {name:<36} {secs * 1e3:>9.3f} ms  ({secs / baseline:>6.3f}x)")
+
+
+def run(images_dir: Path, repeat: int) -> None:
+    """Run each benchmark and report."""
+    if sorted(glob_image_tags(images_dir, IMAGE_NAME)) != sorted(
+        scan_image_tags(images_dir, IMAGE_NAME)
+    ):
+        raise RuntimeError("the scans found different tags")
+    report(
+        "scan",
+        {
+            "Path.glob": timed(lambda: glob_image_tags(images_dir, IMAGE_NAME), repeat),
+            "scan_image_tags (os.scandir)": timed(
+                lambda: scan_image_tags(images_dir, IMAGE_NAME), repeat
+            ),
+        },
+    )
+
+    source_tags = ["latest", "3", "4.1", "5.12", "2.3.12", "test-0", "nope"]
+    uncached = CVMFSRegistryTools(images_dir, IMAGE_NAME, index_ttl=0)
+    cached = CVMFSRegistryTools(images_dir, IMAGE_NAME)
+    cached.resolve_tag("latest")  # warm the index
+
+    def resolve_each(tools: CVMFSRegistryTools) -> None:
+        for tag in source_tags:
+            try:
+                tools.resolve_tag(tag)
+            except Exception:
+                pass
+
+    report(
+        f"resolve {len(source_tags)} tags",
+        {
+            "resolve_tag, no index (ttl=0)": timed(
+                lambda: resolve_each(uncached), repeat
+            ),
+            "resolve_tag, indexed": timed(lambda: resolve_each(cached), repeat),
+            "resolve_tags (one scan)": timed(
+                lambda: uncached.resolve_tags(source_tags), repeat
+            ),
+        },
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-entries", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images_dir = Path(tmp)
+        print(f"making {args.n_entries} entries in {images_dir}...")
+        make_images_dir(images_dir, args.n_entries)
+        run(images_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Benchmark `MongoJSONSchemaValidatedCollection`'s overhead, without a live MongoDB.
+
+Each operation is timed against a raw `InMemoryAsyncCollection` ("raw") and
+through the wrapper with validation on/off, DEBUG logging on/off, and
+`no_id` on/off -- so the difference is the wrapper's own cost.
+
+Also, per-doc validation is compared with how it was done before compiled
+validators: a `jsonschema.validate` call per doc, which re-checks the schema
+and builds a new validator each time.
+
+Usage (with the 'mongo' & 'jsonschema' extras installed):
+    python benchmarks/mongo_jsonschema_tools_benchmark.py [--n-docs N] [--repeat R]
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+import jsonschema
+
+from wipac_dev_tools.mongo_inmemory_tools import InMemoryAsyncCollection
+from wipac_dev_tools.mongo_jsonschema_tools import (
+    MongoJSONSchemaValidatedCollection,
+    ValidationMode,
+    _convert_mongo_to_jsonschema,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "uuid": {"type": "string"},
+        "n": {"type": "integer", "minimum": 0},
+        "status": {"enum": ["new", "running", "done"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "meta": {
+            "type": "object",
+            "properties": {
+                "host": {"type": "string"},
+                "cpus": {"type": "integer"},
+            },
+            "required": ["host"],
+        },
+    },
+    "required": ["uuid", "n", "status"],
+}
+
+LOGGER = logging.getLogger("benchmark")
+
+
+def make_docs(n_docs: int) -> list[dict]:
+    """Make `n_docs` schema-valid docs."""
+    return [
+        {
+            "uuid": f"{i:08x}",
+            "n": i,
+            "status": "new",
+            "tags": ["a", "b", "c"],
+            "meta": {"host": f"node{i % 17}", "cpus": i % 8 + 1},
+        }
+        for i in range(n_docs)
+    ]
+
+
+def make_wrapper(
+    coll: InMemoryAsyncCollection,
+    validation_mode: ValidationMode,
+) -> MongoJSONSchemaValidatedCollection:
+    """Wrap the in-memory collection."""
+    return MongoJSONSchemaValidatedCollection(
+        coll,
+        SCHEMA,
+        parent_logger=LOGGER,
+        validation_mode=validation_mode,
+    )
+
+
+async def timed(func: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """Get the best wall time (seconds) of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def bench_inserts(docs: list[dict], repeat: int) -> dict[str, float]:
+    """Time `insert_many` for each config; each run uses a fresh collection."""
+
+    async def raw() -> None:
+        await InMemoryAsyncCollection("raw").insert_many(copy.deepcopy(docs))
+
+    def wrapped(mode: ValidationMode) -> Callable[[], Awaitable[Any]]:
+        async def func() -> None:
+            coll = make_wrapper(InMemoryAsyncCollection("wrapped"), mode)
+            await coll.insert_many(copy.deepcopy(docs))
+
+        return func
+
+    return {
+        "raw": await timed(raw, repeat),
+        "wrapped, no validation": await timed(wrapped(ValidationMode.NEVER), repeat),
+        "wrapped, 10% sampled": await timed(
+            wrapped(ValidationMode.sampled(0.1)), repeat
+        ),
+        "wrapped, validated": await timed(wrapped(ValidationMode.ALWAYS), repeat),
+    }
+
+
+async def bench_reads(docs: list[dict], repeat: int) -> dict[str, float]:
+    """Time reading back every doc for each config."""
+    raw_coll = InMemoryAsyncCollection("reads")
+    await raw_coll.insert_many(copy.deepcopy(docs))
+    coll = make_wrapper(raw_coll, ValidationMode.ALWAYS)
+
+    async def raw() -> None:
+        async for _ in raw_coll.find({}, {}):
+            pass
+
+    async def find_all(no_id: bool) -> None:
+        async for _ in coll.find_all({}, {}, no_id=no_id):
+            pass
+
+    async def find_all_batches() -> None:
+        async for _ in coll.find_all_batches({}, {}):
+            pass
+
+    results = {
+        "raw": await timed(raw, repeat),
+        "find_all, keep _id": await timed(lambda: find_all(False), repeat),
+        "find_all, no_id": await timed(lambda: find_all(True), repeat),
+        "find_all_batches, no_id": await timed(find_all_batches, repeat),
+    }
+    LOGGER.setLevel(logging.DEBUG)
+    try:
+        results["find_all, no_id, DEBUG"] = await timed(lambda: find_all(True), repeat)
+    finally:
+        LOGGER.setLevel(logging.WARNING)
+    return results
+
+
+async def bench_updates(docs: list[dict], repeat: int) -> dict[str, float]:
+    """Time one `find_one_and_update` per doc (with `$set` & `$inc`)."""
+    raw_coll = InMemoryAsyncCollection("updates")
+    await raw_coll.insert_many(copy.deepcopy(docs))
+    coll = make_wrapper(raw_coll, ValidationMode.ALWAYS)
+    update = {"$set": {"status": "running"}, "$inc": {"n": 1}}
+
+    async def raw() -> None:
+        for doc in docs:
+            await raw_coll.find_one_and_update({"uuid": doc["uuid"]}, update)
+
+    async def wrapped() -> None:
+        for doc in docs:
+            await coll.find_one_and_update({"uuid": doc["uuid"]}, update)
+
+    return {"raw": await timed(raw, repeat), "wrapped": await timed(wrapped, repeat)}
+
+
+async def bench_validation(docs: list[dict], repeat: int) -> dict[str, float]:
+    """Time validating each doc & each '$set' update: `jsonschema.validate` vs compiled."""
+    coll = make_wrapper(InMemoryAsyncCollection("validation"), ValidationMode.ALWAYS)
+    updates = [{"status": "running", "meta.cpus": d["meta"]["cpus"]} for d in docs]
+
+    def validate(objs: list[dict], partial: bool) -> Callable[[], Awaitable[Any]]:
+        async def func() -> None:
+            for obj in objs:
+                jsonschema.validate(*_convert_mongo_to_jsonschema(obj, SCHEMA, partial))
+
+        return func
+
+    def compiled(objs: list[dict], partial: bool) -> Callable[[], Awaitable[Any]]:
+        async def func() -> None:
+            for obj in objs:
+                coll._validate(obj, allow_partial_update=partial)
+
+        return func
+
+    return {
+        "jsonschema.validate": await timed(validate(docs, False), repeat),
+        "compiled": await timed(compiled(docs, False), repeat),
+        "jsonschema.validate, $set": await timed(validate(updates, True), repeat),
+        "compiled, $set": await timed(compiled(updates, True), repeat),
+    }
+
+
+def report(
+    title: str,
+    results: dict[str, float],
+    n_docs: int,
+    baseline_name: str = "raw",
+) -> None:
+    """Print the per-doc times, with each config relative to `baseline_name`."""
+    print(f"\n{title} ({n_docs} docs)")
+    baseline = results[baseline_name]
+    for name, secs in results.items():
+        print(
+            f"  {name:<28} {secs * 1e6 / n_docs:>9.2f} us/doc"
+            f"  ({secs / baseline:>6.2f}x {baseline_name})"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-docs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with open(os.devnull, "w") as devnull:
+        # measure formatting cost, not terminal output
+        LOGGER.addHandler(logging.StreamHandler(devnull))
+        LOGGER.propagate = False
+        await run(args.n_docs, args.repeat)
+
+
+async def run(n_docs: int, repeat: int) -> None:
+    """Run each benchmark and report."""
+
+    docs = make_docs(n_docs)
+    report("insert_many", await bench_inserts(docs, repeat), n_docs)
+    report("reads", await bench_reads(docs, repeat), n_docs)
+    # keep the collection small, so its linear query scan doesn't drown out the wrapper
+    n_updates = min(n_docs, 100)
+    report(
+        "find_one_and_update",
+        await bench_updates(docs[:n_updates], repeat),
+        n_updates,
+    )
+    # the old way is slow, so fewer docs
+    n_validated = min(n_docs, 1_000)
+    report(
+        "validation",
+        await bench_validation(docs[:n_validated], repeat),
+        n_validated,
+        baseline_name="jsonschema.validate",
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
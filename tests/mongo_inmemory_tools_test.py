@@ -0,0 +1,295 @@
+"""Tests for mongo_inmemory_tools.py."""
+
+import logging
+import re
+
+import jsonschema
+import pytest
+from pymongo import DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from wipac_dev_tools.mongo_inmemory_tools import InMemoryAsyncCollection
+from wipac_dev_tools.mongo_jsonschema_tools import (
+    DocumentNotFoundException,
+    MongoJSONSchemaValidatedCollection,
+)
+
+
+@pytest.fixture
+def coll() -> InMemoryAsyncCollection:
+    return InMemoryAsyncCollection("bios")
+
+
+@pytest.fixture
+def bio_coll(coll) -> MongoJSONSchemaValidatedCollection:
+    return MongoJSONSchemaValidatedCollection(
+        collection=coll,
+        collection_jsonschema_spec={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "age": {"type": "integer"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["name", "age"],
+        },
+        parent_logger=logging.getLogger("test_logger"),
+    )
+
+
+async def seed(coll: InMemoryAsyncCollection) -> None:
+    await coll.insert_many(
+        [
+            {"_id": 1, "name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"_id": 2, "name": "bob", "age": 25, "addr": {"city": "madison"}},
+            {"_id": 3, "name": "carol", "age": 35, "tags": ["b"]},
+        ]
+    )
+
+
+########################################################################################
+# InMemoryAsyncCollection
+
+
+async def test_0000__insert_sets_id_and_copies(coll) -> None:
+    doc = {"name": "alice"}
+    res = await coll.insert_one(doc)
+    assert doc["_id"] == res.inserted_id
+
+    doc["name"] = "changed"  # stored doc is a copy
+    assert (await coll.find_one({}))["name"] == "alice"
+
+
+async def test_0001__insert_duplicate_id(coll) -> None:
+    await coll.insert_one({"_id": 1})
+    with pytest.raises(DuplicateKeyError):
+        await coll.insert_one({"_id": 1})
+
+
+@pytest.mark.parametrize(
+    "query, expected_ids",
+    [
+        ({}, [1, 2, 3]),
+        ({"name": "bob"}, [2]),
+        ({"addr.city": "madison"}, [2]),
+        ({"tags": "b"}, [1, 3]),
+        ({"age": {"$gt": 25, "$lte": 35}}, [1, 3]),
+        ({"age": {"$in": [25, 35]}}, [2, 3]),
+        ({"age": {"$nin": [25, 35]}}, [1]),
+        ({"name": {"$ne": "bob"}}, [1, 3]),
+        ({"tags": {"$exists": False}}, [2]),
+        ({"tags": {"$not": {"$exists": True}}}, [2]),
+        ({"addr": {"$not": {"$gte": 30}}}, [1, 2, 3]),  # missing, or not a number
+        ({"$or": [{"name": "alice"}, {"age": 25}]}, [1, 2]),
+        ({"$and": [{"tags": "b"}, {"age": {"$lt": 35}}]}, [1]),
+        ({"$nor": [{"name": "alice"}]}, [2, 3]),
+    ],
+)
+async def test_0010__find_queries(coll, query, expected_ids) -> None:
+    await seed(coll)
+    assert [d["_id"] async for d in coll.find(query)] == expected_ids
+
+
+async def test_0011__find_projection_sort_skip_limit(coll) -> None:
+    await seed(coll)
+    cursor = coll.find({}, {"_id": False, "name": True}, sort=[("age", -1)], skip=1)
+    assert await cursor.to_list(None) == [{"name": "alice"}, {"name": "bob"}]
+
+    cursor = coll.find({}, ["name"], limit=2)
+    assert await cursor.to_list(1) == [{"_id": 1, "name": "alice"}]
+    assert await cursor.to_list(1) == [{"_id": 2, "name": "bob"}]
+    assert await cursor.to_list(1) == []
+
+
+async def test_0012__find_unsupported_operator(coll) -> None:
+    await seed(coll)
+    with pytest.raises(NotImplementedError):
+        coll.find({"name": {"$regex": "^a"}})
+
+
+async def test_0020__update_operators(coll) -> None:
+    await seed(coll)
+    res = await coll.update_one(
+        {"_id": 1},
+        {
+            "$set": {"addr.city": "boston"},
+            "$inc": {"age": 1},
+            "$push": {"tags": {"$each": ["c", "a"]}},
+            "$addToSet": {"more": "x"},
+            "$unset": {"name": ""},
+        },
+    )
+    assert (res.matched_count, res.modified_count) == (1, 1)
+    assert await coll.find_one({"_id": 1}) == {
+        "_id": 1,
+        "age": 31,
+        "tags": ["a", "b", "c", "a"],
+        "addr": {"city": "boston"},
+        "more": ["x"],
+    }
+
+
+async def test_0021__update_many_and_upsert(coll) -> None:
+    await seed(coll)
+    res = await coll.update_many({"tags": "b"}, {"$set": {"age": 30}})
+    assert (res.matched_count, res.modified_count) == (2, 1)
+
+    res = await coll.update_one(
+        {"name": "dave"},
+        {"$set": {"age": 40}, "$setOnInsert": {"tags": []}},
+        upsert=True,
+    )
+    assert res.upserted_id is not None
+    assert await coll.find_one({"name": "dave"}, {"_id": 0}) == {
+        "name": "dave",
+        "age": 40,
+        "tags": [],
+    }
+
+
+async def test_0022__find_one_and_update(coll) -> None:
+    await seed(coll)
+    before = await coll.find_one_and_update({"_id": 2}, {"$inc": {"age": 5}})
+    assert before["age"] == 25
+    after = await coll.find_one_and_update(
+        {"_id": 2},
+        {"$inc": {"age": 5}},
+        return_document=ReturnDocument.AFTER,
+    )
+    assert after["age"] == 35
+    assert await coll.find_one_and_update({"_id": 9}, {"$set": {"age": 1}}) is None
+
+
+async def test_0023__update_array_indexes(coll) -> None:
+    await coll.insert_one(
+        {"_id": 1, "tags": ["a", "b"], "runs": [{"n": 1, "logs": []}, {"n": 2}]}
+    )
+    await coll.update_one(
+        {"_id": 1},
+        {
+            "$set": {"tags.0": "q", "tags.3": "z", "runs.1.status": "done"},
+            "$inc": {"runs.0.n": 10},
+            "$push": {"runs.0.logs": "x"},
+        },
+    )
+    await coll.update_one({"_id": 1}, {"$unset": {"tags.1": ""}})
+    assert await coll.find_one({"_id": 1}) == {
+        "_id": 1,
+        "tags": ["q", None, None, "z"],  # padded, and unset keeps the length
+        "runs": [{"n": 11, "logs": ["x"]}, {"n": 2, "status": "done"}],
+    }
+
+
+@pytest.mark.parametrize("modifier", ["$position", "$slice", "$sort"])
+@pytest.mark.parametrize("operator", ["$push", "$addToSet"])
+async def test_0024__update_push_modifiers_not_implemented(
+    coll, operator, modifier
+) -> None:
+    await seed(coll)
+    update = {operator: {"tags": {"$each": ["c"], modifier: 0}}}
+    with pytest.raises(NotImplementedError, match=re.escape(modifier)):
+        await coll.update_one({"_id": 1}, update)
+
+
+async def test_0030__delete(coll) -> None:
+    await seed(coll)
+    assert (await coll.delete_one({"tags": "b"})).deleted_count == 1
+    assert (await coll.delete_many({})).deleted_count == 2
+    assert await coll.find_one({}) is None
+
+
+async def test_0040__bulk_write(coll) -> None:
+    await seed(coll)
+    res = await coll.bulk_write(
+        [
+            InsertOne({"_id": 4, "name": "dave", "age": 40}),
+            UpdateOne({"_id": 1}, {"$set": {"age": 31}}),
+            ReplaceOne({"_id": 2}, {"name": "bobby", "age": 26}),
+            ReplaceOne({"_id": 5}, {"name": "eve", "age": 50}, upsert=True),
+            DeleteOne({"_id": 3}),
+        ]
+    )
+    assert res.inserted_count == 1
+    assert res.matched_count == 2
+    assert res.modified_count == 2
+    assert res.upserted_count == 1
+    assert res.deleted_count == 1
+    assert await coll.find_one({"_id": 2}) == {"_id": 2, "name": "bobby", "age": 26}
+    assert [d["name"] async for d in coll.find({})] == ["alice", "bobby", "dave", "eve"]
+
+
+async def test_0050__aggregate(coll) -> None:
+    await seed(coll)
+    cursor = await coll.aggregate(
+        [
+            {"$match": {"age": {"$gte": 30}}},
+            {"$sort": {"age": -1}},
+            {"$unset": "tags"},
+            {"$project": {"_id": False}},
+            {"$limit": 1},
+        ]
+    )
+    assert [d async for d in cursor] == [{"name": "carol", "age": 35}]
+
+    with pytest.raises(NotImplementedError):
+        await coll.aggregate([{"$group": {"_id": "$name"}}])
+
+
+########################################################################################
+# through MongoJSONSchemaValidatedCollection
+
+
+async def test_0100__wrapped_insert_and_find(bio_coll, coll) -> None:
+    await bio_coll.insert_one({"name": "alice", "age": 30})
+    await bio_coll.insert_many([{"name": "bob", "age": 25}, {"name": "c", "age": 1}])
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        await bio_coll.insert_one({"name": "bad"})
+
+    assert await bio_coll.find_one({"name": "alice"}) == {"name": "alice", "age": 30}
+    assert [d async for d in bio_coll.find_all({"age": {"$lt": 30}}, [])] == [
+        {"name": "bob", "age": 25},
+        {"name": "c", "age": 1},
+    ]
+    batches = [b async for b in bio_coll.find_all_batches({}, ["name"], batch_size=2)]
+    assert batches == [[{"name": "alice"}, {"name": "bob"}], [{"name": "c"}]]
+    with pytest.raises(DocumentNotFoundException):
+        await bio_coll.find_one({"name": "nobody"})
+
+
+async def test_0101__wrapped_updates(bio_coll) -> None:
+    await bio_coll.insert_many(
+        [{"name": "alice", "age": 30}, {"name": "bob", "age": 25}]
+    )
+
+    doc = await bio_coll.find_one_and_update(
+        {"name": "alice"}, {"$push": {"tags": "x"}}
+    )
+    assert doc == {"name": "alice", "age": 30, "tags": ["x"]}
+    doc = await bio_coll.find_one_and_update(
+        {"name": "alice"}, {"$set": {"tags.0": "q"}}  # array dot-indexing
+    )
+    assert doc == {"name": "alice", "age": 30, "tags": ["q"]}
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        await bio_coll.find_one_and_update({"name": "alice"}, {"$set": {"age": "x"}})
+
+    assert await bio_coll.update_many({}, {"$inc": {"age": 1}}) == 2
+    with pytest.raises(DocumentNotFoundException):
+        await bio_coll.update_many({"name": "nobody"}, {"$set": {"age": 1}})
+
+
+async def test_0102__wrapped_aggregate(bio_coll) -> None:
+    await bio_coll.insert_many(
+        [{"name": "alice", "age": 30}, {"name": "bob", "age": 25}]
+    )
+
+    pipeline = [{"$sort": {"age": 1}}]
+    assert [d async for d in bio_coll.aggregate(pipeline)] == [
+        {"name": "bob", "age": 25},
+        {"name": "alice", "age": 30},
+    ]
+    batches = [b async for b in bio_coll.aggregate_batches(pipeline, batch_size=1)]
+    assert batches == [[{"name": "bob", "age": 25}], [{"name": "alice", "age": 30}]]
+    assert await bio_coll.aggregate_one([{"$match": {"age": 30}}]) == {
+        "name": "alice",
+        "age": 30,
+    }
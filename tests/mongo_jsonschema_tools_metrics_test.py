@@ -0,0 +1,120 @@
+"""Tests for mongo_jsonschema_tools.py's (optional) prometheus metrics."""
+
+import jsonschema
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from prometheus_client import REGISTRY  # noqa: E402
+
+from wipac_dev_tools.mongo_inmemory_tools import InMemoryAsyncCollection  # noqa: E402
+from wipac_dev_tools.mongo_jsonschema_tools import (  # noqa: E402
+    MongoCollectionMetrics,
+    MongoJSONSchemaValidatedCollection,
+)
+from wipac_dev_tools.prometheus_tools import GlobalLabels  # noqa: E402
+
+ValidationError = jsonschema.exceptions.ValidationError
+
+
+@pytest.fixture
+def bio_schema():
+    return {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+        },
+        "required": ["name", "age"],
+    }
+
+
+def _sample(name: str, prefix: str, operation: str, **labels: str) -> float:
+    value = REGISTRY.get_sample_value(
+        f"{prefix}_{name}",
+        {"collection": "bios", "operation": operation, **labels},
+    )
+    return value or 0.0
+
+
+@pytest.fixture
+def metered_coll(bio_schema: dict, request: pytest.FixtureRequest):
+    """A collection (in-memory backend) with metrics under a per-test prefix."""
+    prefix = request.node.name.split("__")[0]
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"),
+        bio_schema,
+        metrics=MongoCollectionMetrics(GlobalLabels({"app": "test"}), prefix),
+    )
+    return coll, prefix
+
+
+async def test_1800__metrics_writes(metered_coll) -> None:
+    """Test writes record validation & driver time, and doc counts."""
+    coll, prefix = metered_coll
+
+    await coll.insert_one({"name": "a", "age": 1})
+    await coll.insert_many([{"name": "b", "age": 2}, {"name": "c", "age": 3}])
+    await coll.update_many({}, {"$inc": {"age": 1}})
+    await coll.find_one_and_update({"name": "a"}, {"$set": {"age": 10}})
+
+    for op, n_docs in [
+        ("insert_one", 1),
+        ("insert_many", 2),
+        ("update_many", 3),
+        ("find_one_and_update", 1),
+    ]:
+        assert _sample("operation_documents_total", prefix, op, app="test") == n_docs
+        for phase in ("validation", "driver"):
+            count = _sample(
+                "operation_seconds_count", prefix, op, app="test", phase=phase
+            )
+            assert count == 1, (op, phase)
+
+
+async def test_1801__metrics_validation_failures(metered_coll) -> None:
+    """Test operations rejected by validation are counted, and not sent."""
+    coll, prefix = metered_coll
+
+    with pytest.raises(ValidationError):
+        await coll.insert_one({"name": "a"})
+    with pytest.raises(ValidationError):
+        await coll.update_many({}, {"$set": {"age": "x"}})
+
+    for op in ("insert_one", "update_many"):
+        assert _sample("validation_failures_total", prefix, op, app="test") == 1
+        assert (
+            _sample("operation_seconds_count", prefix, op, phase="driver", app="test")
+            == 0
+        )
+    assert _sample("operation_documents_total", prefix, "insert_one", app="test") == 0
+
+
+async def test_1802__metrics_reads(metered_coll) -> None:
+    """Test reads record driver time (once per call) & doc counts."""
+    coll, prefix = metered_coll
+    await coll.insert_many([{"name": str(i), "age": i} for i in range(5)])
+
+    assert await coll.find_one({"age": 0})
+    assert len([d async for d in coll.find_all({}, [])]) == 5
+    assert len([b async for b in coll.find_all_batches({}, [], batch_size=2)]) == 3
+    assert len([d async for d in coll.aggregate([{"$match": {"age": 1}}])]) == 1
+    assert len([b async for b in coll.aggregate_batches([], batch_size=4)]) == 2
+    assert await coll.aggregate_one([])
+
+    for op, n_docs, n_calls in [
+        ("find_one", 1, 1),
+        ("find_all", 5, 1),
+        ("find_all_batches", 5, 1),
+        ("aggregate", 1, 1),
+        ("aggregate_one", 1, 1),
+        ("aggregate_batches", 5, 1),
+    ]:
+        assert _sample("operation_documents_total", prefix, op, app="test") == n_docs
+        count = _sample(
+            "operation_seconds_count", prefix, op, phase="driver", app="test"
+        )
+        assert count == n_calls, op
+        assert (
+            _sample("operation_seconds_sum", prefix, op, phase="driver", app="test") > 0
+        )
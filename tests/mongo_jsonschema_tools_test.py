@@ -1,23 +1,43 @@
 """Tests for mongo_jsonschema_tools.py."""
 
+import asyncio
+import copy
+import datetime as dt
+import json
 import logging
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import jsonschema
 import pytest
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
 
+from wipac_dev_tools import mongo_jsonschema_tools
+from wipac_dev_tools.mongo_inmemory_tools import InMemoryAsyncCollection
 from wipac_dev_tools.mongo_jsonschema_tools import (
     DocumentNotFoundException,
+    DocumentsValidationException,
     IllegalDotsNotationActionException,
     MongoJSONSchemaValidatedCollection,
+    PrecompiledPipeline,
+    ValidationCounts,
+    ValidationMode,
     _IS_MOTOR_IMPORTED,
+    _SchemaPathIndex,
     _convert_mongo_to_jsonschema,
+    _interpolate_split_points,
+    _pipeline_limited_to_one,
+    _pipeline_without_id,
+    _projection_without_id,
 )
 
 ValidationError = jsonschema.exceptions.ValidationError
 
 
-def make_coll(schema: dict) -> MongoJSONSchemaValidatedCollection:
+def make_coll(schema: dict, **kwargs) -> MongoJSONSchemaValidatedCollection:
     """Create a MongoJSONSchemaValidatedCollection instance with a mocked backend."""
 
     # FUTURE DEV: once motor, is deprecated, we can remove this
@@ -31,6 +51,7 @@ def make_coll(schema: dict) -> MongoJSONSchemaValidatedCollection:
             collection=AsyncMock(),
             collection_jsonschema_spec=schema,
             parent_logger=logging.getLogger("test_logger"),
+            **kwargs,
         )
         coll._collection_backend = coll_classname.rsplit(".", maxsplit=1)[1]
         return coll
@@ -162,6 +183,177 @@ def test_0004__convert_with_nested_additional_properties_blocked__but_ok():
         jsonschema.validate(out_doc, out_schema)
 
 
+########################################################################################
+# _SchemaPathIndex -- incl. array dot-indexing
+
+
+@pytest.fixture
+def runs_schema():
+    return {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "runs": {
+                "type": "array",
+                "minItems": 2,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "status": {"enum": ["new", "done"]},
+                        "count": {"type": "integer"},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["status", "count"],
+                    "additionalProperties": False,
+                },
+            },
+            "scores": {"type": "array", "items": {"type": "number"}},
+        },
+        "required": ["name", "runs"],
+    }
+
+
+def test_0010__path_index_get(runs_schema: dict):
+    """Test fields are found by dotted key, including via array indexes."""
+    index = _SchemaPathIndex(runs_schema)
+    items = runs_schema["properties"]["runs"]["items"]
+
+    assert index.get("") is runs_schema
+    assert index.get("name") == {"type": "string"}
+    for key in ["runs.0", "runs.12", "runs.$", "runs.$[]", "runs.$[elem]"]:
+        assert index.get(key) is items
+    assert index.get("runs.3.count") == {"type": "integer"}
+    assert index.get("runs.3.tags.0") == {"type": "string"}
+    assert index.get("runs.x") is None
+    assert index.get("nope.deeper") is None
+
+
+def test_0011__path_index_nest(runs_schema: dict):
+    """Test array-indexed keys become lists, and parent paths are normalized."""
+    index = _SchemaPathIndex(runs_schema)
+
+    nested, parent_paths = index.nest(
+        {
+            "name": "x",
+            "runs.0.status": "new",
+            "runs.0.count": 1,
+            "runs.4.tags.1": "a",
+            "scores.2": 1.5,
+        }
+    )
+
+    assert nested == {
+        "name": "x",
+        "runs": [{"status": "new", "count": 1}, {"tags": ["a"]}],
+        "scores": [1.5],
+    }
+    assert parent_paths == {("runs", "[]"), ("runs", "[]", "tags"), ("scores",)}
+
+    # no dots -> as-is
+    doc = {"name": "x"}
+    assert index.nest(doc) == (doc, frozenset())
+
+
+def test_0012__path_index_adapt_copies_only_paths(runs_schema: dict):
+    """Test adapting relaxes only along the paths, and never mutates the schema."""
+    original = copy.deepcopy(runs_schema)
+    index = _SchemaPathIndex(runs_schema)
+
+    adapted = index.adapt(frozenset({("runs", "[]")}))
+
+    runs = adapted["properties"]["runs"]
+    assert adapted["required"] == []
+    assert "minItems" not in runs
+    assert runs["items"]["required"] == []
+    assert runs["items"]["additionalProperties"] is False
+    # off the paths -> shared, not copied
+    assert adapted["properties"]["scores"] is runs_schema["properties"]["scores"]
+    assert runs_schema == original
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {"$set": {"runs.0.status": "done"}},
+        {"$set": {"runs.$.status": "done", "runs.$.count": 2}},
+        {"$set": {"runs.$[].tags": ["a"], "runs.1.tags.0": "b"}},
+        {"$set": {"runs.3": {"status": "new", "count": 0}}},
+        {"$set": {"scores.0": 1.5}},
+        {"$push": {"runs.0.tags": {"$each": ["a", "b"]}}},
+        {"$inc": {"runs.0.count": 1}},
+        {"$unset": {"runs.0.tags": ""}},
+    ],
+)
+def test_0013__validate_array_dot_indexing__valid(runs_schema: dict, update: dict):
+    """Test valid partial updates of array items."""
+    make_coll(runs_schema)._validate_mongo_update(update)
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {"$set": {"runs.0.status": "bad"}},
+        {"$set": {"runs.0.extra": 1}},  # additionalProperties
+        {"$set": {"runs.3": {"status": "new"}}},  # whole item -> required
+        {"$set": {"scores.0": "x"}},
+        {"$push": {"runs.0.tags": 1}},
+        {"$inc": {"runs.0.count": 1.5}},
+        {"$unset": {"runs.0.status": ""}},
+    ],
+)
+def test_0014__validate_array_dot_indexing__invalid(runs_schema: dict, update: dict):
+    """Test invalid partial updates of array items."""
+    with pytest.raises(ValidationError):
+        make_coll(runs_schema)._validate_mongo_update(update)
+
+
+def test_0015__validate_array_dot_indexing__shapes_cached(runs_schema: dict):
+    """Test different indexes into the same array share an adapted validator."""
+    coll = make_coll(runs_schema)
+    for i in range(5):
+        coll._validate_mongo_update({"$set": {f"runs.{i}.status": "done"}})
+    info = coll._partial_update_validators.cache_info()
+    assert (info.hits, info.misses) == (4, 1)
+
+
+########################################################################################
+# _projection_without_id() & _pipeline_without_id()
+
+
+@pytest.mark.parametrize(
+    "projection, expected",
+    [
+        (None, {"_id": False}),
+        (["name", "age"], {"name": True, "age": True, "_id": False}),
+        (["name", "_id"], {"name": True, "_id": False}),
+        ({"name": 1}, {"name": 1, "_id": False}),
+        ({"address": 0}, {"address": 0, "_id": False}),
+        ({"_id": 1, "name": 1}, {"name": 1, "_id": False}),
+        # empty means every field
+        ([], {"_id": False}),
+        ({}, {"_id": False}),
+        # excluding '_id' would change the meaning -> as-is
+        ({"_id": 1}, {"_id": 1}),
+        (["_id"], ["_id"]),
+    ],
+)
+def test_0050__projection_without_id(projection, expected):
+    """Test '_id' is excluded from the projection, when that's safe."""
+    assert _projection_without_id(projection) == expected
+
+
+def test_0051__pipeline_without_id():
+    """Test a '_id'-excluding stage is appended to a copy of the pipeline."""
+    pipeline = [{"$match": {}}]
+    out = _pipeline_without_id(pipeline)
+    assert out == [{"$match": {}}, {"$project": {"_id": False}}]
+    assert pipeline == [{"$match": {}}]  # not mutated
+
+    # output stages must be last -> as-is
+    for stage in [{"$out": "other"}, {"$merge": {"into": "other"}}]:
+        assert _pipeline_without_id([{"$match": {}}, stage]) == [{"$match": {}}, stage]
+
+
 ########################################################################################
 # _validate()
 
@@ -387,6 +579,87 @@ def test_0115__validate__deep_nested_dotted_update_succeeds():
     coll._validate({"a.b.c": "xyz"}, allow_partial_update=True)
 
 
+########################################################################################
+# _validate() - compiled validators
+
+
+def test_0120__validate__validator_compiled_once(bio_schema: dict):
+    """Test the full-schema validator is built at init and reused for every write."""
+    with patch(
+        "wipac_dev_tools.mongo_jsonschema_tools._compile_validator",
+        wraps=mongo_jsonschema_tools._compile_validator,
+    ) as mock_compile:
+        coll = make_coll(bio_schema)
+        assert mock_compile.call_count == 1
+
+        for i in range(5):
+            coll._validate({"name": "Alice", "age": i})
+        assert mock_compile.call_count == 1
+
+        # a partial update uses an adapted schema -> compiled once, then reused
+        for i in range(5):
+            coll._validate({"address.city": f"city-{i}"}, allow_partial_update=True)
+        assert mock_compile.call_count == 2
+
+
+def test_0121__validate__invalid_schema_raises_at_init():
+    """Test an invalid schema is rejected when the collection is constructed."""
+    with pytest.raises(jsonschema.exceptions.SchemaError):
+        make_coll({"type": "object", "properties": {"foo": {"type": "not-a-type"}}})
+
+
+def test_0122__validate__same_error_as_jsonschema_validate(bio_schema: dict):
+    """Test the cached validator raises the same error as `jsonschema.validate`."""
+    coll = make_coll(bio_schema)
+    doc = {"name": 123, "age": "old", "address": {"city": 5}}
+
+    with pytest.raises(ValidationError) as expected:
+        jsonschema.validate(doc, bio_schema)
+    with pytest.raises(ValidationError) as actual:
+        coll._validate(doc)
+
+    assert actual.value.message == expected.value.message
+    assert list(actual.value.path) == list(expected.value.path)
+
+
+def test_0123__validate__partial_update_shapes_cached(bio_schema: dict):
+    """Test repeated partial-update shapes reuse the adapted schema & validator."""
+    coll = make_coll(bio_schema)
+
+    with patch.object(
+        coll._path_index, "adapt", wraps=coll._path_index.adapt
+    ) as mock_adapt:
+        for i in range(10):
+            coll._validate_mongo_update({"$set": {"address.city": f"city-{i}"}})
+        # same parent path ('address',), different leaf -> same shape
+        coll._validate_mongo_update({"$set": {"address.zip": "12345", "age": 3}})
+        assert mock_adapt.call_count == 1
+
+        # new shape -> adapted once
+        coll._validate_mongo_update({"$set": {"name": "Alice"}})
+        coll._validate_mongo_update({"$set": {"name": "Bob"}})
+        assert mock_adapt.call_count == 2
+
+    info = coll._partial_update_validators.cache_info()
+    assert (info.hits, info.misses) == (11, 2)
+
+    # the full schema is never mutated by adaptation
+    assert bio_schema["required"] == ["name", "age"]
+    assert bio_schema["properties"]["address"]["required"] == ["city", "zip"]
+
+
+def test_0124__validate__partial_update_cache_is_bounded(bio_schema: dict):
+    """Test the partial-update cache evicts least-recently-used shapes."""
+    coll = make_coll(bio_schema, partial_update_cache_size=1)
+
+    coll._validate({"address.city": "x"}, allow_partial_update=True)
+    coll._validate({"name": "x"}, allow_partial_update=True)
+    coll._validate({"address.city": "y"}, allow_partial_update=True)
+
+    info = coll._partial_update_validators.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 3, 1)
+
+
 ########################################################################################
 # _validate_mongo_update()
 
@@ -432,6 +705,76 @@ def test_0204__validate_mongo_update__push_baseball_invalid(team_schema):
         coll._validate_mongo_update(update)
 
 
+def test_0205__validate_mongo_update__set_on_insert(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test $setOnInsert is validated like $set."""
+    bio_coll._validate_mongo_update({"$setOnInsert": {"address.zip": "12345"}})
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$setOnInsert": {"address.zip": 12345}})
+
+
+@pytest.mark.parametrize("operator", ["$push", "$addToSet"])
+def test_0206__validate_mongo_update__push_each(team_schema, operator):
+    """Test $push & $addToSet validate each value, with or without $each."""
+    coll = make_coll(team_schema)
+    jack = {"name": "Jack", "position": "Pitcher", "number": 42}
+    jill = {"name": "Jill", "position": "Catcher", "number": 7}
+
+    coll._validate_mongo_update({operator: {"team": jack}})
+    coll._validate_mongo_update({operator: {"team": {"$each": [jack, jill]}}})
+    coll._validate_mongo_update(
+        {operator: {"team": {"$each": [jill], "$position": 0, "$slice": 5}}}
+    )
+    with pytest.raises(ValidationError):
+        coll._validate_mongo_update(
+            {operator: {"team": {"$each": [jack, {"name": "Nobody"}]}}}
+        )
+
+
+def test_0207__validate_mongo_update__inc(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test $inc requires a number matching the field's type."""
+    bio_coll._validate_mongo_update({"$inc": {"age": 1}})
+    bio_coll._validate_mongo_update({"$inc": {"age": -3}})  # constraints not checked
+    bio_coll._validate_mongo_update({"$inc": {"undefined.field": 0.5}})
+
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$inc": {"age": 1.5}})  # integer field
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$inc": {"age": "1"}})
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$inc": {"name": 1}})  # string field
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$inc": {"undefined": "x"}})
+
+
+def test_0208__validate_mongo_update__unset(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test $unset is rejected for required fields."""
+    bio_coll._validate_mongo_update({"$unset": {"address": ""}})
+
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$unset": {"age": ""}})
+    with pytest.raises(ValidationError):
+        bio_coll._validate_mongo_update({"$unset": {"address.zip": ""}})
+
+
+def test_0209__validate_mongo_update__uses_callback(bio_schema: dict):
+    """Test non-$set operator errors also go through validation_exception_callback."""
+
+    class MyError(Exception):
+        pass
+
+    coll = make_coll(bio_schema, validation_exception_callback=lambda e: MyError())
+    with pytest.raises(MyError):
+        coll._validate_mongo_update({"$inc": {"age": "x"}})
+    with pytest.raises(MyError):
+        coll._validate_mongo_update({"$unset": {"name": ""}})
+
+
 ########################################################################################
 # insert_one()
 
@@ -475,6 +818,297 @@ async def test_1100__insert_many_calls_validate_and_motor(
     assert result == docs
     assert bio_coll._validate.call_count == 2
     bio_coll._collection.insert_many.assert_called_once_with(docs)
+    assert "_schema_json" not in vars(bio_coll)  # only made for an executor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_1101__insert_many_validates_in_executor(bio_schema: dict, executor_cls):
+    """Test insert_many validates chunks in the executor, then inserts."""
+    docs = [{"name": f"N{i}", "age": i} for i in range(25)]
+
+    with executor_cls(max_workers=2) as executor:
+        coll = make_coll(
+            bio_schema, validation_executor=executor, validation_chunk_size=10
+        )
+        coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+        with patch.object(
+            coll, "_validate", side_effect=AssertionError("not on event loop")
+        ):
+            result = await coll.insert_many([doc.copy() for doc in docs])
+
+    assert result == docs
+    coll._collection.insert_many.assert_called_once_with(docs)
+    assert json.loads(vars(coll)["_schema_json"]) == bio_schema
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_1102__insert_many_executor_reports_all_invalid(
+    bio_schema: dict, executor_cls
+):
+    """Test insert_many (with an executor) raises one exception for all invalid docs."""
+    docs = [{"name": f"N{i}", "age": i} for i in range(25)]
+    docs[3]["age"] = "three"
+    docs[17] = {"name": "no-age"}
+    docs[24] = {"name": "dots", "age": 1, "address.city": "x"}
+
+    with executor_cls(max_workers=2) as executor:
+        coll = make_coll(
+            bio_schema, validation_executor=executor, validation_chunk_size=10
+        )
+        coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+        with pytest.raises(DocumentsValidationException) as e:
+            await coll.insert_many(docs)
+
+    assert sorted(e.value.errors) == [3, 17, 24]
+    assert isinstance(e.value.errors[3], ValidationError)
+    assert isinstance(e.value.errors[17], ValidationError)
+    assert isinstance(e.value.errors[24], IllegalDotsNotationActionException)
+    coll._collection.insert_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_1103__insert_many_executor_uses_callback(bio_schema: dict):
+    """Test the aggregated exception is passed to validation_exception_callback."""
+
+    class MyError(Exception):
+        pass
+
+    with ThreadPoolExecutor() as executor:
+        coll = make_coll(
+            bio_schema,
+            validation_executor=executor,
+            validation_exception_callback=lambda e: MyError(str(e)),
+        )
+        coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+        with pytest.raises(MyError) as e:
+            await coll.insert_many([{"name": "A", "age": 1}, {"name": "B"}])
+
+    assert isinstance(e.value.__cause__, DocumentsValidationException)
+    assert list(e.value.__cause__.errors) == [1]
+
+
+########################################################################################
+# validation_mode
+
+
+def test_1120__validation_mode_rate_checked():
+    """Test ValidationMode only accepts rates in [0, 1]."""
+    assert ValidationMode.ALWAYS.rate == 1
+    assert ValidationMode.NEVER.rate == 0
+    assert ValidationMode.sampled(0.25) == ValidationMode(0.25)
+    for rate in [-0.1, 1.1]:
+        with pytest.raises(ValueError):
+            ValidationMode.sampled(rate)
+
+
+@pytest.mark.asyncio
+async def test_1121__validation_mode_never(bio_schema: dict):
+    """Test a collection-level NEVER mode skips (and counts) every inserted doc."""
+    coll = make_coll(bio_schema, validation_mode=ValidationMode.NEVER)
+    coll._collection.insert_one = AsyncMock()  # type: ignore[method-assign]
+    coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+
+    await coll.insert_one({"invalid": True})
+    await coll.insert_many([{"invalid": True}] * 3)
+
+    assert coll.validation_counts == ValidationCounts(validated=0, skipped=4)
+
+    # per-call override
+    with pytest.raises(ValidationError):
+        await coll.insert_one({"invalid": True}, validation_mode=ValidationMode.ALWAYS)
+    assert coll.validation_counts == ValidationCounts(validated=1, skipped=4)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_cls", [None, ThreadPoolExecutor])
+async def test_1122__validation_mode_sampled(bio_schema: dict, executor_cls):
+    """Test a sampled mode validates ~rate of the docs, reporting original indexes."""
+    random.seed(0)
+    n_docs = 2_000
+    docs = [{"name": f"N{i}", "age": i} for i in range(n_docs)]
+
+    executor = executor_cls() if executor_cls else None
+    coll = make_coll(bio_schema, validation_executor=executor)
+    coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+
+    await coll.insert_many(docs, validation_mode=ValidationMode.sampled(0.1))
+    n_validated = coll.validation_counts.validated
+    assert n_validated + coll.validation_counts.skipped == n_docs
+    assert 100 < n_validated < 300
+
+    # every doc invalid -> the reported indexes are the sampled ones
+    if executor:
+        with pytest.raises(DocumentsValidationException) as e:
+            await coll.insert_many(
+                [{}] * n_docs, validation_mode=ValidationMode.sampled(0.1)
+            )
+        assert len(e.value.errors) == coll.validation_counts.validated - n_validated
+        assert max(e.value.errors) > 1_000  # not re-numbered from 0
+        executor.shutdown()
+
+
+########################################################################################
+# insert_many_chunked()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("as_async_iter", [False, True])
+async def test_1150__insert_many_chunked_bounds_in_flight(
+    bio_coll: MongoJSONSchemaValidatedCollection, as_async_iter: bool
+):
+    """Test insert_many_chunked inserts every chunk, with bounded concurrency."""
+    docs = [{"name": f"N{i}", "age": i} for i in range(25)]
+    n_in_flight, max_seen, calls = 0, 0, []
+
+    async def fake_insert_many(chunk, **_kwargs):
+        nonlocal n_in_flight, max_seen
+        n_in_flight += 1
+        max_seen = max(max_seen, n_in_flight)
+        calls.append([d.copy() for d in chunk])
+        await asyncio.sleep(0.01)
+        for d in chunk:
+            d["_id"] = "x"
+        n_in_flight -= 1
+
+    bio_coll._collection.insert_many = fake_insert_many  # type: ignore[method-assign]
+
+    async def agen():
+        for doc in docs:
+            yield doc.copy()
+
+    source = agen() if as_async_iter else (doc.copy() for doc in docs)
+    count = await bio_coll.insert_many_chunked(source, chunk_size=4, max_in_flight=2)
+
+    assert count == 25
+    assert [len(c) for c in calls] == [4, 4, 4, 4, 4, 4, 1]
+    assert sorted((d for c in calls for d in c), key=lambda d: d["age"]) == docs
+    assert max_seen == 2
+
+
+@pytest.mark.asyncio
+async def test_1151__insert_many_chunked_validation_error_stops(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test an invalid doc stops insert_many_chunked; prior chunks stay inserted."""
+    docs = [{"name": f"N{i}", "age": i} for i in range(10)]
+    docs[5] = {"name": "no-age"}
+    bio_coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+
+    with pytest.raises(ValidationError):
+        await bio_coll.insert_many_chunked(iter(docs), chunk_size=3)
+
+    # chunk #0 (docs 0-2) was sent; chunk #1 (docs 3-5) failed validation
+    bio_coll._collection.insert_many.assert_called_once_with(docs[:3])
+
+
+@pytest.mark.asyncio
+async def test_1152__insert_many_chunked_executor_offsets(bio_schema: dict):
+    """Test DocumentsValidationException indexes are relative to the whole stream."""
+    docs = [{"name": f"N{i}", "age": i} for i in range(10)]
+    docs[7] = {"name": "no-age"}
+
+    with ThreadPoolExecutor() as executor:
+        coll = make_coll(bio_schema, validation_executor=executor)
+        coll._collection.insert_many = AsyncMock()  # type: ignore[method-assign]
+        with pytest.raises(DocumentsValidationException) as e:
+            await coll.insert_many_chunked(docs, chunk_size=3)
+
+    assert list(e.value.errors) == [7]
+    assert coll._collection.insert_many.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_1153__insert_many_chunked_insert_error_propagates(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test a failed driver insert is raised, and pending inserts are cancelled."""
+    cancelled = []
+
+    async def fake_insert_many(chunk, **_kwargs):
+        if chunk[0]["age"] == 0:
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(chunk[0]["age"])
+            raise
+
+    bio_coll._collection.insert_many = fake_insert_many  # type: ignore[method-assign]
+
+    docs = [{"name": f"N{i}", "age": i} for i in range(4)]
+    with pytest.raises(RuntimeError, match="boom"):
+        await bio_coll.insert_many_chunked(docs, chunk_size=2, max_in_flight=4)
+
+    assert cancelled == [2]
+
+
+########################################################################################
+# bulk_write()
+
+
+@pytest.mark.asyncio
+async def test_1160__bulk_write_validates_and_submits_once(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test bulk_write validates each op by type, then makes one driver call."""
+    requests: list = [
+        InsertOne({"name": "Alice", "age": 30}),
+        UpdateOne({"name": "Alice"}, {"$set": {"address.city": "X"}}, upsert=True),
+        UpdateMany({}, {"$set": {"age": 31}}),
+        ReplaceOne({"name": "Bob"}, {"name": "Bob", "age": 40}),
+        DeleteOne({"name": "Carl"}),
+        DeleteMany({"age": 0}),
+    ]
+    bio_coll._collection.bulk_write = AsyncMock()  # type: ignore[method-assign]
+
+    with (
+        patch.object(bio_coll, "_validate", wraps=bio_coll._validate) as mock_validate,
+        patch.object(
+            bio_coll, "_validate_mongo_update", wraps=bio_coll._validate_mongo_update
+        ) as mock_validate_update,
+    ):
+        res = await bio_coll.bulk_write(requests, ordered=False)
+
+    # check calls & result
+    assert mock_validate.call_count == 2 + 2  # 2 whole docs + 2 '$set's (via update)
+    assert mock_validate_update.call_count == 2
+    bio_coll._collection.bulk_write.assert_called_once_with(requests, ordered=False)
+    assert res is bio_coll._collection.bulk_write.return_value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "bad_op",
+    [
+        InsertOne({"name": "Alice"}),  # missing 'age'
+        ReplaceOne({}, {"name": "Bob", "age": "forty"}),
+        UpdateOne({}, {"$set": {"age": "forty"}}),
+        UpdateMany({}, {"$rename": {"age": "years"}}),
+    ],
+)
+async def test_1161__bulk_write_invalid_op_raises(
+    bio_coll: MongoJSONSchemaValidatedCollection, bad_op
+):
+    """Test bulk_write raises (and writes nothing) if any op is invalid."""
+    bio_coll._collection.bulk_write = AsyncMock()  # type: ignore[method-assign]
+
+    with pytest.raises((ValidationError, KeyError)):
+        await bio_coll.bulk_write([InsertOne({"name": "A", "age": 1}), bad_op])
+
+    bio_coll._collection.bulk_write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_1162__bulk_write_unsupported_op_raises(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test bulk_write rejects anything that's not a supported write operation."""
+    bio_coll._collection.bulk_write = AsyncMock()  # type: ignore[method-assign]
+
+    with pytest.raises(TypeError):
+        await bio_coll.bulk_write([{"insertOne": {"name": "A"}}])  # type: ignore[list-item]
 
 
 ########################################################################################
@@ -493,7 +1127,9 @@ async def test_1200__find_one_removes_id_and_returns(
     result = await bio_coll.find_one({"name": "Alice"})
 
     # check calls & result
-    bio_coll._collection.find_one.assert_called_once_with({"name": "Alice"})
+    bio_coll._collection.find_one.assert_called_once_with(
+        {"name": "Alice"}, projection={"_id": False}
+    )
     assert result == {"name": "Alice", "age": 30}
 
 
@@ -508,6 +1144,219 @@ async def test_1201__find_one_not_found_raises(
         await bio_coll.find_one({"name": "Missing"})
 
 
+@pytest.mark.asyncio
+async def test_1202__find_one_projected_to_empty_doc(bio_schema: dict):
+    """Test find_one returns '{}' when the projection leaves nothing, not raise."""
+    coll = await _inmemory_coll(bio_schema, [{"name": "Alice", "age": 30}])
+
+    assert await coll.find_one({"name": "Alice"}, projection={"missing": True}) == {}
+
+    with pytest.raises(DocumentNotFoundException):
+        await coll.find_one({"name": "Bob"}, projection={"missing": True})
+
+
+@pytest.mark.asyncio
+async def test_1210__find_one_cache_hits(bio_schema: dict):
+    """Test find_one serves repeat queries from the cache, as copies."""
+    coll = make_coll(bio_schema, find_one_cache_ttl=60)
+    coll._collection.find_one = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda *a, **kw: {"_id": "id", "name": "Alice", "age": 30}
+    )
+
+    first = await coll.find_one({"name": "Alice", "age": 30})
+    first["age"] = 99  # mutating a result doesn't touch the cache
+    # same query, different key order
+    assert await coll.find_one({"age": 30, "name": "Alice"}) == {
+        "name": "Alice",
+        "age": 30,
+    }
+    coll._collection.find_one.assert_called_once()
+
+    # different args -> different key
+    await coll.find_one({"name": "Alice", "age": 30}, no_id=False)
+    await coll.find_one({"name": "Alice", "age": 30}, projection=["name"])
+    assert coll._collection.find_one.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_1211__find_one_cache_ttl_and_size(
+    bio_schema: dict, monkeypatch: pytest.MonkeyPatch
+):
+    """Test cached results expire after the TTL, and the LRU is evicted."""
+    now = 1000.0
+    monkeypatch.setattr(mongo_jsonschema_tools.time, "monotonic", lambda: now)
+
+    coll = make_coll(bio_schema, find_one_cache_ttl=5, find_one_cache_size=2)
+    coll._collection.find_one = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda query, **kw: dict(query, age=1)
+    )
+
+    await coll.find_one({"name": "A"})
+    await coll.find_one({"name": "B"})
+    await coll.find_one({"name": "A"})  # hit -- now "B" is the LRU
+    await coll.find_one({"name": "C"})  # evicts "B"
+    assert coll._collection.find_one.call_count == 3
+    await coll.find_one({"name": "B"})
+    assert coll._collection.find_one.call_count == 4
+
+    now += 5
+    await coll.find_one({"name": "B"})
+    assert coll._collection.find_one.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_1212__find_one_cache_invalidated_by_writes(bio_schema: dict):
+    """Test every write through the wrapper clears the cache."""
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema, find_one_cache_ttl=60
+    )
+    await coll.insert_one({"name": "Alice", "age": 30})
+    assert await coll.find_one({"name": "Alice"}) == {"name": "Alice", "age": 30}
+
+    await coll.update_many({"name": "Alice"}, {"$set": {"age": 31}})
+    assert (await coll.find_one({"name": "Alice"}))["age"] == 31
+
+    await coll.find_one_and_update({"name": "Alice"}, {"$inc": {"age": 1}})
+    assert (await coll.find_one({"name": "Alice"}))["age"] == 32
+
+    with pytest.raises(DocumentNotFoundException):
+        await coll.find_one({"name": "Bob"})  # not-found isn't cached
+    await coll.insert_many([{"name": "Bob", "age": 1}])
+    assert await coll.find_one({"name": "Bob"}) == {"name": "Bob", "age": 1}
+
+    await coll.bulk_write([UpdateOne({"name": "Bob"}, {"$set": {"age": 2}})])
+    assert (await coll.find_one({"name": "Bob"}))["age"] == 2
+
+
+@pytest.mark.asyncio
+async def test_1213__find_one_cache_ignores_stale_in_flight_read(bio_schema: dict):
+    """Test a read that started before a write isn't cached after it."""
+    coll = make_coll(bio_schema, find_one_cache_ttl=60)
+    release = asyncio.Event()
+
+    async def slow_find_one(*args, **kwargs):
+        await release.wait()
+        return {"name": "Alice", "age": 30}
+
+    coll._collection.find_one = AsyncMock(side_effect=slow_find_one)  # type: ignore[method-assign]
+    coll._collection.insert_one = AsyncMock()  # type: ignore[method-assign]
+
+    read = asyncio.create_task(coll.find_one({"name": "Alice"}))
+    await asyncio.sleep(0)
+    await coll.insert_one({"name": "Alice", "age": 31})
+    release.set()
+    await read
+
+    await coll.find_one({"name": "Alice"})
+    assert coll._collection.find_one.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_1214__find_one_cache_bypassed_for_sessions(bio_schema: dict):
+    """Test calls within a session always go to the server."""
+    coll = make_coll(bio_schema, find_one_cache_ttl=60)
+    coll._collection.find_one = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda *a, **kw: {"name": "Alice", "age": 30}
+    )
+    session = object()
+    await coll.find_one({"name": "Alice"}, session=session)
+    await coll.find_one({"name": "Alice"}, session=session)
+    assert coll._collection.find_one.call_count == 2
+
+
+def _slow_find_one_mock(release: asyncio.Event, result: Any) -> AsyncMock:
+    async def find_one(*args, **kwargs):
+        await release.wait()
+        if isinstance(result, Exception):
+            raise result
+        return dict(result)
+
+    return AsyncMock(side_effect=find_one)
+
+
+@pytest.mark.asyncio
+async def test_1220__find_one_single_flight_coalesces(bio_schema: dict):
+    """Test concurrent identical find_one calls share one server call."""
+    coll = make_coll(bio_schema, find_one_single_flight=True)
+    release = asyncio.Event()
+    coll._collection.find_one = _slow_find_one_mock(  # type: ignore[method-assign]
+        release, {"_id": "id", "name": "Alice", "age": 30}
+    )
+
+    tasks = [asyncio.create_task(coll.find_one({"name": "Alice"})) for _ in range(100)]
+    other = asyncio.create_task(coll.find_one({"name": "Bob"}))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    await other
+
+    assert coll._collection.find_one.call_count == 2  # Alice & Bob
+    assert all(r == {"name": "Alice", "age": 30} for r in results)
+    assert len({id(r) for r in results}) == 100  # each caller gets its own copy
+
+    # nothing in flight now -> a new server call
+    await coll.find_one({"name": "Alice"})
+    assert coll._collection.find_one.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_1221__find_one_single_flight_shares_exception(bio_schema: dict):
+    """Test every coalesced caller gets the exception."""
+    coll = make_coll(bio_schema, find_one_single_flight=True)
+    release = asyncio.Event()
+    coll._collection.find_one = _slow_find_one_mock(release, RuntimeError("boom"))  # type: ignore[method-assign]
+
+    tasks = [asyncio.create_task(coll.find_one({"name": "A"})) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert coll._collection.find_one.call_count == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_1222__find_one_single_flight_cancel_one_waiter(bio_schema: dict):
+    """Test cancelling one caller doesn't cancel the shared call."""
+    coll = make_coll(bio_schema, find_one_single_flight=True)
+    release = asyncio.Event()
+    coll._collection.find_one = _slow_find_one_mock(  # type: ignore[method-assign]
+        release, {"name": "A", "age": 1}
+    )
+
+    first = asyncio.create_task(coll.find_one({"name": "A"}))
+    second = asyncio.create_task(coll.find_one({"name": "A"}))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == {"name": "A", "age": 1}
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert coll._collection.find_one.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_1223__find_one_single_flight_not_joined_after_write(bio_schema: dict):
+    """Test a call made after a write doesn't join a call from before it."""
+    coll = make_coll(bio_schema, find_one_single_flight=True)
+    release = asyncio.Event()
+    coll._collection.find_one = _slow_find_one_mock(  # type: ignore[method-assign]
+        release, {"name": "A", "age": 1}
+    )
+    coll._collection.insert_one = AsyncMock()  # type: ignore[method-assign]
+
+    before = asyncio.create_task(coll.find_one({"name": "A"}))
+    await asyncio.sleep(0)
+    await coll.insert_one({"name": "A", "age": 2})
+    after = asyncio.create_task(coll.find_one({"name": "A"}))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(before, after)
+
+    assert coll._collection.find_one.call_count == 2
+
+
 ########################################################################################
 # find_one_and_update()
 
@@ -607,6 +1456,246 @@ async def test_1500__find_all_removes_id(
     assert results == [{"name": "A"}, {"name": "B"}]
 
 
+class _ReprCountingDict(dict):
+    """A dict that counts how many times it's been stringified."""
+
+    n_str = 0
+
+    def __repr__(self) -> str:
+        type(self).n_str += 1
+        return super().__repr__()
+
+    __str__ = __repr__
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("level", [logging.INFO, logging.DEBUG])
+async def test_1501__find_all_lazy_debug_logging(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+    level: int,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Test find_all does not stringify any docs unless debug logging is on."""
+    n_docs = 100_000 if level == logging.INFO else 3
+    _ReprCountingDict.n_str = 0
+
+    async def async_gen():
+        for i in range(n_docs):
+            yield _ReprCountingDict(_id=i, name="A")
+
+    bio_coll._collection.find = lambda *_args, **_kwargs: async_gen()  # type: ignore[method-assign]
+    caplog.set_level(level, logger=bio_coll.logger.name)
+
+    count = 0
+    async for _ in bio_coll.find_all({}, ["name"]):
+        count += 1
+
+    assert count == n_docs
+    if level == logging.DEBUG:
+        assert _ReprCountingDict.n_str >= n_docs  # sanity check: counting works
+    else:
+        assert _ReprCountingDict.n_str == 0
+
+
+@pytest.mark.asyncio
+async def test_1502__find_all_empty_projection_excludes_id(bio_schema: dict):
+    """Test an empty projection (every field) excludes _id server-side."""
+    coll = await _inmemory_coll(bio_schema, [{"_id": 1, "name": "A", "age": 1}])
+    find = MagicMock(side_effect=coll._collection.find)
+    coll._collection.find = find  # type: ignore[method-assign]
+
+    for projection in ([], {}):
+        assert [d async for d in coll.find_all({}, projection)] == [
+            {"name": "A", "age": 1}
+        ]
+        assert find.call_args.args == ({}, {"_id": False})
+
+
+class _FakeCursor:
+    """A minimal async cursor, supporting `to_list()`."""
+
+    def __init__(self, docs: list[dict]) -> None:
+        self._docs = list(docs)
+        self.to_list_calls = 0
+
+    async def to_list(self, length=None) -> list[dict]:
+        self.to_list_calls += 1
+        out, self._docs = self._docs[:length], self._docs[length:]
+        return out
+
+
+@pytest.mark.asyncio
+async def test_1510__find_all_batches(bio_coll: MongoJSONSchemaValidatedCollection):
+    """Test find_all_batches yields batch_size-d lists of docs without _id."""
+    cursor = _FakeCursor([{"_id": i, "age": i} for i in range(7)])
+    bio_coll._collection.find = MagicMock(return_value=cursor)  # type: ignore[method-assign]
+
+    batches = [b async for b in bio_coll.find_all_batches({}, ["age"], batch_size=3)]
+
+    # check calls & result
+    bio_coll._collection.find.assert_called_once_with(
+        {}, {"age": True, "_id": False}, batch_size=3
+    )
+    assert batches == [
+        [{"age": 0}, {"age": 1}, {"age": 2}],
+        [{"age": 3}, {"age": 4}, {"age": 5}],
+        [{"age": 6}],
+    ]
+    assert cursor.to_list_calls == 4  # last call is empty -> done
+
+
+@pytest.mark.asyncio
+async def test_1511__find_all_batches_keep_id(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test find_all_batches keeps _id when no_id=False."""
+    cursor = _FakeCursor([{"_id": 1, "age": 1}])
+    bio_coll._collection.find = MagicMock(return_value=cursor)  # type: ignore[method-assign]
+
+    batches = [b async for b in bio_coll.find_all_batches({}, [], no_id=False)]
+    assert batches == [[{"_id": 1, "age": 1}]]
+
+
+async def _inmemory_coll(schema: dict, docs: list[dict]):
+    coll = MongoJSONSchemaValidatedCollection(InMemoryAsyncCollection("bios"), schema)
+    await coll.insert_many(docs, no_id=False)
+    return coll
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n_partitions", [1, 3, 8, 200])
+async def test_1520__find_all_parallel_int_ids(bio_schema: dict, n_partitions: int):
+    """Test find_all_parallel finds every doc exactly once."""
+    docs = [{"_id": i, "name": str(i), "age": i % 7} for i in range(100)]
+    coll = await _inmemory_coll(bio_schema, docs)
+    find = MagicMock(side_effect=coll._collection.find)
+    coll._collection.find = find  # type: ignore[method-assign]
+
+    found = [
+        d
+        async for d in coll.find_all_parallel(
+            {"age": {"$lt": 3}}, ["name"], n_partitions=n_partitions
+        )
+    ]
+
+    assert sorted(int(d["name"]) for d in found) == [i for i in range(100) if i % 7 < 3]
+    assert all(d.keys() == {"name"} for d in found)
+    assert find.call_count == min(n_partitions, 99)  # at most 1 partition per id
+
+
+@pytest.mark.asyncio
+async def test_1521__find_all_parallel_object_ids(bio_schema: dict):
+    """Test split points are interpolated between ObjectIds' generation times."""
+    start = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+    docs = [
+        {
+            "_id": ObjectId.from_datetime(start + dt.timedelta(hours=i)),
+            "name": str(i),
+            "age": i,
+        }
+        for i in range(50)
+    ]
+    coll = await _inmemory_coll(bio_schema, docs)
+
+    found = [d async for d in coll.find_all_parallel({}, [], n_partitions=5)]
+    assert sorted(d["age"] for d in found) == list(range(50))
+
+    points = _interpolate_split_points(docs[0]["_id"], docs[-1]["_id"], 5)
+    assert len(points) == 4
+    assert docs[0]["_id"] < points[0] < points[-1] < docs[-1]["_id"]
+
+
+@pytest.mark.asyncio
+async def test_1522__find_all_parallel_split_points(bio_schema: dict):
+    """Test user-supplied split points on a shard key."""
+    docs = [{"name": f"n{i:02}", "age": i} for i in range(30)]
+    coll = await _inmemory_coll(bio_schema, docs)
+    find = MagicMock(side_effect=coll._collection.find)
+    coll._collection.find = find  # type: ignore[method-assign]
+
+    found = [
+        d
+        async for d in coll.find_all_parallel(
+            {}, [], partition_key="name", split_points=["n10", "n20"], buffer_size=1
+        )
+    ]
+
+    assert sorted(d["age"] for d in found) == list(range(30))
+    assert [c.args[0] for c in find.call_args_list] == [
+        {"name": {"$not": {"$gte": "n10"}}},
+        {"name": {"$gte": "n10", "$lt": "n20"}},
+        {"name": {"$gte": "n20"}},
+    ]
+    with pytest.raises(TypeError, match="split_points"):
+        _interpolate_split_points("a", "z", 2)
+
+
+@pytest.mark.asyncio
+async def test_1523__find_all_parallel_docs_without_key(bio_schema: dict):
+    """Test docs without (or with a null) partition key are still found, once."""
+    docs = [{"name": str(i), "age": i} for i in range(20)]
+    coll = await _inmemory_coll(bio_schema, docs)
+    # these sort first -- so, would be the min
+    await coll._collection.insert_one({"name": "no-age"})
+    await coll._collection.insert_one({"name": "null-age", "age": None})
+    expected = sorted([str(i) for i in range(20)] + ["no-age", "null-age"])
+
+    for n_partitions in (1, 4):
+        found = [
+            d
+            async for d in coll.find_all_parallel(
+                {}, ["name"], n_partitions=n_partitions, partition_key="age"
+            )
+        ]
+        assert sorted(d["name"] for d in found) == expected
+
+    # and a different type than the split points
+    await coll._collection.insert_one({"name": "str-age", "age": "x"})
+    found = [
+        d
+        async for d in coll.find_all_parallel(
+            {}, ["name"], n_partitions=4, partition_key="age"
+        )
+    ]
+    assert sorted(d["name"] for d in found) == sorted(expected + ["str-age"])
+
+    find_one = AsyncMock(side_effect=coll._collection.find_one)
+    coll._collection.find_one = find_one  # type: ignore[method-assign]
+    assert await coll._find_split_points({"age": {"$lt": 10}}, "age", 2) == [4]
+    assert find_one.call_args.args[0] == {
+        "$and": [{"age": {"$lt": 10}}, {"age": {"$exists": True, "$ne": None}}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_1524__find_all_parallel_error_cancels_others(
+    bio_coll: MongoJSONSchemaValidatedCollection,
+):
+    """Test an error in one cursor is raised, and stops the rest."""
+    cancelled = asyncio.Event()
+
+    async def never_ending():
+        try:
+            while True:
+                yield {"name": "x", "age": 1}
+                await asyncio.sleep(0)
+        finally:
+            cancelled.set()
+
+    async def failing():
+        yield {"name": "y", "age": 2}
+        raise RuntimeError("boom")
+
+    bio_coll._collection.find = MagicMock(  # type: ignore[method-assign]
+        side_effect=[never_ending(), failing()]
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        async for _ in bio_coll.find_all_parallel({}, [], split_points=[5]):
+            pass
+    assert cancelled.is_set()
+
+
 ########################################################################################
 # aggregate()
 
@@ -643,6 +1732,35 @@ async def test_1600__aggregate_removes_id(
     assert results == [{"val": "X"}, {"val": "Y"}]
 
 
+@pytest.mark.asyncio
+async def test_1610__aggregate_batches(bio_coll: MongoJSONSchemaValidatedCollection):
+    """Test aggregate_batches yields batch_size-d lists, setting the cursor batchSize."""
+    cursor = _FakeCursor([{"_id": i, "val": i} for i in range(5)])
+
+    if bio_coll._collection_backend == "AsyncIOMotorCollection":
+        agg_mock = MagicMock(return_value=cursor)
+    elif bio_coll._collection_backend == "AsyncCollection":
+        agg_mock = AsyncMock(return_value=cursor)
+    else:
+        raise AssertionError(
+            f"Unexpected backend in test: {bio_coll._collection_backend!r}"
+        )
+    bio_coll._collection.aggregate = agg_mock  # type: ignore[method-assign]
+
+    pipeline = [{"$match": {}}]  # type: ignore[var-annotated]
+    batches = [b async for b in bio_coll.aggregate_batches(pipeline, batch_size=2)]
+
+    # check calls & result
+    agg_mock.assert_called_once_with(
+        pipeline + [{"$project": {"_id": False}}], batchSize=2
+    )
+    assert batches == [
+        [{"val": 0}, {"val": 1}],
+        [{"val": 2}, {"val": 3}],
+        [{"val": 4}],
+    ]
+
+
 ########################################################################################
 # aggregate_one()
 
@@ -676,7 +1794,9 @@ async def test_1700__aggregate_one_returns_first_doc(
     result = await bio_coll.aggregate_one(pipeline.copy())
 
     # check calls & result
-    agg_mock.assert_called_once_with(pipeline + [{"$limit": 1}])
+    agg_mock.assert_called_once_with(
+        pipeline + [{"$limit": 1}, {"$project": {"_id": False}}]
+    )
     assert result in [{"val": "X"}, {"val": "Y"}]
 
 
@@ -708,4 +1828,245 @@ async def test_1701__aggregate_one_not_found_raises(
         await bio_coll.aggregate_one(pipeline.copy())
 
     # check calls
-    agg_mock.assert_called_once_with(pipeline + [{"$limit": 1}])
+    agg_mock.assert_called_once_with(
+        pipeline + [{"$limit": 1}, {"$project": {"_id": False}}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_1710__aggregate_one_doesnt_mutate_pipeline(bio_schema: dict):
+    """Test aggregate_one leaves the caller's pipeline as-is, across calls."""
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema
+    )
+    await coll.insert_many([{"name": "A", "age": 2}, {"name": "B", "age": 1}])
+
+    PIPELINE = [{"$sort": {"age": 1}}]
+    for _ in range(3):
+        assert await coll.aggregate_one(PIPELINE) == {"name": "B", "age": 1}
+    assert PIPELINE == [{"$sort": {"age": 1}}]
+
+
+@pytest.mark.parametrize(
+    "pipeline, expected",
+    [
+        ([], [{"$limit": 1}]),
+        ([{"$match": {}}], [{"$match": {}}, {"$limit": 1}]),
+        ([{"$match": {}}, {"$limit": 10}], [{"$match": {}}, {"$limit": 1}]),
+        ([{"$limit": 1}], [{"$limit": 1}]),
+    ],
+)
+def test_1711__pipeline_limited_to_one(pipeline: list, expected: list):
+    """Test a trailing $limit is replaced, not added to."""
+    original = copy.deepcopy(pipeline)
+    assert _pipeline_limited_to_one(pipeline) == expected
+    assert pipeline == original
+
+
+@pytest.mark.asyncio
+async def test_1720__precompiled_pipeline(bio_schema: dict):
+    """Test a PrecompiledPipeline is isolated from its source, and reusable."""
+    source: list[dict] = [{"$match": {"age": {"$gte": 2}}}, {"$sort": {"age": 1}}]
+    pipeline = PrecompiledPipeline(source)
+    source[0]["$match"] = {}  # doesn't leak in
+    source.append({"$limit": 0})
+
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema
+    )
+    await coll.insert_many([{"name": str(i), "age": i} for i in range(4)])
+    for _ in range(2):
+        assert [d["age"] async for d in coll.aggregate(pipeline)] == [2, 3]
+        assert [len(b) async for b in coll.aggregate_batches(pipeline, 1)] == [1, 1]
+        assert await coll.aggregate_one(pipeline) == {"name": "2", "age": 2}
+    assert [d["_id"] async for d in coll.aggregate(pipeline, no_id=False)]
+
+
+def test_1721__precompiled_pipeline_build():
+    """Test each variant is built once, and handed out as a new list."""
+    pipeline = PrecompiledPipeline([{"$match": {}}])
+
+    first = pipeline.build()
+    assert first == [{"$match": {}}, {"$project": {"_id": False}}]
+    first.append({"$limit": 5})
+    assert pipeline.build() == [{"$match": {}}, {"$project": {"_id": False}}]
+    assert pipeline.build() is not pipeline.build()
+
+    assert pipeline.build(no_id=False) == [{"$match": {}}]
+    assert pipeline.build(limit_one=True) == [
+        {"$match": {}},
+        {"$limit": 1},
+        {"$project": {"_id": False}},
+    ]
+    assert len(pipeline._variants) == 3
+
+
+########################################################################################
+# metrics -- the rest need 'prometheus', see mongo_jsonschema_tools_metrics_test.py
+
+
+async def test_1803__no_metrics(bio_schema: dict) -> None:
+    """Test that without metrics, nothing is recorded."""
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema
+    )
+    await coll.insert_one({"name": "a", "age": 1})
+    assert [d async for d in coll.find_all({}, [])] == [{"name": "a", "age": 1}]
+    assert coll.metrics is None
+
+
+########################################################################################
+# query shapes
+
+
+@pytest.fixture
+def shaped_coll(bio_schema: dict) -> MongoJSONSchemaValidatedCollection:
+    """A collection (in-memory backend) recording query shapes."""
+    bio_schema["properties"]["tags"] = {"type": "array", "items": {"type": "string"}}
+    bio_schema["properties"]["pets"] = {"type": "array", "items": {"type": "object"}}
+    return MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema, record_query_shapes=True
+    )
+
+
+async def test_1900__query_shapes_recorded(shaped_coll) -> None:
+    """Test each server call is tallied by its normalized shape."""
+    coll = shaped_coll
+    await coll.insert_many([{"name": str(i), "age": i} for i in range(5)])
+
+    for i in range(3):
+        await coll.find_one({"age": i})
+    await coll.find_one({"age": {"$gt": 1}}, sort=[("name", -1)])
+    assert len([d async for d in coll.find_all({"name": "1"}, [])]) == 1
+    await coll.update_many({"age": {"$lt": 2}}, {"$set": {"name": "x"}})
+    pipeline = [{"$match": {"name": "x"}}, {"$sort": {"age": 1}}, {"$limit": 5}]
+    assert len([d async for d in coll.aggregate(pipeline)]) == 2
+    await coll.aggregate_one([{"$match": {"age": 4}}])
+
+    stats = {
+        (s.operation, s.shape, s.sort): s for s in coll.query_shapes.stats.values()
+    }
+    assert set(stats) == {
+        ("find_one", '{"age": "?"}', "[]"),
+        ("find_one", '{"age": {"$gt": "?"}}', '[["name", -1]]'),
+        ("find_all", '{"name": "?"}', "[]"),
+        ("update_many", '{"age": {"$lt": "?"}}', "[]"),
+        ("aggregate", '{"name": "?"}', '[["age", 1]]'),
+        ("aggregate_one", '{"age": "?"}', "[]"),
+    }
+    s = stats["find_one", '{"age": "?"}', "[]"]
+    assert s.count == 3
+    assert 0 < s.max_seconds <= s.total_seconds
+    assert s.mean_seconds == s.total_seconds / 3
+
+
+async def test_1901__query_shapes_bounded(bio_schema: dict) -> None:
+    """Test only `max_query_shapes` distinct shapes are tallied."""
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"),
+        bio_schema,
+        record_query_shapes=True,
+        max_query_shapes=1,
+    )
+    await coll.insert_one({"name": "a", "age": 1})
+    await coll.find_one({"name": "a"})
+    await coll.find_one({"name": "a", "age": 1})  # a new shape, dropped
+    await coll.find_one({"name": "a"})
+
+    assert coll.query_shapes
+    assert [s.count for s in coll.query_shapes.stats.values()] == [2]
+    assert coll.query_shapes.n_dropped == 1
+
+
+@pytest.mark.parametrize(
+    "query, sort, expected_keys, expected_notes",
+    [
+        # equality, then sort, then range
+        (
+            {"age": {"$gte": 1}, "name": "a", "address.city": {"$in": ["x"]}},
+            [("address.zip", -1)],
+            [("address.city", 1), ("name", 1), ("address.zip", -1), ("age", 1)],
+            [],
+        ),
+        # sorting on an equality field is a no-op
+        ({"name": "a"}, {"name": 1, "age": -1}, [("name", 1), ("age", -1)], []),
+        (
+            {"$and": [{"name": "a"}, {"age": {"$lt": 3}}], "$or": [{"x": 1}]},
+            None,
+            [("name", 1), ("age", 1)],
+            ["'$or' clauses are not included -- each needs its own index"],
+        ),
+        (
+            {"nickname": "a", "tags": "b", "pets.kind": "cat"},
+            None,
+            [("nickname", 1), ("pets.kind", 1)],
+            [
+                "'nickname' is not in the schema",
+                "'pets.kind' is not in the schema",  # items have no properties
+                "'tags' is not included -- only one array field per index (already 'pets.kind')",
+            ],
+        ),
+        ({"_id": 1, "name": "a"}, None, [("_id", 1), ("name", 1)], []),
+    ],
+)
+async def test_1910__recommend_index_keys(
+    shaped_coll, query, sort, expected_keys, expected_notes
+) -> None:
+    """Test the suggested keys (& notes) for a query shape."""
+    coll = shaped_coll
+    coll.query_shapes.record("find_all", query, sort, 0.1)
+
+    recs = coll.recommend_indexes()
+    if expected_keys[0][0] == "_id":
+        assert recs == []  # served by the "_id" index
+    else:
+        assert [(r.keys, r.notes) for r in recs] == [(expected_keys, expected_notes)]
+
+
+async def test_1911__recommend_indexes_ranked_and_merged(shaped_coll) -> None:
+    """Test recommendations are slowest-first, and folded into longer prefixes."""
+    coll = shaped_coll
+    coll.query_shapes.record("find_one", {"name": "a"}, None, 1.0)
+    coll.query_shapes.record("find_all", {"name": "a"}, [("age", 1)], 0.5)
+    coll.query_shapes.record("update_many", {"age": {"$gt": 1}}, None, 2.0)
+    coll.query_shapes.record("find_all", {}, None, 9.0)  # a full scan, by design
+
+    recs = coll.recommend_indexes()
+    assert [(r.keys, r.total_seconds) for r in recs] == [
+        ([("age", 1)], 2.0),
+        ([("name", 1), ("age", 1)], 1.5),
+    ]
+    assert [s.operation for s in recs[1].shapes] == ["find_one", "find_all"]
+    assert len(coll.recommend_indexes(top=1)) == 1
+
+    report = coll.query_shape_report()
+    assert report.startswith("query shapes for 'bios' (4 tallied, 0 calls dropped):")
+    assert "-- find_all {} " not in report  # no empty sort
+    assert '-- find_all {"name": "?"} sort [["age", 1]]' in report
+    assert "[('name', 1), ('age', 1)] -- 1.500s total over 2 shape(s)" in report
+
+
+async def test_1912__recommend_indexes_skips_id_shapes(shaped_coll) -> None:
+    """Test shapes served by the "_id" index are skipped, however their keys sort."""
+    coll = shaped_coll
+    coll.query_shapes.record("find_one", {"_id": 1, "Name": "a"}, None, 1.0)
+    coll.query_shapes.record("find_one", {"_id": 1, "age": {"$gt": 1}}, None, 1.0)
+    coll.query_shapes.record("find_all", {"_id": {"$gt": 1}}, None, 1.0)
+    coll.query_shapes.record("find_all", {}, [("_id", -1)], 1.0)
+    # but, "_id" is only a range here
+    coll.query_shapes.record("find_all", {"_id": {"$gt": 1}, "name": "a"}, None, 1.0)
+
+    recs = coll.recommend_indexes()
+    assert [r.keys for r in recs] == [[("name", 1), ("_id", 1)]]
+
+
+async def test_1913__query_shapes_off(bio_schema: dict) -> None:
+    """Test that by default, nothing is recorded."""
+    coll = MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection("bios"), bio_schema
+    )
+    await coll.insert_one({"name": "a", "age": 1})
+    await coll.find_one({"name": "a"})
+    assert coll.query_shapes is None
+    with pytest.raises(RuntimeError):
+        coll.recommend_indexes()
@@ -0,0 +1,154 @@
+"""Tests for mongo_ndjson_tools.py."""
+
+import datetime as dt
+import gzip
+import json
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import jsonschema
+import pytest
+
+from wipac_dev_tools import mongo_ndjson_tools
+from wipac_dev_tools.mongo_inmemory_tools import InMemoryAsyncCollection
+from wipac_dev_tools.mongo_jsonschema_tools import MongoJSONSchemaValidatedCollection
+from wipac_dev_tools.mongo_ndjson_tools import export_ndjson, import_ndjson
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "born": {},
+    },
+    "required": ["name", "age"],
+}
+
+DOCS = [
+    {"name": f"n{i}", "age": i, "born": dt.datetime(2000, 1, 1 + i)} for i in range(7)
+]
+
+
+def make_coll(name: str) -> MongoJSONSchemaValidatedCollection:
+    return MongoJSONSchemaValidatedCollection(
+        InMemoryAsyncCollection(name),
+        SCHEMA,
+        parent_logger=logging.getLogger("test_logger"),
+    )
+
+
+async def all_docs(coll: MongoJSONSchemaValidatedCollection) -> list[dict]:
+    return [d async for d in coll.find_all({}, [])]
+
+
+########################################################################################
+
+
+@pytest.mark.parametrize("filename", ["dump.ndjson", "dump.ndjson.gz"])
+async def test_0000__round_trip(tmp_path, filename) -> None:
+    src = make_coll("src")
+    await src.insert_many([dict(d) for d in DOCS])
+    path = tmp_path / filename
+
+    assert await export_ndjson(src, path, batch_size=3) == len(DOCS)
+    if filename.endswith(".gz"):
+        with gzip.open(path, "rt") as f:
+            lines = f.readlines()
+    else:
+        lines = path.read_text().splitlines()
+    assert len(lines) == len(DOCS)
+    assert "_id" not in json.loads(lines[0])
+
+    dst = make_coll("dst")
+    assert await import_ndjson(dst, path, chunk_size=2, max_in_flight=2) == len(DOCS)
+    assert await all_docs(dst) == DOCS  # datetimes survive
+
+
+async def test_0001__export_query_and_keep_id(tmp_path) -> None:
+    src = make_coll("src")
+    await src.insert_many([dict(d) for d in DOCS])
+    path = tmp_path / "dump.ndjson"
+
+    n = await export_ndjson(src, path, query={"age": {"$gte": 5}}, no_id=False)
+    assert n == 2
+    lines = [json.loads(ln) for ln in path.read_text().splitlines()]
+    assert [ln["name"] for ln in lines] == ["n5", "n6"]
+    assert all("_id" in ln for ln in lines)
+
+
+async def test_0010__import_skips_blank_lines(tmp_path) -> None:
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"name": "a", "age": 1}\n\n{"name": "b", "age": 2}\n')
+
+    dst = make_coll("dst")
+    assert await import_ndjson(dst, path) == 2
+    assert await all_docs(dst) == [{"name": "a", "age": 1}, {"name": "b", "age": 2}]
+
+
+async def test_0011__import_invalid(tmp_path) -> None:
+    path = tmp_path / "in.ndjson"
+    path.write_text('{"name": "a", "age": 1}\n{"name": "b"}\n')
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        await import_ndjson(make_coll("dst"), path)
+
+    path.write_text('{"name": "a", "age": 1}\n{"name": \n')
+    with pytest.raises(ValueError, match="line 2"):
+        await import_ndjson(make_coll("dst"), path)
+
+
+async def test_0020__progress_logged(tmp_path, caplog) -> None:
+    src = make_coll("src")
+    await src.insert_many([dict(d) for d in DOCS])
+    path = tmp_path / "dump.ndjson"
+
+    with caplog.at_level(logging.INFO, logger=mongo_ndjson_tools.LOGGER.name):
+        await export_ndjson(src, path, batch_size=3, progress_seconds=0)
+        await import_ndjson(make_coll("dst"), path, progress_seconds=0)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(m.startswith("exported 3 docs") for m in messages)
+    assert any(m.startswith("exported 7 docs") for m in messages)
+    assert any(m.startswith("read 7 docs") for m in messages)
+    assert "imported 7 docs" in messages
+
+
+async def test_0030__main(tmp_path) -> None:
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA))
+    path = tmp_path / "dump.ndjson.gz"
+    common = [
+        "--mongo-url=mongodb://localhost",
+        "--database=db",
+        "--collection=bios",
+        f"--schema={schema_path}",
+    ]
+
+    # pymongo's async client closes async; motor's doesn't
+    async_client = MagicMock(close=AsyncMock())
+    src = make_coll("src")
+    await src.insert_many([dict(d) for d in DOCS])
+    with patch.object(
+        mongo_ndjson_tools, "_open_collection", return_value=(async_client, src)
+    ):
+        query = '{"born": {"$lt": {"$date": "2000-01-04T00:00:00Z"}}}'  # extended json
+        argv = ["export", str(path), *common, f"--query={query}"]
+        assert await mongo_ndjson_tools.main(argv) == 3
+    async_client.close.assert_awaited_once()
+
+    sync_client = MagicMock()
+    dst = make_coll("dst")
+    with patch.object(
+        mongo_ndjson_tools, "_open_collection", return_value=(sync_client, dst)
+    ):
+        assert await mongo_ndjson_tools.main(["import", str(path), *common]) == 3
+    sync_client.close.assert_called_once()
+    assert await all_docs(dst) == DOCS[:3]
+
+    # closed on error, too
+    sync_client.reset_mock()
+    with patch.object(
+        mongo_ndjson_tools, "_open_collection", return_value=(sync_client, dst)
+    ):
+        with pytest.raises(FileNotFoundError):
+            await mongo_ndjson_tools.main(["import", str(tmp_path / "nope"), *common])
+    sync_client.close.assert_called_once()
@@ -1,20 +1,32 @@
 """Tests for container_registry_tools.py"""
 
+import asyncio
+import hashlib
+import http.server
+import json
 import logging
 import os
 import random
+import threading
 import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import pytest
 import requests
 
 from wipac_dev_tools.container_registry_tools import (
+    AsyncCVMFSRegistryTools,
+    AsyncDockerHubRegistryTools,
     CVMFSRegistryTools,
     DockerHubRegistryTools,
     ImageNotFoundException,
+    _ETagCache,
+    async_scan_image_tags,
+    scan_image_tags,
 )
 
 LOGGER = logging.getLogger(__name__)
@@ -150,15 +162,13 @@ def test_2000_dockerhub_request_info_strips_v_and_returns_json(
     """request_info should strip 'v' prefix and return payload JSON."""
     payload = {"name": "4.1.5", "last_updated": "2025-09-01T12:34:56Z"}
 
-    def fake_get(url: str) -> _DummyResp:  # noqa: ANN001
+    def fake_get(url: str, timeout: float) -> _DummyResp:  # noqa: ANN001
         assert url.endswith("/4.1.5")
+        assert timeout == 30.0
         return _DummyResp(200, payload)
 
-    monkeypatch.setattr(
-        "wipac_dev_tools.container_registry_tools.requests.get", fake_get
-    )
-
     dht = DockerHubRegistryTools("icecube", "skymap_scanner")
+    monkeypatch.setattr(dht.session, "get", fake_get)
     info, tag = dht.request_info("v4.1.5")
     assert tag == "4.1.5"
     assert info == payload
@@ -169,14 +179,11 @@ def test_2010_dockerhub_request_info_http_error_raises(
 ) -> None:
     """request_info should raise ImageNotFoundException on HTTP error."""
 
-    def fake_get(url: str) -> _DummyResp:  # noqa: ANN001
+    def fake_get(url: str, timeout: float) -> _DummyResp:  # noqa: ANN001
         return _DummyResp(404, {"detail": "not found"})
 
-    monkeypatch.setattr(
-        "wipac_dev_tools.container_registry_tools.requests.get", fake_get
-    )
-
     dht = DockerHubRegistryTools("icecube", "skymap_scanner")
+    monkeypatch.setattr(dht.session, "get", fake_get)
     with pytest.raises(ImageNotFoundException):
         dht.request_info("4.1.5")
 
@@ -195,3 +202,514 @@ def test_2020_parse_image_ts_parses_last_updated() -> None:
         tzinfo=timezone.utc,
     ).timestamp()
     assert abs(ts - expected) < 1e-6
+
+
+def test_2030_dockerhub_session_is_pooled_and_reused() -> None:
+    """The session should be reused across requests, and only closed if owned."""
+    dht = DockerHubRegistryTools("icecube", "skymap_scanner", pool_maxsize=4)
+    adapter = dht.session.get_adapter("https://hub.docker.com/")
+    assert adapter._pool_maxsize == 4  # type: ignore[attr-defined]
+
+    shared = requests.Session()
+    a = DockerHubRegistryTools("icecube", "skymap_scanner", session=shared)
+    b = DockerHubRegistryTools("icecube", "other", session=shared)
+    assert a.session is b.session is shared
+    a.close()  # not owned -> still open
+    assert shared.adapters
+
+
+async def test_2100_async_dockerhub_request_infos(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """request_infos should run concurrently (up to the limit) and map misses to errors."""
+    lock = threading.Lock()
+    n_running = 0
+    max_running = 0
+
+    def fake_get(url: str, timeout: float) -> _DummyResp:  # noqa: ANN001
+        nonlocal n_running, max_running
+        with lock:
+            n_running += 1
+            max_running = max(max_running, n_running)
+        time.sleep(0.05)
+        with lock:
+            n_running -= 1
+        tag = url.rsplit("/", maxsplit=1)[1]
+        if tag == "9.9.9":
+            return _DummyResp(404, {"detail": "not found"})
+        return _DummyResp(200, {"name": tag})
+
+    adht = AsyncDockerHubRegistryTools("icecube", "skymap_scanner", max_concurrency=3)
+    monkeypatch.setattr(adht.sync_tools.session, "get", fake_get)
+
+    tags = [f"v4.1.{i}" for i in range(8)] + ["9.9.9", "v4.1.0"]
+    infos = await adht.request_infos(tags)
+
+    assert list(infos) == [f"v4.1.{i}" for i in range(8)] + ["9.9.9"]
+    assert infos["v4.1.2"] == ({"name": "4.1.2"}, "4.1.2")
+    assert isinstance(infos["9.9.9"], ImageNotFoundException)
+    assert 1 < max_running <= 3
+
+    # and one at a time
+    assert await adht.request_info("4.1.5") == ({"name": "4.1.5"}, "4.1.5")
+    with pytest.raises(ImageNotFoundException):
+        await asyncio.wait_for(adht.request_info("9.9.9"), timeout=5)
+    adht.close()
+
+
+# --------------------------------------------------------------------------------------
+# DockerHub -- tag listing, against a local stand-in
+# --------------------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def fake_hub() -> Iterator[dict[str, Any]]:
+    """Serve a local stand-in for Docker Hub's tags API, with paging & ETags.
+
+    Yields the server's state: its "url", the "tags" to serve (mutable), and
+    each request's (path, If-None-Match, status) in "requests".
+    """
+    state: dict[str, Any] = {
+        "tags": ["latest", "4", "4.1", "4.1.5", "4.0.2", "3.9.9", "test-tag"],
+        "requests": [],
+    }
+    prefix = "/v2/repositories/icecube/skymap_scanner/tags"
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urllib.parse.urlsplit(self.path)
+            if url.path.startswith(prefix + "/"):  # one tag
+                tag = url.path[len(prefix) + 1 :]
+                found = tag in state["tags"]
+                self._reply(*((200, {"name": tag}) if found else (404, {})))
+                return
+            params = urllib.parse.parse_qs(url.query)
+            page = int(params.get("page", ["1"])[0])
+            size = int(params["page_size"][0])
+            tags = state["tags"][(page - 1) * size : page * size]
+            more = page * size < len(state["tags"])
+            next_url = f"{state['url']}{url.path}?page={page + 1}&page_size={size}"
+            self._reply(
+                200,
+                {
+                    "count": len(state["tags"]),
+                    "next": next_url if more else None,
+                    "results": [{"name": t} for t in tags],
+                },
+            )
+
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if_none_match = self.headers.get("If-None-Match")
+            if status == 200 and if_none_match == etag:
+                status, body = 304, b""
+            state["requests"].append((self.path, if_none_match, status))
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    state["url"] = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _hub_tools(fake_hub: dict[str, Any], **kwargs: Any) -> DockerHubRegistryTools:
+    return DockerHubRegistryTools(
+        "icecube",
+        "skymap_scanner",
+        api_url=f"{fake_hub['url']}/v2",
+        page_size=2,
+        **kwargs,
+    )
+
+
+def test_2200_dockerhub_iter_tags_follows_pages(fake_hub: dict[str, Any]) -> None:
+    """iter_tags should yield every tag, one page (request) at a time."""
+    dht = _hub_tools(fake_hub)
+    assert [t["name"] for t in dht.iter_tags()] == fake_hub["tags"]
+    assert len(fake_hub["requests"]) == 4
+    assert list(dht.iter_x_y_z_tags()) == ["4.1.5", "4.0.2", "3.9.9"]
+
+    # and the stand-in also serves single tags
+    assert dht.request_info("v4.1.5") == ({"name": "4.1.5"}, "4.1.5")
+
+
+def test_2210_dockerhub_resolve_tag(fake_hub: dict[str, Any]) -> None:
+    """resolve_tag should resolve moving tags to X.Y.Z, and keep other existing tags."""
+    dht = _hub_tools(fake_hub)
+    assert dht.resolve_tag("latest") == "4.1.5"
+    assert dht.resolve_tag("v4") == "4.1.5"
+    assert dht.resolve_tag("4.0") == "4.0.2"
+    assert dht.resolve_tag("3.9.9") == "3.9.9"
+    assert dht.resolve_tag("test-tag") == "test-tag"
+    for tag in ["5", "4.2", "9.9.9", "nope"]:
+        with pytest.raises(ImageNotFoundException):
+            dht.resolve_tag(tag)
+
+
+def test_2220_dockerhub_tags_etag_cache(
+    fake_hub: dict[str, Any], tmp_path: Path
+) -> None:
+    """Cached pages should cost nothing within the TTL, then a 304 if unchanged."""
+    names = fake_hub["tags"][:]
+    requests_ = fake_hub["requests"]
+
+    # cold cache -> 4 pages
+    assert [
+        t["name"] for t in _hub_tools(fake_hub, cache_dir=tmp_path).iter_tags()
+    ] == names
+    assert [status for *_, status in requests_] == [200] * 4
+    assert (tmp_path / "icecube.skymap_scanner.tags.json").exists()
+
+    # fresh cache (another instance) -> no requests
+    requests_.clear()
+    dht = _hub_tools(fake_hub, cache_dir=tmp_path, cache_ttl=3600)
+    assert [t["name"] for t in dht.iter_tags()] == names
+    assert requests_ == []
+
+    # expired cache -> conditional requests, unchanged
+    dht = _hub_tools(fake_hub, cache_dir=tmp_path, cache_ttl=0)
+    assert [t["name"] for t in dht.iter_tags()] == names
+    assert [status for *_, status in requests_] == [304] * 4
+    assert all(etag for _, etag, _ in requests_)
+
+    # expired cache -> conditional requests, changed
+    requests_.clear()
+    fake_hub["tags"].insert(0, "4.2.0")
+    assert dht.resolve_tag("latest") == "4.2.0"
+    assert [status for *_, status in requests_] == [200] * 4
+
+
+def test_2230_etag_cache_concurrent_saves(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Concurrent saves (threads) should each write their own temp file."""
+    path = tmp_path / "cache" / "tags.json"
+    n_threads = 4
+    errors: list[BaseException] = []
+
+    # make every thread be mid-write at the same time
+    barrier = threading.Barrier(n_threads, timeout=5)
+    json_dump = json.dump
+
+    def dump(obj: Any, f: Any) -> None:
+        barrier.wait()
+        json_dump(obj, f)
+
+    monkeypatch.setattr("wipac_dev_tools.container_registry_tools.json.dump", dump)
+
+    def save(i: int) -> None:
+        try:
+            cache = _ETagCache(path)
+            cache.set(f"url-{i}", f'"{i}"', {"results": list(range(i * 100))})
+            cache.save()
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # the last save wins, whole -- and no temp files are left behind
+    assert not errors
+    assert len(_ETagCache(path).entries) == 1
+    assert [p.name for p in path.parent.iterdir()] == ["tags.json"]
+
+
+# --------------------------------------------------------------------------------------
+# CVMFS -- tag index
+# --------------------------------------------------------------------------------------
+
+
+def _count_scans(
+    monkeypatch: pytest.MonkeyPatch, tools: CVMFSRegistryTools
+) -> list[int]:
+    """Count each scan of the directory (one int per scan)."""
+    scans: list[int] = []
+    scan_tags = tools._scan_tags
+
+    def counted() -> list[str]:
+        scans.append(1)
+        return scan_tags()
+
+    monkeypatch.setattr(tools, "_scan_tags", counted)
+    return scans
+
+
+def test_1100_index_reused_until_dir_changes(
+    cvmfs_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The tag index should be reused until an image is added (or removed)."""
+    tools = CVMFSRegistryTools(cvmfs_dir, "skymap_scanner", index_ttl=3600)
+    scans = _count_scans(monkeypatch, tools)
+
+    assert tools.resolve_tag("latest") == "4.1.5"
+    assert tools.resolve_tag("4.0") == "4.0.2"
+    assert list(tools.iter_x_y_z_tags()) == ["4.1.5", "4.0.2", "3.9.9"]
+    assert len(scans) == 1
+
+    (cvmfs_dir / "skymap_scanner:4.2.0").mkdir()
+    os.utime(cvmfs_dir, ns=(0, cvmfs_dir.stat().st_mtime_ns + 1_000_000))
+    assert tools.resolve_tag("latest") == "4.2.0"
+    assert tools.resolve_tag("4") == "4.2.0"
+    assert tools.resolve_tag("4.1") == "4.1.5"
+    assert len(scans) == 2
+
+
+def test_1110_index_ttl(cvmfs_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """With no TTL, the directory should be scanned on every call."""
+    tools = CVMFSRegistryTools(cvmfs_dir, "skymap_scanner", index_ttl=0)
+    scans = _count_scans(monkeypatch, tools)
+
+    for _ in range(3):
+        assert tools.resolve_tag("v3") == "3.9.9"
+    assert len(scans) == 3
+
+    with pytest.raises(ImageNotFoundException):
+        tools.resolve_tag("5")
+
+
+def test_1120_index_missing_dir(tmp_path: Path) -> None:
+    """A missing directory has no tags (and isn't cached as such)."""
+    tools = CVMFSRegistryTools(tmp_path / "not-mounted", "skymap_scanner")
+    assert list(tools.iter_x_y_z_tags()) == []
+    with pytest.raises(ImageNotFoundException):
+        tools.resolve_tag("latest")
+
+
+def test_1130_index_concurrent_callers_share_one_scan(
+    cvmfs_tools: CVMFSRegistryTools, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Threads needing the index at once should wait for one scan, not each scan."""
+    scans = _count_scans(monkeypatch, cvmfs_tools)
+    scan_tags = cvmfs_tools._scan_tags
+
+    def slow_scan() -> list[str]:
+        time.sleep(0.05)
+        return scan_tags()
+
+    monkeypatch.setattr(cvmfs_tools, "_scan_tags", slow_scan)
+
+    barrier = threading.Barrier(8, timeout=5)
+    results: list[list[str]] = []
+
+    def list_tags() -> None:
+        barrier.wait()
+        results.append(list(cvmfs_tools.iter_x_y_z_tags()))
+
+    threads = [threading.Thread(target=list_tags) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [["4.1.5", "4.0.2", "3.9.9"]] * 8
+    assert len(scans) == 1
+
+
+def test_1200_resolve_tags_one_scan(
+    cvmfs_tools: CVMFSRegistryTools, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """resolve_tags should resolve all tags from one scan, mapping misses to errors."""
+    scans = _count_scans(monkeypatch, cvmfs_tools)
+
+    source_tags = ["latest", "v4", "4.0", "3.9.9", "foo", "nope", "5", "v", "4.0"]
+    resolved = cvmfs_tools.resolve_tags(source_tags)
+
+    assert len(scans) == 1
+    assert list(resolved) == source_tags[:-1]  # de-duplicated, in order
+    assert {k: v for k, v in resolved.items() if isinstance(v, str)} == {
+        "latest": "4.1.5",
+        "v4": "4.1.5",
+        "4.0": "4.0.2",
+        "3.9.9": "3.9.9",
+        "foo": "foo",
+    }
+    for tag in ["nope", "5", "v"]:
+        assert isinstance(resolved[tag], ImageNotFoundException)
+
+    # same answers, one at a time (the scan also refreshed the index)
+    for tag, expected in resolved.items():
+        if isinstance(expected, str):
+            assert cvmfs_tools.resolve_tag(tag) == expected
+    assert len(scans) == 1
+
+
+def test_1300_scan_image_tags(cvmfs_dir: Path, tmp_path: Path) -> None:
+    """scan_image_tags should match only the image's entries, by exact prefix."""
+    (cvmfs_dir / "skymap_scanner_v2:1.0.0").mkdir()  # a different image
+    (cvmfs_dir / "other:4.1.5").mkdir()
+    (cvmfs_dir / "skymap_scanner").mkdir()  # no tag
+
+    got = scan_image_tags(cvmfs_dir, "skymap_scanner")
+    assert sorted(got) == ["3.9.9", "4.0.2", "4.1.5", "feat", "foo", "test-tag"]
+    assert scan_image_tags(tmp_path / "not-mounted", "skymap_scanner") == []
+
+
+async def test_1310_async_scan_image_tags(cvmfs_dir: Path) -> None:
+    """async_scan_image_tags should give the same as scan_image_tags, from a thread."""
+    got = await async_scan_image_tags(cvmfs_dir, "skymap_scanner")
+    assert sorted(got) == sorted(scan_image_tags(cvmfs_dir, "skymap_scanner"))
+
+
+# --------------------------------------------------------------------------------------
+# async
+# --------------------------------------------------------------------------------------
+
+
+async def test_3000_async_cvmfs(cvmfs_dir: Path) -> None:
+    """AsyncCVMFSRegistryTools should give the same answers as CVMFSRegistryTools."""
+    tools = AsyncCVMFSRegistryTools(cvmfs_dir, "skymap_scanner")
+
+    assert await tools.list_x_y_z_tags() == ["4.1.5", "4.0.2", "3.9.9"]
+    assert await tools.get_image_path("foo", check_exists=True) == (
+        cvmfs_dir / "skymap_scanner:foo"
+    )
+    with pytest.raises(ImageNotFoundException):
+        await tools.get_image_path("9.9.9", check_exists=True)
+
+    resolved = await asyncio.gather(
+        *(tools.resolve_tag(t) for t in ["latest", "v4.0", "3", "foo"])
+    )
+    assert resolved == ["4.1.5", "4.0.2", "3.9.9", "foo"]
+    with pytest.raises(ImageNotFoundException):
+        await tools.resolve_tag("nope")
+
+    many = await tools.resolve_tags(t for t in ["4", "nope"])
+    assert many["4"] == "4.1.5"
+    assert isinstance(many["nope"], ImageNotFoundException)
+    tools.close()
+
+
+async def test_3001_async_cvmfs_dedicated_executor(cvmfs_dir: Path) -> None:
+    """Calls should run on the tools' own pool (or the given one), not the loop's."""
+
+    def thread_name(_: str) -> str:
+        return threading.current_thread().name
+
+    tools = AsyncCVMFSRegistryTools(cvmfs_dir, "skymap_scanner")
+    assert (await tools._run(thread_name, "")).startswith("cvmfs")
+    tools.close()
+    assert tools.executor._shutdown  # type: ignore[attr-defined]
+
+    with ThreadPoolExecutor(thread_name_prefix="mine") as executor:
+        tools = AsyncCVMFSRegistryTools(cvmfs_dir, "skymap_scanner", executor=executor)
+        assert (await tools._run(thread_name, "")).startswith("mine")
+        tools.close()  # not ours to shut down
+        assert await tools.resolve_tag("latest") == "4.1.5"
+
+
+async def test_3010_async_cvmfs_timeout_doesnt_block_loop(
+    cvmfs_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A stalled scan should time out, without blocking the event loop meanwhile."""
+    tools = AsyncCVMFSRegistryTools(
+        cvmfs_dir, "skymap_scanner", index_ttl=0, call_timeout=0.1
+    )
+    scan_tags = tools.sync_tools._scan_tags
+
+    def stalled_scan() -> list[str]:
+        time.sleep(0.5)  # ex: a stalled FUSE mount
+        return scan_tags()
+
+    monkeypatch.setattr(tools.sync_tools, "_scan_tags", stalled_scan)
+
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    with pytest.raises(asyncio.TimeoutError):
+        await tools.resolve_tags(["latest", "4"])
+    ticker.cancel()
+    assert ticks >= 5
+
+
+async def test_3100_async_dockerhub_resolve(
+    fake_hub: dict[str, Any], tmp_path: Path
+) -> None:
+    """AsyncDockerHubRegistryTools should resolve tags, from one listing for many."""
+    tools = AsyncDockerHubRegistryTools(
+        "icecube",
+        "skymap_scanner",
+        api_url=f"{fake_hub['url']}/v2",
+        page_size=2,
+        cache_dir=tmp_path,
+    )
+
+    assert await tools.list_x_y_z_tags() == ["4.1.5", "4.0.2", "3.9.9"]
+    assert await tools.resolve_tag("v4.0") == "4.0.2"
+
+    fake_hub["requests"].clear()
+    resolved = await tools.resolve_tags(["latest", "4", "test-tag", "nope"])
+    assert len(fake_hub["requests"]) == 0  # cached listing
+    assert {k: v for k, v in resolved.items() if isinstance(v, str)} == {
+        "latest": "4.1.5",
+        "4": "4.1.5",
+        "test-tag": "test-tag",
+    }
+    assert isinstance(resolved["nope"], ImageNotFoundException)
+    tools.close()
+
+
+async def test_3101_async_dockerhub_concurrent_resolves_cached(
+    fake_hub: dict[str, Any], tmp_path: Path
+) -> None:
+    """Concurrent calls sharing a `cache_dir` should each save it, without clashing."""
+    tools = AsyncDockerHubRegistryTools(
+        "icecube",
+        "skymap_scanner",
+        api_url=f"{fake_hub['url']}/v2",
+        page_size=2,
+        cache_dir=tmp_path,
+        cache_ttl=0,  # every call re-validates, then saves
+    )
+
+    calls = []
+    for _ in range(10):
+        calls += [
+            tools.resolve_tag("latest"),
+            tools.resolve_tags(["4.0", "test-tag"]),
+            tools.list_x_y_z_tags(),
+        ]
+    results = await asyncio.gather(*calls)
+    tools.close()
+
+    for i in range(0, len(results), 3):
+        assert results[i] == "4.1.5"
+        assert results[i + 1] == {"4.0": "4.0.2", "test-tag": "test-tag"}
+        assert results[i + 2] == ["4.1.5", "4.0.2", "3.9.9"]
+    assert [p.name for p in tmp_path.iterdir()] == ["icecube.skymap_scanner.tags.json"]
+
+
+async def test_3110_async_dockerhub_call_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A slow call should time out after `call_timeout`."""
+
+    def slow_get(url: str, timeout: float) -> _DummyResp:  # noqa: ANN001
+        time.sleep(0.5)
+        return _DummyResp(200, {"name": "4.1.5"})
+
+    tools = AsyncDockerHubRegistryTools("icecube", "skymap_scanner", call_timeout=0.05)
+    monkeypatch.setattr(tools.sync_tools.session, "get", slow_get)
+    with pytest.raises(asyncio.TimeoutError):
+        await tools.request_info("4.1.5")
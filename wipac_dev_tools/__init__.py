@@ -17,6 +17,8 @@ __all__ = [
     "timing_tools",
     "prometheus_tools",  # not imported above b/c module has optional dependencies
     "mongo_jsonschema_tools",  # not imported above b/c module has optional dependencies
+    "mongo_inmemory_tools",  # not imported above b/c module has optional dependencies
+    "mongo_ndjson_tools",  # not imported above b/c module has optional dependencies
 ]
 
 # NOTE: `__version__` is not defined because this package is built using 'setuptools-scm' --
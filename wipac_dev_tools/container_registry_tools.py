@@ -1,12 +1,20 @@
 """Utilities for working with container registries."""
 
+import asyncio
+import json
 import logging
+import os
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Union
+from typing import Any, Callable, Iterable, Iterator, TypeVar, Union
 
 import requests
 from dateutil import parser as dateutil_parser
+from requests.adapters import HTTPAdapter
 
 from .semver_parser_tools import (
     RE_VERSION_X,
@@ -17,6 +25,8 @@ from .semver_parser_tools import (
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class ImageNotFoundException(Exception):
     """Raised when an image (tag) cannot be found."""
@@ -27,15 +37,54 @@ class ImageNotFoundException(Exception):
 
 IMAGE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
 
+
+def scan_image_tags(images_dir: Path, image_name: str) -> list[str]:
+    """Get every tag of the image in the directory (entries named '<image_name>:<tag>').
+
+    Uses one `os.scandir` pass, filtering on the raw names--no per-entry
+    `Path` objects, pattern matching, or stat calls. A missing (or
+    unreadable) directory has no tags.
+    """
+    prefix = f"{image_name}:"
+    try:
+        with os.scandir(images_dir) as it:
+            return [e.name[len(prefix) :] for e in it if e.name.startswith(prefix)]
+    except OSError as e:
+        LOGGER.debug(f"cannot scan {images_dir}: {e!r}")
+        return []
+
+
+async def async_scan_image_tags(
+    images_dir: Path,
+    image_name: str,
+    executor: Union[Executor, None] = None,
+) -> list[str]:
+    """Run `scan_image_tags` in a worker thread (or `executor`), off of the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, scan_image_tags, images_dir, image_name
+    )
+
+
 ########################################################################################
 # REGISTRY: CVMFS -- apptainer directory/sandbox containers
 ########################################################################################
 
 
 class CVMFSRegistryTools:
-    """Tools for working with CVMFS images directory."""
+    """Tools for working with CVMFS images directory.
+
+    The 'X.Y.Z' tags are indexed from one scan of the directory, which is
+    reused until the directory's mtime changes (an image was added or
+    removed) or `index_ttl` seconds pass. Use `index_ttl=0` to always scan.
+    Thread-safe: concurrent callers wait for (and reuse) one scan at a time.
+    """
 
-    def __init__(self, cvmfs_images_dir: Path, image_name: str):
+    def __init__(
+        self,
+        cvmfs_images_dir: Path,
+        image_name: str,
+        index_ttl: float = 60.0,
+    ):
 
         # ex: /cvmfs/icecube.opensciencegrid.org/containers/realtime/
         self.cvmfs_images_dir = cvmfs_images_dir
@@ -45,6 +94,13 @@ class CVMFSRegistryTools:
             raise ValueError("'image_name' is invalid.")
         self.image_name = image_name
 
+        self.index_ttl = index_ttl
+        # guards the index & its mtime/build time, which are updated together
+        self._index_lock = threading.Lock()
+        self._index: Union[_XYZTagIndex, None] = None
+        self._index_mtime: Union[int, None] = None
+        self._index_built = 0.0
+
     def get_image_path(
         self,
         tag: str,
@@ -61,29 +117,45 @@ class CVMFSRegistryTools:
 
         return dpath
 
-    def iter_x_y_z_tags(self) -> Iterable[str]:
-        """Iterate over all 'X.Y.Z' skymap scanner tags on CVMFS, newest semver to oldest."""
-        x_y_z_tags: list[tuple[tuple[int, int, int], str]] = []
+    def _scan_tags(self) -> list[str]:
+        """Get every tag of the image on CVMFS, from one scan of the directory."""
+        return scan_image_tags(self.cvmfs_images_dir, self.image_name)
 
-        for p in self.cvmfs_images_dir.glob(f"{self.image_name}:*"):
-            try:
-                tag = p.name.split(":", maxsplit=1)[1]
-            except IndexError:
-                continue
-            if not RE_VERSION_X_Y_Z.fullmatch(tag):
-                continue
-            parts = tag.split(".")
-            x_y_z_tags.append(
-                (
-                    (int(parts[0]), int(parts[1]), int(parts[2])),
-                    tag,
-                )
-            )
+    def _get_dir_mtime(self) -> Union[int, None]:
+        try:
+            return self.cvmfs_images_dir.stat().st_mtime_ns
+        except OSError:
+            return None  # ex: not mounted -- nothing to find, but check every time
 
-        # yield tags in reverse semver order (v4.0.1 before v3.9.8)
-        # -> sort by 'x_y_z' (tuple), yield 'tag' (str)
-        for _, tag in sorted(x_y_z_tags, key=lambda t: t[0], reverse=True):
-            yield tag
+    def _build_index(
+        self, mtime: Union[int, None], tags: Iterable[str]
+    ) -> "_XYZTagIndex":
+        """(Re)build the index from the scanned tags -- hold `_index_lock`.
+
+        `mtime` must be read before the scan, so a change mid-scan triggers the next.
+        """
+        LOGGER.debug(f"indexing tags on cvmfs: {self.cvmfs_images_dir}")
+        self._index = _XYZTagIndex(tags)
+        self._index_mtime = mtime
+        self._index_built = time.monotonic()
+        return self._index
+
+    def _get_index(self) -> "_XYZTagIndex":
+        """Get the index of 'X.Y.Z' tags, re-scanning if it may be stale."""
+        with self._index_lock:
+            mtime = self._get_dir_mtime()
+            if (
+                self._index is None
+                or mtime is None
+                or mtime != self._index_mtime
+                or time.monotonic() - self._index_built >= self.index_ttl
+            ):
+                return self._build_index(mtime, self._scan_tags())
+            return self._index
+
+    def iter_x_y_z_tags(self) -> Iterable[str]:
+        """Iterate over all 'X.Y.Z' skymap scanner tags on CVMFS, newest semver to oldest."""
+        yield from self._get_index().tags
 
     def resolve_tag(self, source_tag: str) -> str:
         """Get the 'X.Y.Z' tag on CVMFS corresponding to `source_tag`.
@@ -113,22 +185,116 @@ class CVMFSRegistryTools:
             pass
 
         # step 2: was the tag a non-specific tag (like 'latest', 'v4.1', 'v4', etc.)
-        # -- case 1: user gave 'latest'
-        if source_tag == "latest":
-            for t in self.iter_x_y_z_tags():
-                LOGGER.debug(f"resolved 'latest' to youngest X.Y.Z tag: {t}")
-                return t
-        # -- case 2: user gave an non-specific semver tag (like 'v4.1', 'v4', etc.)
-        elif RE_VERSION_X_Y.fullmatch(source_tag) or RE_VERSION_X.fullmatch(source_tag):
-            for t in self.iter_x_y_z_tags():
-                # ex: '3.1.4' startswith '3.1.'
-                if t.startswith(source_tag + "."):
-                    LOGGER.debug(f"resolved '{source_tag}' to '{t}'")
-                    return t
+        if t := self._get_index().resolve(source_tag):
+            LOGGER.debug(f"resolved '{source_tag}' to '{t}'")
+            return t
 
         # fall-through
         raise ImageNotFoundException(source_tag)
 
+    def resolve_tags(
+        self,
+        source_tags: Iterable[str],
+    ) -> dict[str, Union[str, ImageNotFoundException]]:
+        """Get the 'X.Y.Z' tag on CVMFS corresponding to each of `source_tags`.
+
+        Like `resolve_tag`, but all are resolved from one (fresh) scan of
+        the directory, which also refreshes the index. Each source tag maps
+        to its resolved tag, or to its `ImageNotFoundException` (instead of
+        raising on the first miss).
+        """
+        unique_tags = list(dict.fromkeys(source_tags))
+        LOGGER.info(f"checking {len(unique_tags)} tags exist on cvmfs")
+
+        with self._index_lock:
+            mtime = self._get_dir_mtime()
+            existing = set(self._scan_tags())  # each lookup below is O(1)
+            index = self._build_index(mtime, existing)
+
+        resolved: dict[str, Union[str, ImageNotFoundException]] = {}
+        for source_tag in unique_tags:
+            try:
+                tag = strip_v_prefix(source_tag)
+            except ValueError as e:
+                error = ImageNotFoundException(source_tag)
+                error.__cause__ = e
+                resolved[source_tag] = error
+                continue
+
+            if tag in existing:
+                resolved[source_tag] = tag
+            elif t := index.resolve(tag):
+                resolved[source_tag] = t
+            else:
+                resolved[source_tag] = ImageNotFoundException(tag)
+            LOGGER.debug(f"resolved '{source_tag}' to {resolved[source_tag]!r}")
+        return resolved
+
+
+class AsyncCVMFSRegistryTools:
+    """Async tools for working with CVMFS images directory.
+
+    Each blocking filesystem call (see `CVMFSRegistryTools`) runs in a
+    worker thread of a dedicated pool (or `executor`), so a stalled FUSE
+    mount doesn't block the event loop. Each call gives up after
+    `call_timeout` seconds, raising `asyncio.TimeoutError`--but the thread
+    itself can't be interrupted, so it runs on until the filesystem answers.
+    Since that only ties up the dedicated pool, the loop's default executor
+    (used by everything else) is left alone.
+    """
+
+    def __init__(
+        self,
+        cvmfs_images_dir: Path,
+        image_name: str,
+        index_ttl: float = 60.0,
+        call_timeout: Union[float, None] = 60.0,
+        executor: Union[Executor, None] = None,
+    ):
+        self.sync_tools = CVMFSRegistryTools(
+            cvmfs_images_dir, image_name, index_ttl=index_ttl
+        )
+        self.call_timeout = call_timeout
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="cvmfs"
+        )
+
+    def close(self) -> None:
+        """Shut down the worker threads, unless the executor was passed in."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run the blocking call in a worker thread (within the timeout)."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self.executor, func, *args), self.call_timeout
+        )
+
+    async def get_image_path(self, tag: str, check_exists: bool = False) -> Path:
+        """See `CVMFSRegistryTools.get_image_path`."""
+        return await self._run(self.sync_tools.get_image_path, tag, check_exists)
+
+    async def list_x_y_z_tags(self) -> list[str]:
+        """See `CVMFSRegistryTools.iter_x_y_z_tags`."""
+        return await self._run(lambda: list(self.sync_tools.iter_x_y_z_tags()))
+
+    async def resolve_tag(self, source_tag: str) -> str:
+        """See `CVMFSRegistryTools.resolve_tag`."""
+        return await self._run(self.sync_tools.resolve_tag, source_tag)
+
+    async def resolve_tags(
+        self,
+        source_tags: Iterable[str],
+    ) -> dict[str, Union[str, ImageNotFoundException]]:
+        """See `CVMFSRegistryTools.resolve_tags`.
+
+        All are resolved from one scan, which beats resolving each
+        concurrently: their scans would contend for the same mount.
+        """
+        return await self._run(self.sync_tools.resolve_tags, list(source_tags))
+
 
 ########################################################################################
 # REGISTRY: DOCKER HUB
@@ -136,16 +302,55 @@ class CVMFSRegistryTools:
 
 
 class DockerHubRegistryTools:
-    """Tools for working with the Docker Hub API."""
+    """Tools for working with the Docker Hub API.
+
+    Requests go through one `requests.Session`, so connections are pooled &
+    reused (up to `pool_maxsize` at once), and time out after `timeout` seconds.
+    Pass `session` to share one between instances.
 
-    def __init__(self, image_namespace: str, image_name: str):
+    Use `cache_dir` to cache the tag list's pages on disk (see `iter_tags`).
+    Use `api_url` to point at a different (ex: local, stand-in) server.
+    """
+
+    def __init__(
+        self,
+        image_namespace: str,
+        image_name: str,
+        session: Union[requests.Session, None] = None,
+        timeout: float = 30.0,
+        pool_maxsize: int = 10,
+        api_url: str = "https://hub.docker.com/v2",
+        cache_dir: Union[Path, None] = None,
+        cache_ttl: float = 300.0,
+        page_size: int = 100,
+    ):
         if not IMAGE_NAME_PATTERN.fullmatch(image_namespace):
             raise ValueError("'image_namespace' is invalid.")
 
         if not IMAGE_NAME_PATTERN.fullmatch(image_name):
             raise ValueError("'image_name' is invalid.")
 
-        self.api_tags_url = f"https://hub.docker.com/v2/repositories/{image_namespace}/{image_name}/tags"
+        self.api_tags_url = (
+            f"{api_url.rstrip('/')}/repositories/{image_namespace}/{image_name}/tags"
+        )
+
+        # ex: <cache_dir>/icecube.skymap_scanner.tags.json
+        self.cache_path = (
+            Path(cache_dir) / f"{image_namespace}.{image_name}.tags.json"
+            if cache_dir is not None
+            else None
+        )
+        self.cache_ttl = cache_ttl
+        self.page_size = page_size
+
+        self.timeout = timeout
+        self._owns_session = session is None
+        self.session = session or _make_pooled_session(pool_maxsize)
+
+    def close(self) -> None:
+        """Close the session, unless it was passed in."""
+        if self._owns_session:
+            self.session.close()
 
     def request_info(self, tag: str) -> tuple[dict, str]:
         """Get the json dict from GET @ Docker Hub, and the non v-prefixed tag (see below).
@@ -163,7 +368,9 @@ class DockerHubRegistryTools:
         # look for tag on docker hub
         try:
             LOGGER.debug(f"looking at {self.api_tags_url} for {tag}...")
-            r = requests.get(f"{self.api_tags_url.rstrip('/')}/{tag}")
+            r = self.session.get(
+                f"{self.api_tags_url.rstrip('/')}/{tag}", timeout=self.timeout
+            )
             r.raise_for_status()
             resp = r.json()
         # -> http issue
@@ -180,6 +387,98 @@ class DockerHubRegistryTools:
         LOGGER.debug(resp)
         return resp, tag
 
+    def _get_page(self, url: str, cache: Union["_ETagCache", None]) -> dict:
+        """GET the json page, or reuse/re-validate the cached one."""
+        entry = cache.entries.get(url) if cache is not None else None
+        if entry is not None and time.time() - entry["fetched"] < self.cache_ttl:
+            LOGGER.debug(f"using cached page: {url}")
+            return entry["body"]  # type: ignore[no-any-return]
+
+        headers = {}
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if entry is not None and r.status_code == 304:
+            LOGGER.debug(f"cached page is still valid: {url}")
+            body = entry["body"]
+        else:
+            r.raise_for_status()
+            body = r.json()
+        if cache is not None:
+            # a 304 may omit the ETag -- keep the one we had
+            etag = r.headers.get("ETag") or (entry["etag"] if entry else None)
+            cache.set(url, etag, body)
+        return body  # type: ignore[no-any-return]
+
+    def iter_tags(self) -> Iterator[dict]:
+        """Iterate over each tag's info (like `request_info`'s), following the pages.
+
+        If `cache_dir` was given, each page is cached on disk: for
+        `cache_ttl` seconds it's reused without a request, then it's
+        re-validated with its ETag (an unchanged page costs a 304, no body).
+        """
+        LOGGER.info(f"listing tags on docker hub: {self.api_tags_url}")
+
+        cache = _ETagCache(self.cache_path) if self.cache_path else None
+        url: Union[str, None] = f"{self.api_tags_url}?page_size={self.page_size}"
+        try:
+            while url:
+                page = self._get_page(url, cache)
+                yield from page.get("results", [])
+                url = page.get("next")
+        finally:
+            if cache is not None:
+                cache.save()
+
+    def iter_x_y_z_tags(self) -> Iterable[str]:
+        """Iterate over all 'X.Y.Z' tags on Docker Hub, newest semver to oldest."""
+        yield from _sorted_x_y_z_tags(info["name"] for info in self.iter_tags())
+
+    def resolve_tag(self, source_tag: str) -> str:
+        """Get the 'X.Y.Z' tag on Docker Hub corresponding to `source_tag`.
+
+        Unlike on CVMFS, 'latest', 'X', and 'X.Y' are (moving) tags on Docker
+        Hub, so these are always resolved to an 'X.Y.Z' tag. Any other tag
+        is returned if it exists.
+
+        Examples:
+            3.4.5     ->  3.4.5
+            3.1       ->  3.1.5 (forever)
+            3         ->  3.3.5 (on 2023/03/08)
+            latest    ->  3.4.2 (on 2023/03/15)
+            test-foo  ->  test-foo
+            typO_t4g  ->  `ImageNotFoundException`
+        """
+        LOGGER.info(f"resolving tag on docker hub: {source_tag}")
+        names = [info["name"] for info in self.iter_tags()]
+        return _resolve_listed_tag(source_tag, set(names), _XYZTagIndex(names))
+
+    def resolve_tags(
+        self,
+        source_tags: Iterable[str],
+    ) -> dict[str, Union[str, ImageNotFoundException]]:
+        """Get the 'X.Y.Z' tag on Docker Hub corresponding to each of `source_tags`.
+
+        Like `resolve_tag`, but all are resolved from one listing of the
+        tags. Each source tag maps to its resolved tag, or to its
+        `ImageNotFoundException` (instead of raising on the first miss).
+        """
+        unique_tags = list(dict.fromkeys(source_tags))
+        LOGGER.info(f"resolving {len(unique_tags)} tags on docker hub")
+
+        names = [info["name"] for info in self.iter_tags()]
+        existing = set(names)
+        index = _XYZTagIndex(names)
+
+        resolved: dict[str, Union[str, ImageNotFoundException]] = {}
+        for source_tag in unique_tags:
+            try:
+                resolved[source_tag] = _resolve_listed_tag(source_tag, existing, index)
+            except ImageNotFoundException as e:
+                resolved[source_tag] = e
+        return resolved
+
     @staticmethod
     def parse_image_ts(info: dict) -> float:
         """Get the timestamp for when the image was created."""
@@ -188,3 +487,198 @@ class DockerHubRegistryTools:
         except Exception as e:
             LOGGER.exception(e)
             raise e
+
+
+def _sorted_x_y_z_tags(tags: Iterable[str]) -> list[str]:
+    """Get the 'X.Y.Z' tags (skipping any others), newest semver to oldest."""
+    x_y_z_tags: list[tuple[tuple[int, int, int], str]] = []
+    for tag in tags:
+        if not RE_VERSION_X_Y_Z.fullmatch(tag):
+            continue
+        parts = tag.split(".")
+        x_y_z_tags.append(((int(parts[0]), int(parts[1]), int(parts[2])), tag))
+
+    # reverse semver order (v4.0.1 before v3.9.8)
+    # -> sort by 'x_y_z' (tuple), keep 'tag' (str)
+    return [tag for _, tag in sorted(x_y_z_tags, key=lambda t: t[0], reverse=True)]
+
+
+def _resolve_listed_tag(
+    source_tag: str,
+    existing: set[str],
+    index: "_XYZTagIndex",
+) -> str:
+    """Resolve the tag against the registry's listed tags (see `DockerHubRegistryTools.resolve_tag`)."""
+    try:
+        source_tag = strip_v_prefix(source_tag)
+    except ValueError as e:
+        raise ImageNotFoundException(source_tag) from e
+
+    if (
+        source_tag == "latest"
+        or RE_VERSION_X_Y.fullmatch(source_tag)
+        or RE_VERSION_X.fullmatch(source_tag)
+    ):
+        if t := index.resolve(source_tag):
+            LOGGER.debug(f"resolved '{source_tag}' to '{t}'")
+            return t
+    elif source_tag in existing:
+        return source_tag
+
+    # fall-through
+    raise ImageNotFoundException(source_tag)
+
+
+class _XYZTagIndex:
+    """The 'X.Y.Z' tags (newest semver first), and the newest per 'X' & 'X.Y'."""
+
+    def __init__(self, tags: Iterable[str]) -> None:
+        self.tags = _sorted_x_y_z_tags(tags)
+        # ex: {"4": "4.1.5", "4.1": "4.1.5", "4.0": "4.0.2", ...}
+        self.newest: dict[str, str] = {}
+        for tag in self.tags:
+            x, y, _ = tag.split(".")
+            self.newest.setdefault(x, tag)
+            self.newest.setdefault(f"{x}.{y}", tag)
+
+    def resolve(self, source_tag: str) -> Union[str, None]:
+        """Get the newest 'X.Y.Z' tag for 'latest', 'X', or 'X.Y' (otherwise, None)."""
+        if source_tag == "latest":
+            return self.tags[0] if self.tags else None
+        return self.newest.get(source_tag)
+
+
+class _ETagCache:
+    """Json responses by url, with their ETag & fetch time, kept in a json file.
+
+    A missing or unreadable file is an empty cache. Saves are atomic (each
+    writes its own temp file, then renames it over the file), so concurrent
+    threads & processes can share the file (the last save wins).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._changed = False
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def set(self, url: str, etag: Union[str, None], body: dict) -> None:
+        """Set the response, fetched (or re-validated) now."""
+        self.entries[url] = {"etag": etag, "fetched": time.time(), "body": body}
+        self._changed = True
+
+    def save(self) -> None:
+        """Write the file, if anything changed."""
+        if not self._changed:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._changed = False
+
+
+def _make_pooled_session(pool_maxsize: int) -> requests.Session:
+    """Make a session that keeps up to `pool_maxsize` connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class AsyncDockerHubRegistryTools:
+    """Async tools for working with the Docker Hub API.
+
+    Each blocking call (see `DockerHubRegistryTools`) runs in a thread, so
+    the event loop isn't blocked. Up to `max_concurrency` run at once, sharing
+    the pooled session. Each request times out after `timeout` seconds; use
+    `call_timeout` to also bound each whole call (ex: listing every page),
+    raising `asyncio.TimeoutError`. Any other arguments (ex: `cache_dir`) are
+    passed to `DockerHubRegistryTools`.
+    """
+
+    def __init__(
+        self,
+        image_namespace: str,
+        image_name: str,
+        max_concurrency: int = 10,
+        session: Union[requests.Session, None] = None,
+        timeout: float = 30.0,
+        call_timeout: Union[float, None] = None,
+        **kwargs: Any,
+    ):
+        self.sync_tools = DockerHubRegistryTools(
+            image_namespace,
+            image_name,
+            session=session,
+            timeout=timeout,
+            pool_maxsize=max_concurrency,
+            **kwargs,
+        )
+        self.call_timeout = call_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def close(self) -> None:
+        """Close the session, unless it was passed in."""
+        self.sync_tools.close()
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run the blocking call in a thread (within the concurrency limit & timeout)."""
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                asyncio.to_thread(func, *args), self.call_timeout
+            )
+
+    async def request_info(self, tag: str) -> tuple[dict, str]:
+        """See `DockerHubRegistryTools.request_info`."""
+        return await self._run(self.sync_tools.request_info, tag)
+
+    async def list_x_y_z_tags(self) -> list[str]:
+        """See `DockerHubRegistryTools.iter_x_y_z_tags`."""
+        return await self._run(lambda: list(self.sync_tools.iter_x_y_z_tags()))
+
+    async def resolve_tag(self, source_tag: str) -> str:
+        """See `DockerHubRegistryTools.resolve_tag`."""
+        return await self._run(self.sync_tools.resolve_tag, source_tag)
+
+    async def resolve_tags(
+        self,
+        source_tags: Iterable[str],
+    ) -> dict[str, Union[str, ImageNotFoundException]]:
+        """See `DockerHubRegistryTools.resolve_tags` (one listing for all)."""
+        return await self._run(self.sync_tools.resolve_tags, list(source_tags))
+
+    async def request_infos(
+        self,
+        tags: Iterable[str],
+    ) -> dict[str, Union[tuple[dict, str], ImageNotFoundException]]:
+        """Get each tag's `request_info`, concurrently.
+
+        A tag that isn't found maps to its `ImageNotFoundException`, instead
+        of raising; any other exception is raised.
+        """
+        unique_tags = list(dict.fromkeys(tags))
+        results = await asyncio.gather(
+            *(self.request_info(t) for t in unique_tags),
+            return_exceptions=True,
+        )
+
+        infos: dict[str, Union[tuple[dict, str], ImageNotFoundException]] = {}
+        for tag, result in zip(unique_tags, results):
+            if isinstance(result, BaseException) and not isinstance(
+                result, ImageNotFoundException
+            ):
+                raise result
+            infos[tag] = result
+        return infos
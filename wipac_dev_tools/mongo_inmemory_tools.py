@@ -0,0 +1,569 @@
+"""An in-memory stand-in for an async mongo collection.
+
+Intended for tests, benchmarks, and load-testing code built on
+`mongo_jsonschema_tools.MongoJSONSchemaValidatedCollection`, without a live
+MongoDB. Only the basics are supported--see `InMemoryAsyncCollection`.
+"""
+
+import copy
+import functools
+from typing import Any, Iterable, Mapping, Union
+
+# mongo imports
+try:
+    from bson import ObjectId
+    from pymongo import (
+        DeleteMany,
+        DeleteOne,
+        InsertOne,
+        ReplaceOne,
+        ReturnDocument,
+        UpdateMany,
+        UpdateOne,
+    )
+    from pymongo.errors import DuplicateKeyError
+    from pymongo.results import (
+        BulkWriteResult,
+        DeleteResult,
+        InsertManyResult,
+        InsertOneResult,
+        UpdateResult,
+    )
+except (ImportError, ModuleNotFoundError) as _exc:
+    raise ImportError(
+        "the 'mongo' option must be installed in order to use 'mongo_inmemory_tools'"
+    ) from _exc
+
+
+_MISSING = object()
+
+
+class InMemoryAsyncCursor:
+    """An async cursor over a fixed list of docs (like `AsyncCursor`)."""
+
+    def __init__(self, docs: list[dict]) -> None:
+        self._docs = docs
+        self._i = 0
+
+    def __aiter__(self) -> "InMemoryAsyncCursor":
+        return self
+
+    async def __anext__(self) -> dict:
+        if self._i >= len(self._docs):
+            raise StopAsyncIteration
+        self._i += 1
+        return self._docs[self._i - 1]
+
+    async def to_list(self, length: Union[int, None] = None) -> list[dict]:
+        """Get the next `length` docs (or all the remaining)."""
+        end = len(self._docs) if length is None else self._i + length
+        out = self._docs[self._i : end]
+        self._i += len(out)
+        return out
+
+
+class InMemoryAsyncCollection:
+    """An in-memory stand-in for pymongo's `AsyncCollection` (the basics).
+
+    Supports `insert_one`, `insert_many`, `find_one`, `find`,
+    `find_one_and_update`, `update_one`, `update_many`, `delete_one`,
+    `delete_many`, `bulk_write`, and `aggregate`.
+
+    Queries: equality (dotted keys, array membership), `$eq`, `$ne`, `$gt`,
+    `$gte`, `$lt`, `$lte`, `$in`, `$nin`, `$exists`, `$not`, `$and`, `$or`,
+    and `$nor`.
+
+    Updates: `$set`, `$setOnInsert`, `$unset`, `$inc`, `$push`, and
+    `$addToSet` (the latter two with or without `$each`, but no other
+    modifiers). Dotted keys can index arrays (ex: "tags.0").
+
+    Aggregate stages: `$match`, `$project`, `$unset`, `$sort`, `$skip`, and `$limit`.
+
+    Anything else raises `NotImplementedError`. Docs are copied in and out,
+    like they would be (de)serialized by a real driver.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._docs: dict[Any, dict] = {}  # by '_id', in insertion order
+
+    ####################################################################
+    # WRITES
+    ####################################################################
+
+    def _insert(self, doc: dict) -> Any:
+        # like the driver, set the '_id' on the caller's doc
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error: _id={doc['_id']!r}")
+        self._docs[doc["_id"]] = copy.deepcopy(doc)
+        return doc["_id"]
+
+    async def insert_one(self, document: dict, **_kwargs: Any) -> InsertOneResult:
+        """Insert the doc."""
+        return InsertOneResult(self._insert(document), acknowledged=True)
+
+    async def insert_many(
+        self,
+        documents: Iterable[dict],
+        **_kwargs: Any,
+    ) -> InsertManyResult:
+        """Insert the docs."""
+        return InsertManyResult(
+            [self._insert(doc) for doc in documents], acknowledged=True
+        )
+
+    def _update(
+        self,
+        filter: Mapping[str, Any],
+        update: Mapping[str, Any],
+        upsert: bool,
+        many: bool,
+    ) -> tuple[list[dict], Union[dict, None]]:
+        """Update in place; return the matched docs (pre-update copies) & any upserted doc."""
+        matched = [d for d in self._docs.values() if _matches(d, filter)]
+        if not many:
+            matched = matched[:1]
+
+        befores = []
+        for doc in matched:
+            befores.append(copy.deepcopy(doc))
+            _apply_update(doc, update, is_insert=False)
+
+        upserted = None
+        if upsert and not matched:
+            upserted = {
+                k: v
+                for k, v in filter.items()
+                if not k.startswith("$") and not _is_operator_dict(v)
+            }
+            _apply_update(upserted, update, is_insert=True)
+            self._insert(upserted)
+        return befores, upserted
+
+    async def find_one_and_update(
+        self,
+        filter: Mapping[str, Any],
+        update: Mapping[str, Any],
+        projection: Union[Mapping[str, Any], list, None] = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        **_kwargs: Any,
+    ) -> Union[dict, None]:
+        """Update the first matching doc; return it (before or after the update)."""
+        befores, upserted = self._update(filter, update, upsert, many=False)
+        if upserted is not None:
+            if return_document == ReturnDocument.BEFORE:
+                return None
+            return _project(self._docs[upserted["_id"]], projection)
+        if not befores:
+            return None
+        if return_document == ReturnDocument.BEFORE:
+            return _project(befores[0], projection)
+        return _project(self._docs[befores[0]["_id"]], projection)
+
+    async def update_one(
+        self,
+        filter: Mapping[str, Any],
+        update: Mapping[str, Any],
+        upsert: bool = False,
+        **_kwargs: Any,
+    ) -> UpdateResult:
+        """Update the first matching doc."""
+        return self._update_result(*self._update(filter, update, upsert, many=False))
+
+    async def update_many(
+        self,
+        filter: Mapping[str, Any],
+        update: Mapping[str, Any],
+        upsert: bool = False,
+        **_kwargs: Any,
+    ) -> UpdateResult:
+        """Update all matching docs."""
+        return self._update_result(*self._update(filter, update, upsert, many=True))
+
+    def _replace(
+        self,
+        filter: Mapping[str, Any],
+        replacement: dict,
+        upsert: bool,
+    ) -> tuple[list[dict], Union[dict, None]]:
+        """Replace the first matching doc; same return value as `_update()`."""
+        for _id, doc in self._docs.items():
+            if _matches(doc, filter):
+                self._docs[_id] = {"_id": _id, **copy.deepcopy(replacement)}
+                return [doc], None
+        if upsert:
+            upserted = copy.deepcopy(replacement)
+            self._insert(upserted)
+            return [], upserted
+        return [], None
+
+    async def bulk_write(
+        self,
+        requests: list[Any],
+        **_kwargs: Any,
+    ) -> BulkWriteResult:
+        """Apply each write operation in order (`ordered` is ignored)."""
+        result: dict[str, Any] = {
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+            "writeErrors": [],
+            "writeConcernErrors": [],
+        }
+        for i, op in enumerate(requests):
+            # NOTE: the operations don't have public accessors
+            if isinstance(op, InsertOne):
+                self._insert(op._doc)  # type: ignore[arg-type]
+                result["nInserted"] += 1
+                continue
+            elif isinstance(op, (DeleteOne, DeleteMany)):
+                result["nRemoved"] += self._delete(
+                    op._filter, isinstance(op, DeleteMany)
+                )
+                continue
+            elif isinstance(op, ReplaceOne):
+                res = self._update_result(
+                    *self._replace(op._filter, op._doc, bool(op._upsert))  # type: ignore[arg-type]
+                )
+            elif isinstance(op, (UpdateOne, UpdateMany)):
+                res = self._update_result(
+                    *self._update(
+                        op._filter,
+                        op._doc,  # type: ignore[arg-type]
+                        bool(op._upsert),
+                        isinstance(op, UpdateMany),
+                    )
+                )
+            else:
+                raise NotImplementedError(f"bulk write operation: {op!r}")
+
+            result["nMatched"] += res.matched_count
+            result["nModified"] += res.modified_count
+            if res.upserted_id is not None:
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": i, "_id": res.upserted_id})
+
+        return BulkWriteResult(result, acknowledged=True)
+
+    def _delete(self, filter: Mapping[str, Any], many: bool) -> int:
+        matched = [_id for _id, d in self._docs.items() if _matches(d, filter)]
+        if not many:
+            matched = matched[:1]
+        for _id in matched:
+            del self._docs[_id]
+        return len(matched)
+
+    async def delete_one(
+        self, filter: Mapping[str, Any], **_kwargs: Any
+    ) -> DeleteResult:
+        """Delete the first matching doc."""
+        return DeleteResult({"n": self._delete(filter, many=False)}, acknowledged=True)
+
+    async def delete_many(
+        self, filter: Mapping[str, Any], **_kwargs: Any
+    ) -> DeleteResult:
+        """Delete all matching docs."""
+        return DeleteResult({"n": self._delete(filter, many=True)}, acknowledged=True)
+
+    def _update_result(
+        self,
+        befores: list[dict],
+        upserted: Union[dict, None],
+    ) -> UpdateResult:
+        raw: dict[str, Any] = {
+            "n": len(befores),
+            "nModified": sum(1 for b in befores if self._docs[b["_id"]] != b),
+        }
+        if upserted is not None:
+            raw.update({"n": 1, "upserted": upserted["_id"]})
+        return UpdateResult(raw, acknowledged=True)
+
+    ####################################################################
+    # READS
+    ####################################################################
+
+    def _find(
+        self,
+        filter: Union[Mapping[str, Any], None],
+        projection: Union[Mapping[str, Any], list, None],
+        sort: Union[list[tuple[str, int]], None] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> list[dict]:
+        docs = [d for d in self._docs.values() if _matches(d, filter or {})]
+        if sort:
+            docs = _sort(docs, dict(sort))
+        docs = docs[skip : (skip + limit) if limit else None]
+        return [_project(d, projection) for d in docs]
+
+    async def find_one(
+        self,
+        filter: Union[Mapping[str, Any], None] = None,
+        projection: Union[Mapping[str, Any], list, None] = None,
+        **kwargs: Any,
+    ) -> Union[dict, None]:
+        """Find the first matching doc."""
+        docs = self._find(filter, projection, kwargs.get("sort"), limit=1)
+        return docs[0] if docs else None
+
+    def find(
+        self,
+        filter: Union[Mapping[str, Any], None] = None,
+        projection: Union[Mapping[str, Any], list, None] = None,
+        sort: Union[list[tuple[str, int]], None] = None,
+        skip: int = 0,
+        limit: int = 0,
+        **_kwargs: Any,
+    ) -> InMemoryAsyncCursor:
+        """Find all matching docs (`batch_size` & other cursor options are ignored)."""
+        return InMemoryAsyncCursor(self._find(filter, projection, sort, skip, limit))
+
+    async def aggregate(
+        self,
+        pipeline: list[dict],
+        **_kwargs: Any,
+    ) -> InMemoryAsyncCursor:
+        """Run the pipeline -- a coroutine, like `AsyncCollection.aggregate`."""
+        docs = [copy.deepcopy(d) for d in self._docs.values()]
+        for stage in pipeline:
+            ((name, spec),) = stage.items()
+            if name == "$match":
+                docs = [d for d in docs if _matches(d, spec)]
+            elif name == "$project":
+                docs = [_project(d, spec) for d in docs]
+            elif name == "$unset":
+                fields = [spec] if isinstance(spec, str) else spec
+                docs = [_project(d, dict.fromkeys(fields, 0)) for d in docs]
+            elif name == "$sort":
+                docs = _sort(docs, spec)
+            elif name == "$skip":
+                docs = docs[spec:]
+            elif name == "$limit":
+                docs = docs[:spec]
+            else:
+                raise NotImplementedError(f"aggregate stage: {name}")
+        return InMemoryAsyncCursor(docs)
+
+
+########################################################################################
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and bool(value)
+        and all(k.startswith("$") for k in value)
+    )
+
+
+def _get(doc: Any, dotted_key: str) -> Any:
+    """Get the value at the (dotted) key, or `_MISSING`."""
+    for k in dotted_key.split("."):
+        if isinstance(doc, dict) and k in doc:
+            doc = doc[k]
+        elif isinstance(doc, list) and k.isdigit() and int(k) < len(doc):
+            doc = doc[int(k)]
+        else:
+            return _MISSING
+    return doc
+
+
+def _parent_and_leaf(doc: dict, dotted_key: str, create: bool) -> tuple[Any, str]:
+    """Get the container holding the (dotted) key's leaf, and the leaf key."""
+    *parents, leaf = dotted_key.split(".")
+    for k in parents:
+        if isinstance(doc, list):
+            doc = doc[int(k)]
+        elif create:
+            doc = doc.setdefault(k, {})
+        else:
+            doc = doc.get(k, {})
+    return doc, leaf
+
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    """Evaluate a single query operator for a (non-missing) value."""
+    try:
+        if op == "$eq":
+            return bool(value == arg)
+        if op == "$gt":
+            return bool(value > arg)
+        if op == "$gte":
+            return bool(value >= arg)
+        if op == "$lt":
+            return bool(value < arg)
+        if op == "$lte":
+            return bool(value <= arg)
+        if op == "$in":
+            return value in arg
+    except TypeError:  # ex: int > str
+        return False
+    raise NotImplementedError(f"query operator: {op}")
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    """Does the field's value (maybe `_MISSING`) satisfy the condition?"""
+    if not _is_operator_dict(condition):
+        # equality -- including an array containing the value
+        if value is _MISSING:
+            return condition is None
+        return bool(value == condition) or (
+            isinstance(value, list) and condition in value
+        )
+
+    for op, arg in condition.items():
+        if op == "$exists":
+            ok = (value is not _MISSING) == bool(arg)
+        elif op in ("$ne", "$not"):  # '$not' also matches missing & other types
+            ok = not _matches_condition(value, arg)
+        elif op == "$nin":
+            ok = not any(_matches_condition(value, a) for a in arg)
+        elif value is _MISSING:
+            ok = False
+        elif isinstance(value, list) and op != "$eq":
+            ok = any(_compare(v, op, arg) for v in value) or _compare(value, op, arg)
+        else:
+            ok = _compare(value, op, arg)
+        if not ok:
+            return False
+    return True
+
+
+def _matches(doc: dict, query: Mapping[str, Any]) -> bool:
+    """Does the doc match the query?"""
+    for key, condition in query.items():
+        if key == "$and":
+            ok = all(_matches(doc, q) for q in condition)
+        elif key == "$or":
+            ok = any(_matches(doc, q) for q in condition)
+        elif key == "$nor":
+            ok = not any(_matches(doc, q) for q in condition)
+        elif key.startswith("$"):
+            raise NotImplementedError(f"query operator: {key}")
+        else:
+            ok = _matches_condition(_get(doc, key), condition)
+        if not ok:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: Union[Mapping[str, Any], list, None]) -> dict:
+    """Get a copy of the doc with the projection applied."""
+    if projection is None:
+        return copy.deepcopy(doc)
+    if not isinstance(projection, Mapping):
+        projection = dict.fromkeys(projection, 1)
+
+    include_id = bool(projection.get("_id", 1))
+    fields = {k: bool(v) for k, v in projection.items() if k != "_id"}
+
+    if any(fields.values()):  # inclusion
+        out: dict = {}
+        for key in fields:
+            value = _get(doc, key)
+            if value is not _MISSING:
+                parent, leaf = _parent_and_leaf(out, key, create=True)
+                parent[leaf] = copy.deepcopy(value)
+    else:  # exclusion
+        out = copy.deepcopy(doc)
+        for key in fields:
+            parent, leaf = _parent_and_leaf(out, key, create=False)
+            if isinstance(parent, dict):
+                parent.pop(leaf, None)
+
+    if include_id and "_id" in doc:
+        out = {"_id": doc["_id"], **out}
+    else:
+        out.pop("_id", None)
+    return out
+
+
+def _sort(docs: list[dict], spec: Mapping[str, int]) -> list[dict]:
+    """Sort the docs by each key in the spec (1 = ascending, -1 = descending)."""
+    for key, direction in reversed(list(spec.items())):
+
+        def cmp(a: dict, b: dict, key: str = key) -> int:
+            return _cmp_values(_get(a, key), _get(b, key))
+
+        docs = sorted(docs, key=functools.cmp_to_key(cmp), reverse=direction < 0)
+    return docs
+
+
+def _cmp_values(a: Any, b: Any) -> int:
+    # missing/None sort first, then incomparable types are considered equal
+    a_none, b_none = a is _MISSING or a is None, b is _MISSING or b is None
+    if a_none or b_none:
+        return int(b_none) - int(a_none)
+    try:
+        return (a > b) - (a < b)
+    except TypeError:
+        return 0
+
+
+def _apply_update(doc: dict, update: Mapping[str, Any], is_insert: bool) -> None:
+    """Apply the mongo-syntax update to the doc, in place."""
+    for operator, fields in update.items():
+        if operator == "$setOnInsert" and not is_insert:
+            continue
+        for key, arg in fields.items():
+            _apply_field_update(doc, operator, key, arg)
+
+
+def _apply_field_update(doc: dict, operator: str, key: str, arg: Any) -> None:
+    """Apply a single update operator to a single (dotted) field, in place."""
+    if operator == "$unset":
+        parent, leaf = _parent_and_leaf(doc, key, create=False)
+        if isinstance(parent, dict):
+            parent.pop(leaf, None)
+        elif isinstance(parent, list) and int(leaf) < len(parent):
+            parent[int(leaf)] = None  # like mongo, an array keeps its length
+        return
+
+    parent, leaf = _parent_and_leaf(doc, key, create=True)
+    if operator in ("$set", "$setOnInsert"):
+        _set_leaf(parent, leaf, copy.deepcopy(arg))
+    elif operator == "$inc":
+        _set_leaf(parent, leaf, _get_leaf(parent, leaf, 0) + arg)
+    elif operator in ("$push", "$addToSet"):
+        _push(parent, leaf, operator, arg)
+    else:
+        raise NotImplementedError(f"update operator: {operator}")
+
+
+def _push(parent: Any, leaf: str, operator: str, arg: Any) -> None:
+    """Apply '$push' or '$addToSet' (with or without '$each') to the leaf, in place."""
+    if _is_operator_dict(arg):
+        if modifiers := sorted(arg.keys() - {"$each"}):
+            raise NotImplementedError(f"{operator} modifiers: {modifiers}")
+        values = arg["$each"]
+    else:
+        values = [arg]
+
+    array = _get_leaf(parent, leaf, None)
+    if array is None:
+        array = []
+        _set_leaf(parent, leaf, array)
+    for value in values:
+        if operator == "$push" or value not in array:
+            array.append(copy.deepcopy(value))
+
+
+def _get_leaf(parent: Any, leaf: str, default: Any) -> Any:
+    """Get the leaf's value from its container (a dict, or an array by index)."""
+    value = _get(parent, leaf)
+    return default if value is _MISSING else value
+
+
+def _set_leaf(parent: Any, leaf: str, value: Any) -> None:
+    """Set the leaf's value in its container -- an array is padded with nulls, like mongo."""
+    if isinstance(parent, list):
+        i = int(leaf)
+        parent.extend([None] * (i + 1 - len(parent)))
+        parent[i] = value
+    else:
+        parent[leaf] = value
@@ -1,15 +1,47 @@
 """Tools for interfacing with mongodb using jsonschema validation."""
 
+import asyncio
+import collections
+import contextlib
 import copy
+import dataclasses
+import datetime as dt
+import functools
+import json
 import logging
 import os
+import random
 import sys
-from typing import Any, AsyncIterator, Callable, Union
+import time
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    Union,
+)
 
 # mongo imports
 _IS_MOTOR_IMPORTED = False
 try:
-    from pymongo import ReturnDocument
+    from bson import ObjectId
+    from pymongo import (
+        DeleteMany,
+        DeleteOne,
+        InsertOne,
+        ReplaceOne,
+        ReturnDocument,
+        UpdateMany,
+        UpdateOne,
+    )
+    from pymongo.results import BulkWriteResult
 
     try:
         # first, try motor — this will eventually be deprecated
@@ -30,6 +62,10 @@ except (ImportError, ModuleNotFoundError) as _exc:
         "the 'mongo' option must be installed in order to use 'mongo_jsonschema_tools'"
     ) from _exc
 
+if TYPE_CHECKING:
+    from .mongo_inmemory_tools import InMemoryAsyncCollection
+    from .prometheus_tools import GlobalLabels
+
 # jsonschema imports
 try:
     import jsonschema
@@ -52,26 +88,289 @@ class IllegalDotsNotationActionException(Exception):
         )
 
 
+class DocumentsValidationException(Exception):
+    """Raised when one or more documents in a batch are invalid.
+
+    `errors` maps each invalid document's index (in the batch) to its exception.
+    """
+
+    def __init__(self, errors: dict[int, Exception]) -> None:
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} document(s) failed validation (indexes: {sorted(errors)})"
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class ValidationMode:
+    """How many inserted documents to validate.
+
+    Use `ValidationMode.ALWAYS` (the default), `ValidationMode.NEVER`, or
+    `ValidationMode.sampled(rate)` to validate a random fraction of documents.
+    """
+
+    rate: float
+
+    ALWAYS: ClassVar["ValidationMode"]
+    NEVER: ClassVar["ValidationMode"]
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.rate <= 1:
+            raise ValueError(f"'rate' must be in [0, 1], not {self.rate}")
+
+    @classmethod
+    def sampled(cls, rate: float) -> "ValidationMode":
+        """Validate each document with a probability of `rate`."""
+        return cls(rate)
+
+
+ValidationMode.ALWAYS = ValidationMode(1.0)
+ValidationMode.NEVER = ValidationMode(0.0)
+
+
+@dataclasses.dataclass
+class ValidationCounts:
+    """The number of inserted documents validated vs skipped (see `ValidationMode`)."""
+
+    validated: int = 0
+    skipped: int = 0
+
+
+class MongoCollectionMetrics:
+    """Prometheus metrics for `MongoJSONSchemaValidatedCollection` operations.
+
+    Every metric is labelled by "collection" & "operation" (the method name):
+      - `<prefix>_operation_seconds`: a histogram (`HistogramBuckets.DB`) also
+        labelled by "phase", either "validation" or "driver"
+      - `<prefix>_operation_documents`: a counter of docs inserted, found,
+        or modified (and operations, for `bulk_write`)
+      - `<prefix>_validation_failures`: a counter of operations rejected by validation
+
+    Metric names can only be registered once, so make one instance (per
+    `prefix`) and share it among collections.
+
+    Example:
+        metrics = MongoCollectionMetrics(GlobalLabels({"instance": "abc"}))
+        coll = MongoJSONSchemaValidatedCollection(..., metrics=metrics)
+    """
+
+    def __init__(self, prom: "GlobalLabels", prefix: str = "mongo") -> None:
+        # not imported at the top b/c module has optional dependencies
+        from .prometheus_tools import HistogramBuckets
+
+        labels = ["collection", "operation"]
+        self.seconds = prom.histogram(
+            f"{prefix}_operation_seconds",
+            "Time spent per operation, by phase (validation vs driver)",
+            labels + ["phase"],
+            finalize=False,
+            buckets=HistogramBuckets.DB,
+        )
+        self.documents = prom.counter(
+            f"{prefix}_operation_documents",
+            "Documents inserted, found, or modified",
+            labels,
+            finalize=False,
+        )
+        self.validation_failures = prom.counter(
+            f"{prefix}_validation_failures",
+            "Operations rejected by validation",
+            labels,
+            finalize=False,
+        )
+
+
+class PrecompiledPipeline:
+    """An aggregate pipeline that's built once, and safe to share & reuse.
+
+    The stages are deep-copied, so later changes to the original don't leak
+    in. Each variant sent to the server (with/without "_id", limited to one
+    doc) is built once, then shallow-copied per call.
+
+    Example:
+        ACTIVE_BY_AGE = PrecompiledPipeline([{"$match": {"active": True}}, {"$sort": {"age": 1}}])
+        ...
+        async for doc in coll.aggregate(ACTIVE_BY_AGE):
+            ...
+    """
+
+    def __init__(self, pipeline: Iterable[dict]) -> None:
+        self.stages: tuple[dict, ...] = tuple(copy.deepcopy(list(pipeline)))
+        self._variants: dict[tuple[bool, bool], tuple[dict, ...]] = {}
+
+    def build(self, no_id: bool = True, limit_one: bool = False) -> list[dict]:
+        """Get a new list of the stages, with the variant's extra stage(s)."""
+        key = (no_id, limit_one)
+        if key not in self._variants:
+            stages = list(self.stages)
+            if limit_one:
+                stages = _pipeline_limited_to_one(stages)
+            if no_id:
+                stages = _pipeline_without_id(stages)
+            self._variants[key] = tuple(stages)
+        return list(self._variants[key])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.stages)!r})"
+
+
+@dataclasses.dataclass
+class QueryShapeStats:
+    """The tally of server calls for one operation & query shape.
+
+    A shape is the query (and sort) with every value replaced by "?", as json.
+    """
+
+    operation: str
+    shape: str
+    sort: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+@dataclasses.dataclass
+class IndexRecommendation:
+    """A suggested compound index, and the query shapes it would serve.
+
+    `keys` is in the form taken by `create_index`, ex: `[("name", 1), ("age", -1)]`.
+    """
+
+    keys: list[tuple[str, Any]]
+    shapes: list[QueryShapeStats]
+    notes: list[str]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.total_seconds for s in self.shapes)
+
+
+class QueryShapeRecorder:
+    """Tallies the count & latency of each normalized query shape.
+
+    Only the first `max_shapes` distinct shapes are tallied; calls with any
+    others are counted in `n_dropped`.
+    """
+
+    def __init__(self, max_shapes: int = 1_000) -> None:
+        self.max_shapes = max_shapes
+        self.stats: dict[tuple[str, str, str], QueryShapeStats] = {}
+        # the parsed shapes, for recommendations -- by the same key
+        self.shapes: dict[tuple[str, str, str], tuple[dict, list[list]]] = {}
+        self.n_dropped = 0
+
+    def record(
+        self,
+        operation: str,
+        query: dict,
+        sort: Any,
+        seconds: float,
+    ) -> None:
+        """Tally the server call."""
+        shape = _query_shape(query)
+        sort_shape = _sort_shape(sort)
+        key = (
+            operation,
+            json.dumps(shape, sort_keys=True),
+            json.dumps(sort_shape, default=repr),
+        )
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= self.max_shapes:
+                self.n_dropped += 1
+                return
+            stats = self.stats[key] = QueryShapeStats(*key)
+            self.shapes[key] = (shape, sort_shape)
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def record_pipeline(
+        self, operation: str, pipeline: list[dict], seconds: float
+    ) -> None:
+        """Tally the aggregate call, by its leading `$match` & `$sort` stages."""
+        self.record(operation, *_pipeline_query(pipeline), seconds)
+
+    def clear(self) -> None:
+        """Remove everything."""
+        self.stats.clear()
+        self.shapes.clear()
+        self.n_dropped = 0
+
+
 class MongoJSONSchemaValidatedCollection:
     """For interacting with a mongo collection using jsonschema validation for writes.
 
+    For reads, `no_id=True` (the default) excludes "_id" server-side, via the
+    query projection (or an appended `$project` stage for aggregates), so the
+    field is never transferred.
+
     A `jsonschema.exceptions.ValidationError` or `IllegalDotsNotationActionException`
     instance is raised, when an object is invalid for given schema and mongo action.
     Use `validation_exception_callback` to raise a specialized exception instead;
     this callback must *return* an exception instance and should account for any/all
     exception types.
 
-    Validation only occurs on writes--not reads.
+    Validation only occurs on writes--not reads. The schema itself is checked
+    once, at init, and compiled into a reusable validator.
+
+    Use `validation_executor` (a thread or process pool) to validate `insert_many`
+    batches off of the event loop, in chunks of `validation_chunk_size` docs. In
+    this mode, every invalid document is reported in one
+    `DocumentsValidationException` (instead of raising on the first).
+
+    Use `validation_mode` to validate only a sample (or none) of the inserted
+    documents (`insert_one`, `insert_many`, `insert_many_chunked`), for
+    trusted, high-volume writers; updates are always validated. The number of
+    documents validated vs skipped is tallied in `validation_counts`.
+
+    Use `metrics` (a `MongoCollectionMetrics`) to record each operation's
+    validation & driver time, document count, and validation failures in
+    Prometheus. For streaming reads, the driver time is the total time spent
+    waiting on the cursor--not the time spent by the caller between docs.
+
+    Use `find_one_cache_ttl` (seconds) to cache `find_one` results, for hot,
+    rarely-changing docs. Up to `find_one_cache_size` results are kept (least
+    recently used are evicted first), keyed by the query, projection & other
+    arguments. Every write made through this instance clears the cache, but
+    writes made elsewhere are only seen once the TTL expires. Results are
+    copied in and out of the cache, so they are safe to mutate.
+
+    Use `find_one_single_flight` to coalesce concurrent, identical `find_one`
+    calls (same key as the cache) into one server call; each caller gets its
+    own copy of the result (or the same exception). A call made after a write
+    (through this instance) never joins a call started before it.
+
+    Use `record_query_shapes` to tally each server call made by `find_one`,
+    `find_all`, `update_many` & the aggregates by its normalized query shape
+    (values replaced by "?"), in `query_shapes`. Then, `recommend_indexes()`
+    suggests compound indexes for the slowest shapes in total, and
+    `query_shape_report()` summarizes both--for spotting collection scans.
+    Up to `max_query_shapes` distinct shapes are tallied.
     """
 
     def __init__(
         self,
-        collection: "AsyncIOMotorCollection | AsyncCollection",
+        collection: "AsyncIOMotorCollection | AsyncCollection | InMemoryAsyncCollection",
         collection_jsonschema_spec: dict[str, Any],
         parent_logger: Union[logging.Logger, None] = None,
         validation_exception_callback: Union[
             Callable[[Exception], Exception], None
         ] = None,
+        partial_update_cache_size: int = 128,
+        validation_executor: Union[Executor, None] = None,
+        validation_chunk_size: int = 1_000,
+        validation_mode: Union[ValidationMode, None] = None,
+        metrics: Union[MongoCollectionMetrics, None] = None,
+        find_one_cache_ttl: float = 0,
+        find_one_cache_size: int = 1_024,
+        find_one_single_flight: bool = False,
+        record_query_shapes: bool = False,
+        max_query_shapes: int = 1_000,
     ) -> None:
         self._collection = collection
         self._schema = collection_jsonschema_spec
@@ -82,7 +381,8 @@ class MongoJSONSchemaValidatedCollection:
         if (
             not os.getenv("CI")
             and _IS_MOTOR_IMPORTED
-            and self._collection_backend != "AsyncIOMotorCollection"
+            and self._collection_backend
+            not in ("AsyncIOMotorCollection", "InMemoryAsyncCollection")
         ):
             raise RuntimeError(
                 f"package 'motor' is installed, but 'MongoJSONSchemaValidatedCollection' "
@@ -103,16 +403,85 @@ class MongoJSONSchemaValidatedCollection:
 
         self.validation_exception_callback = validation_exception_callback
 
+        # the full schema is checked & compiled once, up front
+        self._validator = _compile_validator(self._schema)
+        # ...and so is the index of its (nested) fields, for dotted keys
+        self._path_index = _SchemaPathIndex(self._schema)
+        # partial updates (ex: '$set') validate against an adapted schema, which
+        # only depends on the dotted-key parent paths -- so, cache by those
+        self._partial_update_validators = functools.lru_cache(
+            maxsize=partial_update_cache_size
+        )(self._build_partial_update_validator)
+
+        # batch validation -- see `_schema_json`
+        self.validation_executor = validation_executor
+        self.validation_chunk_size = validation_chunk_size
+
+        # how many inserted docs to validate -- see `validation_counts` for the tally
+        self.validation_mode = validation_mode or ValidationMode.ALWAYS
+        self.validation_counts = ValidationCounts()
+
+        self.metrics = metrics
+
+        # read-through cache for 'find_one' (off by default) -- cleared by every write
+        self._find_one_cache = (
+            _TTLCache(find_one_cache_ttl, find_one_cache_size)
+            if find_one_cache_ttl > 0
+            else None
+        )
+        # concurrent identical 'find_one' calls share one server call (off by default)
+        self._find_one_in_flight: Union[dict[str, asyncio.Future[dict]], None] = (
+            {} if find_one_single_flight else None
+        )
+
+        # tally of server calls by query shape, for index recommendations (off by default)
+        self.query_shapes = (
+            QueryShapeRecorder(max_query_shapes) if record_query_shapes else None
+        )
+
+    @functools.cached_property
+    def _schema_json(self) -> str:
+        """The schema as json, so it can go to subprocesses (only made if needed)."""
+        return json.dumps(self._schema, sort_keys=True)
+
+    def _build_partial_update_validator(
+        self,
+        parent_paths: frozenset[tuple[str, ...]],
+    ) -> "jsonschema.protocols.Validator":
+        """Adapt the schema for a partial update touching `parent_paths`, then compile."""
+        return _compile_validator(self._path_index.adapt(parent_paths))
+
+    def _raise_if_invalid(self, obj: dict, allow_partial_update: bool) -> None:
+        """Raise the validation exception for `obj`, if any (no logging/callback)."""
+        if allow_partial_update:
+            instance, parent_paths = self._path_index.nest(obj)
+            validator = self._partial_update_validators(parent_paths)
+        else:
+            instance, _ = _convert_mongo_to_jsonschema(obj, self._schema, False)
+            validator = self._validator
+        # same error selection as `jsonschema.validate`
+        error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+        if error is not None:
+            raise error
+
     def _validate(
         self,
         obj: dict,
         allow_partial_update: bool = False,
     ) -> None:
-        """Wrap `jsonschema.validate` with logic for mongo syntax."""
+        """Validate `obj` (with logic for mongo syntax) using a cached validator.
+
+        Equivalent to `jsonschema.validate`, minus re-checking the schema and
+        re-building the validator on every call.
+        """
+        with self._validation_context():
+            self._raise_if_invalid(obj, allow_partial_update)
+
+    @contextlib.contextmanager
+    def _validation_context(self) -> Iterator[None]:
+        """Log any exception, then re-raise it (or `validation_exception_callback`'s)."""
         try:
-            jsonschema.validate(
-                *_convert_mongo_to_jsonschema(obj, self._schema, allow_partial_update)
-            )
+            yield
         except Exception as e:
             self.logger.exception(e)
             if self.validation_exception_callback:
@@ -120,43 +489,241 @@ class MongoJSONSchemaValidatedCollection:
             else:
                 raise e
 
+    def _observe(self, operation: str, phase: str, seconds: float) -> None:
+        """Record the phase's duration in `metrics`, if any."""
+        if self.metrics is not None:
+            self.metrics.seconds.labels(
+                {
+                    "collection": self.collection_name,
+                    "operation": operation,
+                    "phase": phase,
+                }
+            ).observe(seconds)
+
+    def _count(self, operation: str, n_docs: int) -> None:
+        """Record the number of docs in `metrics`, if any."""
+        if self.metrics is not None:
+            self.metrics.documents.labels(
+                {"collection": self.collection_name, "operation": operation}
+            ).inc(n_docs)
+
+    @contextlib.contextmanager
+    def _shape_recorded(self, operation: str, query: dict, sort: Any) -> Iterator[None]:
+        """Record the server call's query shape & duration, if recording."""
+        if self.query_shapes is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.query_shapes.record(
+                operation, query, sort, time.perf_counter() - start
+            )
+
+    @contextlib.contextmanager
+    def _invalidates_cache(self) -> Iterator[None]:
+        """Clear the `find_one` cache, if any, once the write is done (or has failed).
+
+        Also, stop later `find_one` calls from joining the ones already in flight.
+        """
+        try:
+            yield
+        finally:
+            if self._find_one_cache is not None:
+                self._find_one_cache.clear()
+            if self._find_one_in_flight is not None:
+                self._find_one_in_flight.clear()
+
+    @contextlib.contextmanager
+    def _timed(self, operation: str, phase: str) -> Iterator[None]:
+        """Record the duration in `metrics`, if any.
+
+        An exception in the "validation" phase is recorded as a validation failure.
+        """
+        if self.metrics is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if phase == "validation":
+                self.metrics.validation_failures.labels(
+                    {"collection": self.collection_name, "operation": operation}
+                ).inc()
+            raise
+        finally:
+            self._observe(operation, phase, time.perf_counter() - start)
+
+    def _sample(
+        self,
+        n_docs: int,
+        validation_mode: Union["ValidationMode", None],
+    ) -> Sequence[int]:
+        """Get the indexes of the docs to validate (per the mode), and count them."""
+        rate = (validation_mode or self.validation_mode).rate
+        if rate >= 1:
+            indexes: Sequence[int] = range(n_docs)
+        elif rate <= 0:
+            indexes = range(0)
+        else:
+            indexes = [i for i in range(n_docs) if random.random() < rate]
+
+        self.validation_counts.validated += len(indexes)
+        self.validation_counts.skipped += n_docs - len(indexes)
+        return indexes
+
+    async def _validate_many(
+        self,
+        docs: list[dict],
+        offset: int = 0,
+        validation_mode: Union["ValidationMode", None] = None,
+    ) -> None:
+        """Validate each (sampled) doc, using `validation_executor` if there is one.
+
+        `offset` is added to the indexes reported in a `DocumentsValidationException`.
+        """
+        indexes = self._sample(len(docs), validation_mode)
+        if not indexes:
+            return
+
+        if self.validation_executor is None:
+            for i in indexes:
+                self._validate(docs[i])
+        elif len(indexes) == len(docs):
+            await self._validate_many_in_executor(
+                docs, range(offset, offset + len(docs))
+            )
+        else:
+            await self._validate_many_in_executor(
+                [docs[i] for i in indexes], [offset + i for i in indexes]
+            )
+
+    async def _validate_many_in_executor(
+        self,
+        docs: list[dict],
+        indexes: Sequence[int],
+    ) -> None:
+        """Validate `docs` in chunks using `validation_executor`.
+
+        Raises a `DocumentsValidationException` with every invalid document,
+        each reported by its corresponding value in `indexes`.
+        """
+        loop = asyncio.get_running_loop()
+        size = self.validation_chunk_size
+        chunk_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.validation_executor,
+                    _find_invalid_docs,
+                    self._schema_json,
+                    docs[i : i + size],
+                    i,
+                )
+                for i in range(0, len(docs), size)
+            )
+        )
+
+        # re-validate only the (few) invalid docs, here, to get the full exceptions
+        # -- `ValidationError`s can't be pickled out of a subprocess
+        errors: dict[int, Exception] = {}
+        for i in (i for invalid in chunk_results for i in invalid):
+            try:
+                self._raise_if_invalid(docs[i], allow_partial_update=False)
+            except Exception as e:
+                errors[indexes[i]] = e
+        if not errors:
+            return
+
+        exc = DocumentsValidationException(errors)
+        self.logger.error(exc)
+        if self.validation_exception_callback:
+            raise self.validation_exception_callback(exc) from exc
+        else:
+            raise exc
+
     ####################################################################
     # WRITES
     ####################################################################
 
     def _validate_mongo_update(self, update: dict[str, Any]) -> None:
-        """Validate the data for each given mongo-syntax update operator."""
+        """Validate the data for each given mongo-syntax update operator.
+
+        Supported: `$set`, `$setOnInsert`, `$push`, `$addToSet` (both with or
+        without `$each`), `$inc`, and `$unset`.
+        """
         for operator in update:
-            if operator == "$set":
+            if operator in ("$set", "$setOnInsert"):
                 self._validate(
                     update[operator],
                     allow_partial_update=True,
                 )
-            elif operator == "$push":
+            elif operator in ("$push", "$addToSet"):
                 self._validate(
                     # validate each value as if it was the whole field's list -- other wise `str != [str]`
-                    {k: [v] for k, v in update[operator].items()},
+                    {k: _pushed_values(v) for k, v in update[operator].items()},
                     allow_partial_update=True,
                 )
+            elif operator == "$inc":
+                with self._validation_context():
+                    self._raise_if_invalid_increments(update[operator])
+            elif operator == "$unset":
+                with self._validation_context():
+                    self._raise_if_invalid_unsets(update[operator])
             # FUTURE: insert more operators here
             else:
                 raise KeyError(f"Unsupported mongo-syntax update operator: {operator}")
 
+    def _raise_if_invalid_increments(self, fields: dict[str, Any]) -> None:
+        """Raise if an increment is not a number, or not the field's type.
+
+        The resulting value is not known, so constraints like 'minimum' are not checked.
+        """
+        for key, value in fields.items():
+            inc_schema: dict[str, Any] = {"type": "number"}
+            field_schema = self._path_index.get(key)
+            if field_schema and "type" in field_schema:
+                inc_schema = {"allOf": [inc_schema, {"type": field_schema["type"]}]}
+            error = jsonschema.exceptions.best_match(
+                self._validator.evolve(schema=inc_schema).iter_errors(value)
+            )
+            if error is not None:
+                raise error
+
+    def _raise_if_invalid_unsets(self, fields: dict[str, Any]) -> None:
+        """Raise if a field to unset is required (by its parent object)."""
+        for key in fields:
+            parent_key, _, leaf_key = key.rpartition(".")
+            parent_schema = self._path_index.get(parent_key)
+            if parent_schema and leaf_key in parent_schema.get("required", []):
+                raise jsonschema.exceptions.ValidationError(
+                    f"{key!r} is a required property and cannot be unset"
+                )
+
     async def insert_one(
         self,
         doc: dict,
         no_id: bool = True,
+        validation_mode: Union[ValidationMode, None] = None,
         **kwargs: Any,
     ) -> dict:
-        """Insert the doc (dict)."""
-        self.logger.debug(f"inserting one: {doc}")
+        """Insert the doc (dict).
 
-        self._validate(doc)
-        await self._collection.insert_one(doc, **kwargs)
+        `validation_mode` overrides the collection's, for this call.
+        """
+        self.logger.debug("inserting one: %s", doc)
+
+        if self._sample(1, validation_mode):
+            with self._timed("insert_one", "validation"):
+                self._validate(doc)
+        with self._timed("insert_one", "driver"), self._invalidates_cache():
+            await self._collection.insert_one(doc, **kwargs)
+        self._count("insert_one", 1)
         if no_id:
             doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
 
-        self.logger.debug(f"inserted one: {doc}")
+        self.logger.debug("inserted one: %s", doc)
         return doc
 
     async def find_one_and_update(
@@ -167,43 +734,169 @@ class MongoJSONSchemaValidatedCollection:
         **kwargs: Any,
     ) -> dict:
         """Update the doc and return updated doc."""
-        self.logger.debug(f"update one with query: {query}")
-
-        self._validate_mongo_update(update)
-        doc = await self._collection.find_one_and_update(
-            query,
-            update,
-            return_document=ReturnDocument.AFTER,
-            **kwargs,
-        )
+        self.logger.debug("update one with query: %s", query)
+
+        with self._timed("find_one_and_update", "validation"):
+            self._validate_mongo_update(update)
+        with self._timed("find_one_and_update", "driver"), self._invalidates_cache():
+            doc = await self._collection.find_one_and_update(
+                query,
+                update,
+                return_document=ReturnDocument.AFTER,
+                **kwargs,
+            )
         if not doc:
             raise DocumentNotFoundException()
         elif no_id:
             doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
+        self._count("find_one_and_update", 1)
 
-        self.logger.debug(f"updated one ({query}): {doc}")
+        self.logger.debug("updated one (%s): %s", query, doc)
         return doc  # type: ignore[no-any-return]
 
     async def insert_many(
         self,
         docs: list[dict],
         no_id: bool = True,
+        validation_mode: Union[ValidationMode, None] = None,
         **kwargs: Any,
     ) -> list[dict]:
-        """Insert multiple docs."""
-        self.logger.debug(f"inserting many: {docs}")
+        """Insert multiple docs.
 
-        for doc in docs:
-            self._validate(doc)
+        `validation_mode` overrides the collection's, for this call.
+        """
+        self.logger.debug("inserting many: %s", docs)
 
-        await self._collection.insert_many(docs, **kwargs)
+        with self._timed("insert_many", "validation"):
+            await self._validate_many(docs, validation_mode=validation_mode)
+
+        with self._timed("insert_many", "driver"), self._invalidates_cache():
+            await self._collection.insert_many(docs, **kwargs)
+        self._count("insert_many", len(docs))
         if no_id:
             for doc in docs:
                 doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
 
-        self.logger.debug(f"inserted many: {docs}")
+        self.logger.debug("inserted many: %s", docs)
         return docs
 
+    async def insert_many_chunked(
+        self,
+        docs: Union[Iterable[dict], AsyncIterable[dict]],
+        chunk_size: int = 1_000,
+        max_in_flight: int = 4,
+        no_id: bool = True,
+        validation_mode: Union[ValidationMode, None] = None,
+        **kwargs: Any,
+    ) -> int:
+        """Validate & insert docs from an (async) iterable, chunk by chunk.
+
+        Up to `max_in_flight` chunks are inserted concurrently; `docs` is not
+        consumed any further until one of those finishes, so memory stays at
+        roughly `chunk_size * (max_in_flight + 1)` docs. The docs are not
+        returned, use `insert_many` for that.
+
+        Chunks are independent writes: if one fails validation (or insertion),
+        the ones before it remain inserted. `DocumentsValidationException`
+        indexes are relative to the start of `docs`. `validation_mode` overrides
+        the collection's, for this call.
+
+        Returns the number of docs inserted.
+
+        With `metrics`, each chunk's validation & insert is recorded separately.
+        """
+        self.logger.debug(
+            "inserting many, chunked: chunk_size=%s max_in_flight=%s",
+            chunk_size,
+            max_in_flight,
+        )
+
+        n_seen = 0
+        n_inserted = 0
+        in_flight: set[asyncio.Task[int]] = set()
+
+        async def wait_for_inserts(return_when: str) -> None:
+            nonlocal n_inserted, in_flight
+            if not in_flight:
+                return
+            done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+            n_inserted += sum(t.result() for t in done)  # raises first insert error
+
+        try:
+            async for chunk in _aiter_chunks(docs, chunk_size):
+                try:
+                    with self._timed("insert_many_chunked", "validation"):
+                        await self._validate_many(chunk, n_seen, validation_mode)
+                except Exception:
+                    # the chunks already sent are valid -- let them finish
+                    await wait_for_inserts(asyncio.FIRST_EXCEPTION)
+                    raise
+                n_seen += len(chunk)
+                # backpressure: wait for a free slot before taking on more
+                if len(in_flight) >= max_in_flight:
+                    await wait_for_inserts(asyncio.FIRST_COMPLETED)
+                in_flight.add(
+                    asyncio.create_task(self._insert_chunk(chunk, no_id, **kwargs))
+                )
+            await wait_for_inserts(asyncio.FIRST_EXCEPTION)
+        finally:
+            # only non-empty if an insert failed (or we were cancelled)
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+        self.logger.debug("inserted many, chunked: %s docs", n_inserted)
+        return n_inserted
+
+    async def _insert_chunk(self, chunk: list[dict], no_id: bool, **kwargs: Any) -> int:
+        """Insert the (already validated) chunk, and return its length."""
+        with self._timed("insert_many_chunked", "driver"), self._invalidates_cache():
+            await self._collection.insert_many(chunk, **kwargs)
+        self._count("insert_many_chunked", len(chunk))
+        if no_id:
+            for doc in chunk:
+                doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
+        return len(chunk)
+
+    async def bulk_write(
+        self,
+        requests: list[
+            Union[InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany]
+        ],
+        no_id: bool = True,
+        **kwargs: Any,
+    ) -> BulkWriteResult:
+        """Validate each write operation, then submit them all in one bulk write.
+
+        `InsertOne`/`ReplaceOne` docs are validated as whole docs, and
+        `UpdateOne`/`UpdateMany` updates like in `update_many`; delete
+        operations need no validation. Pass `ordered=False` to let the server
+        continue past (and parallelize around) a failed operation.
+        """
+        self.logger.debug("bulk writing %s operations", len(requests))
+
+        with self._timed("bulk_write", "validation"):
+            for op in requests:
+                # NOTE: the drivers don't have a public accessor for the doc/update
+                if isinstance(op, (InsertOne, ReplaceOne)):
+                    self._validate(op._doc)  # type: ignore[arg-type]
+                elif isinstance(op, (UpdateOne, UpdateMany)):
+                    self._validate_mongo_update(op._doc)  # type: ignore[arg-type]
+                elif not isinstance(op, (DeleteOne, DeleteMany)):
+                    raise TypeError(f"Unsupported bulk write operation: {op!r}")
+
+        with self._timed("bulk_write", "driver"), self._invalidates_cache():
+            res = await self._collection.bulk_write(requests, **kwargs)
+        self._count("bulk_write", len(requests))
+        if no_id:
+            # mongo will put "_id" -- but for testing use None
+            for op in requests:
+                if isinstance(op, InsertOne):
+                    op._doc.pop("_id", None)
+
+        self.logger.debug("bulk wrote: %s", res)
+        return res
+
     async def update_many(
         self,
         query: dict,
@@ -211,14 +904,21 @@ class MongoJSONSchemaValidatedCollection:
         **kwargs: Any,
     ) -> int:
         """Update all matching docs."""
-        self.logger.debug(f"update many with query: {query}")
-
-        self._validate_mongo_update(update)
-        res = await self._collection.update_many(query, update, **kwargs)
+        self.logger.debug("update many with query: %s", query)
+
+        with self._timed("update_many", "validation"):
+            self._validate_mongo_update(update)
+        with (
+            self._timed("update_many", "driver"),
+            self._shape_recorded("update_many", query, None),
+            self._invalidates_cache(),
+        ):
+            res = await self._collection.update_many(query, update, **kwargs)
         if not res.matched_count:
             raise DocumentNotFoundException()
+        self._count("update_many", res.modified_count)
 
-        self.logger.debug(f"updated many: {query}")
+        self.logger.debug("updated many: %s", query)
         return res.modified_count
 
     ####################################################################
@@ -231,95 +931,892 @@ class MongoJSONSchemaValidatedCollection:
         no_id: bool = True,
         **kwargs: Any,
     ) -> dict:
-        """Find one matching the query."""
-        self.logger.debug(f"finding one with query: {query}")
+        """Find one matching the query.
 
-        doc = await self._collection.find_one(query, **kwargs)
-        if not doc:
+        If `find_one_cache_ttl` is set, the result may come from the cache.
+        """
+        self.logger.debug("finding one with query: %s", query)
+
+        # calls within a session (ex: a transaction) bypass the cache & single-flight
+        if "session" in kwargs or (
+            self._find_one_cache is None and self._find_one_in_flight is None
+        ):
+            return await self._find_one(query, no_id, **kwargs)
+
+        key = _find_one_cache_key(query, no_id, kwargs)
+        if self._find_one_cache is None:
+            return await self._find_one_single_flight(key, query, no_id, kwargs)
+
+        if (doc := self._find_one_cache.get(key)) is not None:
+            self._count("find_one", 1)
+            self.logger.debug("found one (cached): %s", doc)
+            return doc
+
+        generation = self._find_one_cache.generation
+        doc = await self._find_one_single_flight(key, query, no_id, kwargs)
+        self._find_one_cache.set(key, doc, generation)
+        return doc
+
+    async def _find_one_single_flight(
+        self,
+        key: str,
+        query: dict,
+        no_id: bool,
+        kwargs: dict[str, Any],
+    ) -> dict:
+        """Find one, joining an identical call already in flight (if single-flight is on)."""
+        in_flight = self._find_one_in_flight
+        if in_flight is None:
+            return await self._find_one(query, no_id, **kwargs)
+
+        if (future := in_flight.get(key)) is None:
+            future = asyncio.ensure_future(self._find_one(query, no_id, **kwargs))
+            in_flight[key] = future
+
+            def forget(_: asyncio.Future[dict]) -> None:
+                if in_flight.get(key) is future:
+                    del in_flight[key]
+
+            future.add_done_callback(forget)
+        else:
+            self.logger.debug("joining in-flight find one: %s", query)
+
+        # shield: a cancelled caller shouldn't cancel the call for everyone else
+        return copy.deepcopy(await asyncio.shield(future))
+
+    async def _find_one(self, query: dict, no_id: bool, **kwargs: Any) -> dict:
+        """Find one matching the query, from the server."""
+        if no_id:
+            kwargs["projection"] = _projection_without_id(kwargs.get("projection"))
+        with (
+            self._timed("find_one", "driver"),
+            self._shape_recorded("find_one", query, kwargs.get("sort")),
+        ):
+            doc = await self._collection.find_one(query, **kwargs)
+        if doc is None:  # NOTE: '{}' is a match, projected down to nothing
             raise DocumentNotFoundException()
+        self._count("find_one", 1)
         if no_id:
             doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
 
-        self.logger.debug(f"found one: {doc}")
+        self.logger.debug("found one: %s", doc)
         return doc  # type: ignore[no-any-return]
 
     async def find_all(
         self,
         query: dict,
-        projection: list,
+        projection: Union[list, Mapping[str, Any]],
         no_id: bool = True,
         **kwargs: Any,
     ) -> AsyncIterator[dict]:
         """Find all matching the query."""
-        self.logger.debug(f"finding with query: {query}")
+        self.logger.debug("finding with query: %s", query)
+
+        if no_id:
+            projection = _projection_without_id(projection)
+
+        cursor = _CursorTimer(self._collection.find(query, projection, **kwargs))
 
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)  # once, not per doc
         i = 0
-        async for doc in self._collection.find(query, projection, **kwargs):
-            i += 1
-            if no_id:
-                doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
-            self.logger.debug(f"found {doc}")
-            yield doc
+        try:
+            async for doc in cursor:
+                i += 1
+                if no_id:
+                    # mongo will put "_id" -- but for testing use None
+                    doc.pop("_id", None)
+                if is_debug:
+                    self.logger.debug("found %s", doc)
+                yield doc
+        finally:
+            self._observe("find_all", "driver", cursor.seconds)
+            self._count("find_all", i)
+            if self.query_shapes is not None:
+                self.query_shapes.record(
+                    "find_all", query, kwargs.get("sort"), cursor.seconds
+                )
 
-        self.logger.debug(f"found {i} docs")
+        self.logger.debug("found %s docs", i)
 
-    async def aggregate(
+    async def find_all_batches(
         self,
-        pipeline: list[dict],
+        query: dict,
+        projection: Union[list, Mapping[str, Any]],
+        batch_size: int = 1_000,
+        no_id: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[dict]]:
+        """Find all matching the query, yielding lists of (up to) `batch_size` docs.
+
+        `batch_size` is also used as the cursor's batch size, so each list is
+        (at most) one round trip to the server.
+        """
+        self.logger.debug("finding batches with query: %s", query)
+
+        if no_id:
+            projection = _projection_without_id(projection)
+
+        cursor = self._collection.find(
+            query, projection, batch_size=batch_size, **kwargs
+        )
+        async for batch in self._iter_batches(
+            "find_all_batches", cursor, batch_size, no_id
+        ):
+            yield batch
+
+    async def find_all_parallel(
+        self,
+        query: dict,
+        projection: Union[list, Mapping[str, Any]],
+        n_partitions: int = 4,
+        partition_key: str = "_id",
+        split_points: Union[Sequence[Any], None] = None,
+        buffer_size: int = 1_000,
         no_id: bool = True,
         **kwargs: Any,
     ) -> AsyncIterator[dict]:
-        """Find all matching the aggregate pipeline."""
-        self.logger.debug(f"finding with aggregate pipeline: {pipeline}")
+        """Find all matching the query, using concurrent cursors over ranges of `partition_key`.
+
+        Meant for large scans (ex: exports), so they can use multiple pooled
+        connections. Docs are yielded as they arrive--*not* in any order.
+        Up to `buffer_size` docs are buffered, ahead of the caller.
+
+        The ranges are split at `split_points` (sorted, exclusive of the
+        ends). By default, `n_partitions` - 1 split points are interpolated
+        between the key's min & max values (two indexed lookups), which works
+        for `ObjectId`, `datetime`, and numeric keys; otherwise, pass
+        `split_points`. Docs without `partition_key` (or with it null, or of
+        a different BSON type than the split points) are all found by the
+        first range, since it's "not >= the first split point"; so every
+        doc is found exactly once, whatever `n_partitions` is.
+        """
+        self.logger.debug(
+            "finding with query (%s partitions on '%s'): %s",
+            n_partitions,
+            partition_key,
+            query,
+        )
+
+        if split_points is None:
+            split_points = await self._find_split_points(
+                query, partition_key, n_partitions
+            )
+        if no_id:
+            projection = _projection_without_id(projection)
+
+        queue: asyncio.Queue[Union[dict, Exception, None]] = asyncio.Queue(
+            maxsize=buffer_size
+        )
 
-        cursor: AsyncIterator[dict]  # typehint here, instantiate below
+        partitions = [
+            {"$and": [query, p]} if query else p
+            for p in _range_partitions(partition_key, split_points)
+        ]
+        tasks = [
+            asyncio.create_task(self._scan_into(queue, p, projection, **kwargs))
+            for p in partitions
+        ]
+        i = 0
+        try:
+            n_running = len(tasks)
+            while n_running:
+                item = await queue.get()
+                if item is None:
+                    n_running -= 1
+                    continue
+                elif isinstance(item, Exception):
+                    raise item
+                i += 1
+                if no_id:
+                    # mongo will put "_id" -- but for testing use None
+                    item.pop("_id", None)
+                yield item
+        finally:
+            # only still running if there was an error (or the caller stopped early)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._count("find_all_parallel", i)
+
+        self.logger.debug("found %s docs (%s partitions)", i, len(partitions))
+
+    async def _scan_into(
+        self,
+        queue: "asyncio.Queue[Union[dict, Exception, None]]",
+        query: dict,
+        projection: Union[list, Mapping[str, Any]],
+        **kwargs: Any,
+    ) -> None:
+        """Put each doc found in the queue, then None (or the exception raised)."""
+        try:
+            async for doc in self._collection.find(query, projection, **kwargs):
+                await queue.put(doc)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
 
+    async def _find_split_points(
+        self,
+        query: dict,
+        key: str,
+        n_partitions: int,
+    ) -> list[Any]:
+        """Interpolate the split points between the key's min & max values."""
+        if n_partitions <= 1:
+            return []
+        # missing/null keys sort first, but they aren't in any of the ranges
+        has_key = {key: {"$exists": True, "$ne": None}}
+        query = {"$and": [query, has_key]} if query else has_key
+        ends = []
+        for direction in (1, -1):
+            doc = await self._collection.find_one(
+                query, projection={key: True}, sort=[(key, direction)]
+            )
+            if doc is None:
+                return []  # nothing to find
+            ends.append(_get_dotted(doc, key))
+        return _interpolate_split_points(ends[0], ends[1], n_partitions)
+
+    async def _aggregate_cursor(
+        self,
+        pipeline: list[dict],
+        **kwargs: Any,
+    ) -> Any:
+        """Get the async cursor for the aggregate pipeline."""
         # FUTURE DEV: once motor, is deprecated, we can remove this complex logic
         if self._collection_backend == "AsyncIOMotorCollection":
             # Motor's AsyncIOMotorCollection.aggregate() returns an async cursor directly.
-            cursor = self._collection.aggregate(pipeline, **kwargs)  # type: ignore[assignment]
-        elif self._collection_backend == "AsyncCollection":
+            return self._collection.aggregate(pipeline, **kwargs)
+        elif self._collection_backend in ("AsyncCollection", "InMemoryAsyncCollection"):
             # PyMongo async's AsyncCollection.aggregate() returns a coroutine
             # that must be awaited to obtain the async cursor.
-            cursor = await self._collection.aggregate(pipeline, **kwargs)  # type: ignore[misc]
+            # -- 'mongo_inmemory_tools.InMemoryAsyncCollection' mimics this
+            return await self._collection.aggregate(pipeline, **kwargs)  # type: ignore[misc]
         else:
             raise RuntimeError(
                 f"misconfigured MongoJSONSchemaValidatedCollection._collection: "
                 f"{self._collection_backend}"
             )
 
+    async def _iter_batches(
+        self,
+        operation: str,
+        cursor: Any,
+        batch_size: int,
+        no_id: bool,
+        start_seconds: float = 0.0,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield lists of (up to) `batch_size` docs from the cursor, until exhausted.
+
+        The total time spent waiting on the cursor (plus `start_seconds`) is
+        recorded in `metrics`, if any.
+        """
+        i = 0
+        seconds = start_seconds
+        try:
+            while True:
+                start = time.perf_counter()
+                batch = await cursor.to_list(batch_size)
+                seconds += time.perf_counter() - start
+                if not batch:
+                    break
+                i += len(batch)
+                if no_id:
+                    for doc in batch:
+                        # mongo will put "_id" -- but for testing use None
+                        doc.pop("_id", None)
+                self.logger.debug("found batch of %s docs", len(batch))
+                yield batch
+        finally:
+            self._observe(operation, "driver", seconds)
+            self._count(operation, i)
+
+        self.logger.debug("found %s docs", i)
+
+    async def aggregate(
+        self,
+        pipeline: Union[list[dict], "PrecompiledPipeline"],
+        no_id: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict]:
+        """Find all matching the aggregate pipeline."""
+        self.logger.debug("finding with aggregate pipeline: %s", pipeline)
+
+        docs = self._aggregate(
+            "aggregate", _build_pipeline(pipeline, no_id), no_id, **kwargs
+        )
+        async with contextlib.aclosing(docs):  # type: ignore[type-var]
+            async for doc in docs:
+                yield doc
+
+    async def _aggregate(
+        self,
+        operation: str,
+        pipeline: list[dict],
+        no_id: bool,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict]:
+        """Find all matching the (already built) aggregate pipeline."""
+        start = time.perf_counter()
+        cursor = _CursorTimer(
+            await self._aggregate_cursor(pipeline, **kwargs),
+            seconds=time.perf_counter() - start,
+        )
+
         # From here on, cursor is an async iterator
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)  # once, not per doc
         i = 0
-        async for doc in cursor:
-            i += 1
-            if no_id:
-                doc.pop("_id", None)  # mongo will put "_id" -- but for testing use None
-            self.logger.debug(f"found {doc}")
-            yield doc
+        try:
+            async for doc in cursor:
+                i += 1
+                if no_id:
+                    # mongo will put "_id" -- but for testing use None
+                    doc.pop("_id", None)
+                if is_debug:
+                    self.logger.debug("found %s", doc)
+                yield doc
+        finally:
+            self._observe(operation, "driver", cursor.seconds)
+            self._count(operation, i)
+            if self.query_shapes is not None:
+                self.query_shapes.record_pipeline(operation, pipeline, cursor.seconds)
+
+        self.logger.debug("found %s docs", i)
+
+    async def aggregate_batches(
+        self,
+        pipeline: Union[list[dict], "PrecompiledPipeline"],
+        batch_size: int = 1_000,
+        no_id: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[dict]]:
+        """Find all matching the aggregate pipeline, yielding lists of (up to) `batch_size` docs.
 
-        self.logger.debug(f"found {i} docs")
+        `batch_size` is also used as the cursor's batch size, so each list is
+        (at most) one round trip to the server.
+        """
+        self.logger.debug("finding batches with aggregate pipeline: %s", pipeline)
+
+        start = time.perf_counter()
+        cursor = await self._aggregate_cursor(
+            _build_pipeline(pipeline, no_id), batchSize=batch_size, **kwargs
+        )
+        async for batch in self._iter_batches(
+            "aggregate_batches",
+            cursor,
+            batch_size,
+            no_id,
+            start_seconds=time.perf_counter() - start,
+        ):
+            yield batch
 
     async def aggregate_one(
         self,
-        pipeline: list[dict],
+        pipeline: Union[list[dict], "PrecompiledPipeline"],
+        no_id: bool = True,
         **kwargs: Any,
     ) -> dict:
         """Find one matching the aggregate pipeline.
 
-        Appends `{"$limit": 1}` to pipeline.
+        The server gets a copy of the pipeline limited to one doc: with
+        `{"$limit": 1}` appended, or replacing a trailing `$limit`. The
+        caller's pipeline is not modified.
         """
-        self.logger.debug(f"finding one with aggregate pipeline: {pipeline}")
+        self.logger.debug("finding one with aggregate pipeline: %s", pipeline)
 
-        pipeline.append({"$limit": 1})  # optimization
-        async for doc in self.aggregate(pipeline, **kwargs):
-            return doc
+        docs = self._aggregate(
+            "aggregate_one",
+            _build_pipeline(pipeline, no_id, limit_one=True),
+            no_id,
+            **kwargs,
+        )
+        # close right away, so the (partial) read is finalized & recorded now
+        async with contextlib.aclosing(docs):  # type: ignore[type-var]
+            async for doc in docs:
+                return doc
 
         raise DocumentNotFoundException()
 
+    ####################################################################
+    # QUERY SHAPES
+    ####################################################################
+
+    def _recorded_query_shapes(self) -> QueryShapeRecorder:
+        if self.query_shapes is None:
+            raise RuntimeError(
+                "query shapes are not being recorded (see 'record_query_shapes')"
+            )
+        return self.query_shapes
+
+    def recommend_indexes(self, top: int = 10) -> list[IndexRecommendation]:
+        """Suggest up to `top` compound indexes for the recorded query shapes.
+
+        Each index's keys are in equality-sort-range order. The schema is
+        used to flag fields it doesn't have, and to keep to one array field
+        per index. Shapes served by "_id" (or with nothing to index) are
+        skipped, and an index also serves the shapes of its prefixes. The
+        slowest (in total) come first.
+        """
+        recorder = self._recorded_query_shapes()
+        recommendations: dict[tuple[tuple[str, Any], ...], IndexRecommendation] = {}
+        for key, stats in recorder.stats.items():
+            keys, notes, by_id = _recommend_index_keys(
+                *recorder.shapes[key], self._path_index
+            )
+            if not keys or by_id:
+                continue
+            rec = recommendations.setdefault(
+                tuple(keys), IndexRecommendation(keys, [], [])
+            )
+            rec.shapes.append(stats)
+            rec.notes.extend(n for n in notes if n not in rec.notes)
+
+        merged = _merge_index_prefixes(list(recommendations.values()))
+        for rec in merged:
+            rec.shapes.sort(key=lambda s: s.total_seconds, reverse=True)
+        merged.sort(key=lambda r: r.total_seconds, reverse=True)
+        return merged[:top]
+
+    def query_shape_report(self, top: int = 10) -> str:
+        """Summarize the `top` slowest query shapes (in total), then `recommend_indexes`."""
+        recorder = self._recorded_query_shapes()
+        stats = sorted(
+            recorder.stats.values(), key=lambda s: s.total_seconds, reverse=True
+        )
+
+        lines = [
+            f"query shapes for '{self.collection_name}' "
+            f"({len(stats)} tallied, {recorder.n_dropped} calls dropped):"
+        ]
+        for s in stats[:top]:
+            lines.append(
+                f"  {s.total_seconds:.3f}s total, {s.count}x, "
+                f"{s.mean_seconds:.3f}s mean, {s.max_seconds:.3f}s max "
+                f"-- {s.operation} {s.shape}"
+                + (f" sort {s.sort}" if s.sort != "[]" else "")
+            )
+        lines.append("recommended indexes:")
+        for rec in self.recommend_indexes(top):
+            lines.append(
+                f"  {rec.keys} -- {rec.total_seconds:.3f}s total "
+                f"over {len(rec.shapes)} shape(s)"
+            )
+            lines.extend(f"    note: {n}" for n in rec.notes)
+        return "\n".join(lines)
+
 
 ########################################################################################
 
 
+def _compile_validator(schema: dict) -> "jsonschema.protocols.Validator":
+    """Check the schema, then build a validator for its declared (or latest) draft."""
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+async def _aiter_chunks(
+    docs: Union[Iterable[dict], AsyncIterable[dict]],
+    size: int,
+) -> AsyncIterator[list[dict]]:
+    """Group an (async) iterable into lists of (up to) `size` items."""
+    chunk: list[dict] = []
+    if isinstance(docs, AsyncIterable):
+        async for doc in docs:
+            chunk.append(doc)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for doc in docs:
+            chunk.append(doc)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class _TTLCache:
+    """An LRU cache whose entries expire `ttl` seconds after being set.
+
+    Values are deep-copied in & out. `generation` is incremented by `clear()`,
+    so a value read before a write can be discarded if set after it.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.generation = 0
+        self._entries: collections.OrderedDict[str, tuple[float, dict]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: str) -> Union[dict, None]:
+        """Get a copy of the value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: dict, generation: int) -> None:
+        """Set a copy of the value, unless the cache was cleared since `generation`."""
+        if generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove everything."""
+        self._entries.clear()
+        self.generation += 1
+
+
+def _find_one_cache_key(query: dict, no_id: bool, kwargs: dict[str, Any]) -> str:
+    """Make a key for the `find_one` call, insensitive to top-level key order.
+
+    Nested values keep their order, since mongo compares embedded docs in order.
+    """
+    projection = kwargs.get("projection")
+    if isinstance(projection, Mapping):
+        projection = sorted(projection.items())
+    elif projection is not None:
+        projection = sorted(projection)
+    return json.dumps(
+        [
+            sorted(query.items()),
+            projection,
+            no_id,
+            sorted((k, v) for k, v in kwargs.items() if k != "projection"),
+        ],
+        default=repr,  # ex: ObjectId, datetime
+    )
+
+
+class _CursorTimer:
+    """An async iterator over the cursor, totaling the time spent waiting on it."""
+
+    def __init__(self, cursor: AsyncIterable[dict], seconds: float = 0.0) -> None:
+        self._iterator = aiter(cursor)
+        self.seconds = seconds
+
+    def __aiter__(self) -> "_CursorTimer":
+        return self
+
+    async def __anext__(self) -> dict:
+        start = time.perf_counter()
+        try:
+            return await anext(self._iterator)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+@functools.lru_cache(maxsize=32)
+def _validator_from_json(schema_json: str) -> "jsonschema.protocols.Validator":
+    return _compile_validator(json.loads(schema_json))
+
+
+def _find_invalid_docs(schema_json: str, docs: list[dict], offset: int) -> list[int]:
+    """Get the indexes (plus `offset`) of the docs that are invalid for the schema.
+
+    Module-level & json-based, so it can be run in a thread *or* process pool.
+    """
+    validator = _validator_from_json(schema_json)
+    return [
+        i
+        for i, doc in enumerate(docs, start=offset)
+        if _has_dotted_keys(doc) or not validator.is_valid(doc)
+    ]
+
+
+def _projection_without_id(
+    projection: Union[Mapping[str, Any], list, None],
+) -> Union[Mapping[str, Any], list]:
+    """Get the projection, augmented to also exclude "_id".
+
+    An empty projection means every field, so it becomes `{"_id": False}`.
+    One only mentioning "_id" is returned as-is since excluding "_id" would
+    change its meaning (the caller still pops "_id").
+    """
+    if not projection:
+        return {"_id": False}
+    if isinstance(projection, Mapping):
+        fields = {k: v for k, v in projection.items() if k != "_id"}
+    else:
+        fields = dict.fromkeys((k for k in projection if k != "_id"), True)
+    if not fields:
+        return projection
+    return fields | {"_id": False}
+
+
+def _pipeline_without_id(pipeline: list[dict]) -> list[dict]:
+    """Get a copy of the pipeline with a final stage excluding "_id".
+
+    Pipelines ending in an output stage (`$out`/`$merge`) are returned as-is.
+    """
+    if pipeline and pipeline[-1].keys() & {"$out", "$merge"}:
+        return pipeline
+    return [*pipeline, {"$project": {"_id": False}}]
+
+
+def _pipeline_limited_to_one(pipeline: list[dict]) -> list[dict]:
+    """Get a copy of the pipeline limited to one doc, replacing a trailing `$limit` (if any)."""
+    if pipeline and "$limit" in pipeline[-1]:
+        return [*pipeline[:-1], {"$limit": 1}]
+    return [*pipeline, {"$limit": 1}]
+
+
+def _build_pipeline(
+    pipeline: Union[list[dict], PrecompiledPipeline],
+    no_id: bool,
+    limit_one: bool = False,
+) -> list[dict]:
+    """Get a new pipeline (never the caller's list) with the extra stage(s) added."""
+    if isinstance(pipeline, PrecompiledPipeline):
+        return pipeline.build(no_id, limit_one)
+    if limit_one:
+        pipeline = _pipeline_limited_to_one(pipeline)
+    if no_id:
+        pipeline = _pipeline_without_id(pipeline)
+    return list(pipeline)
+
+
+def _range_partitions(key: str, split_points: Sequence[Any]) -> list[dict]:
+    """Get queries for the (half-open) ranges between the split points, plus either end.
+
+    The first range is "not >= the first split point", rather than "<", so it
+    also matches docs with the key missing, null, or of another BSON type
+    (mongo only compares values of the same type) -- so none are lost.
+    """
+    if not split_points:
+        return [{}]
+    bounds = [*split_points, None]
+    partitions: list[dict] = [{key: {"$not": {"$gte": split_points[0]}}}]
+    for lower, upper in zip(bounds, bounds[1:]):
+        condition = {"$gte": lower}
+        if upper is not None:
+            condition["$lt"] = upper
+        partitions.append({key: condition})
+    return partitions
+
+
+def _interpolate_split_points(low: Any, high: Any, n_partitions: int) -> list[Any]:
+    """Get `n_partitions` - 1 evenly-spaced values in (low, high].
+
+    Supports `ObjectId` (by generation time), `datetime`, and numbers.
+    """
+    to_value: Callable[[float], Any]
+    if isinstance(low, ObjectId) and isinstance(high, ObjectId):
+        start, stop = low.generation_time.timestamp(), high.generation_time.timestamp()
+        to_value = lambda x: ObjectId.from_datetime(  # noqa: E731
+            dt.datetime.fromtimestamp(x, dt.timezone.utc)
+        )
+    elif isinstance(low, dt.datetime) and isinstance(high, dt.datetime):
+        start, stop = low.timestamp(), high.timestamp()
+        to_value = lambda x: dt.datetime.fromtimestamp(x, low.tzinfo)  # noqa: E731
+    elif all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in (low, high)
+    ):
+        start, stop = low, high
+        to_value = int if isinstance(low, int) and isinstance(high, int) else float
+    else:
+        raise TypeError(
+            f"cannot interpolate split points between {low!r} and {high!r}, "
+            f"pass 'split_points' instead"
+        )
+
+    points = (
+        to_value(start + (stop - start) * i / n_partitions)
+        for i in range(1, n_partitions)
+    )
+    # drop any duplicates (ex: ints close together)
+    return list(dict.fromkeys(p for p in points if low < p <= high))
+
+
+def _get_dotted(doc: dict, dotted_key: str) -> Any:
+    """Get the value at the (dotted) key."""
+    for key in dotted_key.split("."):
+        doc = doc[key]
+    return doc
+
+
+_LOGICAL_OPERATORS = frozenset(["$and", "$or", "$nor"])
+
+# query operators that match exact value(s) -- the "equality" keys of an index
+_EQUALITY_OPERATORS = frozenset(["$eq", "$in", "$all", "$elemMatch"])
+
+
+def _query_shape(query: dict) -> dict:
+    """Replace each value in the query with "?", keeping its fields & operators."""
+    shape: dict = {}
+    for key, value in query.items():
+        if key in _LOGICAL_OPERATORS and isinstance(value, list):
+            shape[key] = [
+                _query_shape(c) if isinstance(c, dict) else "?" for c in value
+            ]
+        elif (
+            isinstance(value, dict) and value and all(k.startswith("$") for k in value)
+        ):
+            shape[key] = {
+                op: (
+                    _query_shape(v)
+                    if op in ("$elemMatch", "$not") and isinstance(v, dict)
+                    else "?"
+                )
+                for op, v in value.items()
+            }
+        else:
+            shape[key] = "?"
+    return shape
+
+
+def _sort_shape(sort: Any) -> list[list]:
+    """Normalize a sort (a key, a list of keys/pairs, or a mapping) to [key, direction] pairs."""
+    if not sort:
+        return []
+    elif isinstance(sort, str):
+        return [[sort, 1]]
+    elif isinstance(sort, Mapping):
+        return [[k, d] for k, d in sort.items()]
+    return [[s, 1] if isinstance(s, str) else [s[0], s[1]] for s in sort]
+
+
+def _pipeline_query(pipeline: list[dict]) -> tuple[dict, Any]:
+    """Get the query & sort of the leading `$match` & `$sort` stages--what an index can serve."""
+    matches = []
+    sort = None
+    for stage in pipeline:
+        if "$match" in stage:
+            matches.append(stage["$match"])
+            continue
+        if "$sort" in stage:
+            sort = stage["$sort"]
+        break
+    if len(matches) == 1:
+        return matches[0], sort
+    return ({"$and": matches} if matches else {}), sort
+
+
+def _classify_query_fields(
+    shape: dict,
+    equality: set[str],
+    ranges: set[str],
+    notes: list[str],
+) -> None:
+    """Sort the query shape's fields into equality vs range matches, noting the rest."""
+    for key, value in shape.items():
+        if key == "$and":
+            for clause in value:
+                if isinstance(clause, dict):
+                    _classify_query_fields(clause, equality, ranges, notes)
+        elif key in _LOGICAL_OPERATORS:
+            notes.append(
+                f"'{key}' clauses are not included -- each needs its own index"
+            )
+        elif key.startswith("$"):
+            notes.append(f"'{key}' is not included -- it can't use an index's keys")
+        elif value == "?" or set(value) <= _EQUALITY_OPERATORS:
+            equality.add(key)
+        else:
+            ranges.add(key)
+
+
+def _recommend_index_keys(
+    shape: dict,
+    sort_shape: list[list],
+    path_index: "_SchemaPathIndex",
+) -> tuple[list[tuple[str, Any]], list[str], bool]:
+    """Suggest an index's keys for the query shape, in equality-sort-range order.
+
+    Also, return notes on anything left out or suspect, and whether the
+    "_id" index already serves the shape (an "_id" equality, or only "_id").
+    """
+    equality: set[str] = set()
+    ranges: set[str] = set()
+    notes: list[str] = []
+    _classify_query_fields(shape, equality, ranges, notes)
+
+    keys: list[tuple[str, Any]] = [(f, 1) for f in sorted(equality)]
+    for field, direction in sort_shape:
+        if field in equality:
+            continue  # matches one value, so it's already in order
+        if direction not in (1, -1):
+            notes.append(f"sort on '{field}' is not included -- not by value")
+            break  # the rest of the sort can't use the index's order
+        keys.append((field, direction))
+    keys.extend((f, 1) for f in sorted(ranges - {k for k, _ in keys}))
+
+    by_id = "_id" in equality or [f for f, _ in keys] == ["_id"]
+    return _schema_checked_index_keys(keys, path_index, notes), notes, by_id
+
+
+def _schema_checked_index_keys(
+    keys: list[tuple[str, Any]],
+    path_index: "_SchemaPathIndex",
+    notes: list[str],
+) -> list[tuple[str, Any]]:
+    """Note the keys not in the schema, and drop all but the first array field.
+
+    Mongo can't index more than one array field in a compound index.
+    """
+    checked = []
+    array_field = None
+    for field, direction in keys:
+        if field != "_id" and path_index.get(field) is None:
+            notes.append(f"'{field}' is not in the schema")
+        if _is_multikey(field, path_index):
+            if array_field is not None:
+                notes.append(
+                    f"'{field}' is not included -- "
+                    f"only one array field per index (already '{array_field}')"
+                )
+                continue
+            array_field = field
+        checked.append((field, direction))
+    return checked
+
+
+def _is_multikey(field: str, path_index: "_SchemaPathIndex") -> bool:
+    """Is the (dotted) field, or any field it's nested in, an array per the schema?"""
+    parts = field.split(".")
+    for i in range(1, len(parts) + 1):
+        schema = path_index.get(".".join(parts[:i]))
+        if schema is not None and _is_array_schema(schema):
+            return True
+    return False
+
+
+def _merge_index_prefixes(
+    recommendations: list[IndexRecommendation],
+) -> list[IndexRecommendation]:
+    """Fold each recommendation into a longer one that it's a prefix of, if any."""
+    merged: list[IndexRecommendation] = []
+    for rec in sorted(recommendations, key=lambda r: len(r.keys), reverse=True):
+        for longer in merged:
+            if longer.keys[: len(rec.keys)] == rec.keys:
+                longer.shapes.extend(rec.shapes)
+                longer.notes.extend(n for n in rec.notes if n not in longer.notes)
+                break
+        else:
+            merged.append(rec)
+    return merged
+
+
+def _pushed_values(value: Any) -> list:
+    """Get the values a `$push`/`$addToSet` adds, unwrapping an `$each` modifier."""
+    if isinstance(value, dict) and "$each" in value:
+        return list(value["$each"])
+    return [value]
+
+
 def _has_dotted_keys(dicto: dict[str, Any]) -> bool:
     return any("." in k for k in dicto.keys())
 
@@ -331,7 +1828,9 @@ def _convert_mongo_to_jsonschema(
 ) -> tuple[dict, dict]:
     """Converts a mongo-style dotted dict to a nested dict with an augmented schema.
 
-    NOTE: Does not support array/list dot-indexing
+    Array dot-indexing (ex: "runs.0.status") is supported, for arrays with a
+    single `items` schema, as are positional operators (ex: "runs.$.status").
+    See `_SchemaPathIndex`.
 
     Example:
         in:
@@ -376,7 +1875,9 @@ def _convert_mongo_to_jsonschema(
             }
     """
     if allow_partial_update:
-        return _adapt_schema_for_partial_updating(mongo_dict, full_jsonschema)
+        path_index = _SchemaPathIndex(full_jsonschema)
+        instance, parent_paths = path_index.nest(mongo_dict)
+        return instance, path_index.adapt(parent_paths)
     else:
         # no partial & yes dots -> error
         if _has_dotted_keys(mongo_dict):
@@ -386,37 +1887,138 @@ def _convert_mongo_to_jsonschema(
             return mongo_dict, full_jsonschema
 
 
-def _adapt_schema_for_partial_updating(
-    mongo_dict: dict,
-    full_jsonschema: dict,
-) -> tuple[dict, dict]:
-    adapted_schema = copy.deepcopy(full_jsonschema)
-    adapted_schema["required"] = []
-
-    # yes partial but no dots -> quick exit
-    if not _has_dotted_keys(mongo_dict):
-        return mongo_dict, adapted_schema
-
-    # https://stackoverflow.com/a/75734554/13156561 (looping logic)
-    out_dict = {}  # type: ignore
-    for og_key, value in mongo_dict.items():
-        if "." not in og_key:
-            out_dict[og_key] = value
-            continue
-        else:
-            # (re)set cursors to root
+# an array's 'items', in a `_SchemaPathIndex` path -- ex: "runs.0.status" -> ("runs", "[]", "status")
+_ITEMS = "[]"
+
+# array constraints that don't apply to a partial update of some of its items
+_ARRAY_SIZE_KEYWORDS = frozenset(
+    ["minItems", "maxItems", "uniqueItems", "contains", "minContains", "maxContains"]
+)
+
+
+class _ArrayItems(dict):
+    """A placeholder for an array, while nesting dotted keys: items by index."""
+
+
+class _SchemaPathIndex:
+    """An index of a schema's (nested) fields by path, built once per schema.
+
+    Paths are tuples of keys, following 'properties' & (single-schema) array
+    'items'--array indexes and positional operators (ex: "0", "$", "$[]")
+    are all `_ITEMS`. Other keywords (ex: '$ref', 'anyOf') are not followed.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        self.schemas: dict[tuple[str, ...], dict] = {}
+        stack: list[tuple[tuple[str, ...], dict]] = [((), schema)]
+        while stack:
+            path, subschema = stack.pop()
+            self.schemas[path] = subschema
+            for key, prop in subschema.get("properties", {}).items():
+                if isinstance(prop, dict):
+                    stack.append(((*path, key), prop))
+            if isinstance(subschema.get("items"), dict):
+                stack.append(((*path, _ITEMS), subschema["items"]))
+
+    def _child_path(self, path: tuple[str, ...], key: str) -> tuple[str, ...]:
+        """Get the path to the key's field, under the field at `path`."""
+        parent = self.schemas.get(path)
+        if parent is not None and _is_array_schema(parent) and _is_array_index(key):
+            return (*path, _ITEMS)
+        return (*path, key)
+
+    def get(self, dotted_key: str) -> Union[dict, None]:
+        """Get the (sub)schema of a (dotted) field, or None if it's not indexed.
+
+        An empty key is the root.
+        """
+        path: tuple[str, ...] = ()
+        for key in dotted_key.split(".") if dotted_key else []:
+            path = self._child_path(path, key)
+        return self.schemas.get(path)
+
+    def nest(self, mongo_dict: dict) -> tuple[dict, frozenset[tuple[str, ...]]]:
+        """Convert a mongo-style dotted dict to a nested dict, in one pass.
+
+        Array-indexed keys become lists (of only the items being set). Also,
+        return the path of each dotted key's parent, ex: 'a.b.c' -> ('a', 'b').
+        """
+        # no dots -> quick exit
+        if not _has_dotted_keys(mongo_dict):
+            return mongo_dict, frozenset()
+
+        out_dict: dict = {}
+        parent_paths = set()
+        arrays: list[tuple[dict, str]] = []  # (container, key) -- parents first
+        for og_key, value in mongo_dict.items():
+            if "." not in og_key:
+                out_dict[og_key] = value
+                continue
+            keys = og_key.split(".")
+            # walk & attach keys -- each container's type depends on the next key
             cursor = out_dict
-            schema_props_cursor = adapted_schema["properties"]
-            # iterate & attach keys
-            *parent_keys, leaf_key = og_key.split(".")
-            for k in parent_keys:
-                cursor = cursor.setdefault(k, {})
-                # mark nested object 'required' as none
-                if schema_props_cursor:
-                    # ^^^ falsy when not "in" a properties obj, ex: parent only has 'additionalProperties'
-                    schema_props_cursor[k]["required"] = []
-                    schema_props_cursor = schema_props_cursor[k].get("properties")
+            path: tuple[str, ...] = ()
+            for key, next_key in zip(keys, keys[1:]):
+                path = self._child_path(path, key)
+                if key not in cursor:
+                    if self._child_path(path, next_key)[-1] == _ITEMS:
+                        cursor[key] = _ArrayItems()
+                        arrays.append((cursor, key))
+                    else:
+                        cursor[key] = {}
+                cursor = cursor[key]
             # place value
-            cursor[leaf_key] = value
+            cursor[keys[-1]] = value
+            parent_paths.add(path)
+
+        # children first, so each is converted before its parent is
+        for container, key in reversed(arrays):
+            container[key] = list(container[key].values())
+        return out_dict, frozenset(parent_paths)
 
-    return out_dict, adapted_schema
+    def adapt(self, parent_paths: frozenset[tuple[str, ...]]) -> dict:
+        """Copy the schema, relaxing it at the root and along each parent path.
+
+        'required' is cleared, and so are array-size constraints. Only the
+        subschemas along the paths are (shallow) copied, the rest is shared.
+        """
+        adapted: dict[tuple[str, ...], dict] = {(): _relaxed_schema(self.schemas[()])}
+        for path in parent_paths:
+            for i in range(1, len(path) + 1):
+                subpath = path[:i]
+                if subpath in adapted:
+                    continue
+                if subpath not in self.schemas:
+                    # ex: parent only has 'additionalProperties' -- nothing to relax
+                    break
+                subschema = _relaxed_schema(self.schemas[subpath])
+                parent = adapted[subpath[:-1]]
+                if subpath[-1] == _ITEMS:
+                    parent["items"] = subschema
+                else:
+                    parent["properties"][subpath[-1]] = subschema
+                adapted[subpath] = subschema
+        return adapted[()]
+
+
+def _relaxed_schema(schema: dict) -> dict:
+    """Get a shallow copy of the (sub)schema without 'required' or array-size constraints."""
+    relaxed = {k: v for k, v in schema.items() if k not in _ARRAY_SIZE_KEYWORDS}
+    relaxed["required"] = []
+    if "properties" in relaxed:
+        relaxed["properties"] = dict(
+            relaxed["properties"]
+        )  # its children may be replaced
+    return relaxed
+
+
+def _is_array_schema(schema: dict) -> bool:
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        return "array" in schema_type
+    return schema_type == "array" or "items" in schema
+
+
+def _is_array_index(key: str) -> bool:
+    """Is the key an array index, or a positional operator (ex: "$", "$[]", "$[elem]")?"""
+    return key.isdigit() or key == "$" or (key.startswith("$[") and key.endswith("]"))
@@ -0,0 +1,279 @@
+"""Tools for dumping & restoring validated mongo collections as NDJSON.
+
+NDJSON is newline-delimited JSON: one document per line. Documents are
+(de)serialized with `bson.json_util` (relaxed mode), so types like
+`datetime` & `ObjectId` survive the round trip. Files ending in ".gz" are
+gzip-(de)compressed.
+
+Both directions stream, so memory is constant regardless of the
+collection's size. Progress & throughput are logged periodically.
+
+Also, a command-line entry point:
+
+    python -m wipac_dev_tools.mongo_ndjson_tools export --help
+    python -m wipac_dev_tools.mongo_ndjson_tools import --help
+"""
+
+import argparse
+import asyncio
+import gzip
+import inspect
+import json
+import logging
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, Mapping, Union
+
+from .mongo_jsonschema_tools import (
+    _IS_MOTOR_IMPORTED,
+    MongoJSONSchemaValidatedCollection,
+)
+from .timing_tools import IntervalTimer
+
+# mongo imports
+try:
+    from bson import json_util
+except (ImportError, ModuleNotFoundError) as _exc:
+    raise ImportError(
+        "the 'mongo' option must be installed in order to use 'mongo_ndjson_tools'"
+    ) from _exc
+
+
+LOGGER = logging.getLogger(__name__)
+
+_JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS
+
+
+class _Progress:
+    """Periodically log the running count & throughput."""
+
+    def __init__(self, verb: str, seconds: float, logger: logging.Logger) -> None:
+        self.verb = verb
+        self.logger = logger
+        self.count = 0
+        self._start = time.monotonic()
+        self._timer = IntervalTimer(seconds, None)
+
+    def add(self, n: int) -> None:
+        """Add to the count, logging if the interval has elapsed."""
+        self.count += n
+        if self._timer.has_interval_elapsed():
+            self.log()
+
+    def log(self) -> None:
+        """Log the count & throughput so far."""
+        elapsed = time.monotonic() - self._start
+        self.logger.info(
+            "%s %s docs in %.1fs (%.0f docs/s)",
+            self.verb,
+            self.count,
+            elapsed,
+            self.count / elapsed if elapsed else 0.0,
+        )
+
+
+def _open(path: Path, mode: str, compress: Union[bool, None]) -> IO[str]:
+    """Open the text file, gzip'd if `compress` (or if None, if it ends in '.gz')."""
+    if compress is None:
+        compress = path.suffix == ".gz"
+    if compress:
+        return gzip.open(path, f"{mode}t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+async def export_ndjson(
+    coll: MongoJSONSchemaValidatedCollection,
+    path: Union[str, Path],
+    query: Union[dict, None] = None,
+    projection: Union[list, Mapping[str, Any], None] = None,
+    batch_size: int = 1_000,
+    no_id: bool = True,
+    compress: Union[bool, None] = None,
+    progress_seconds: float = 10.0,
+) -> int:
+    """Write each doc matching the query to the NDJSON file, one line each.
+
+    Docs are fetched in batches of `batch_size`, via `find_all_batches`.
+    Use `no_id=False` to keep "_id" (ex: for a faithful restore).
+
+    Returns the number of docs written.
+    """
+    progress = _Progress("exported", progress_seconds, LOGGER)
+    with _open(Path(path), "w", compress) as f:
+        async for batch in coll.find_all_batches(
+            query or {}, projection or {}, batch_size=batch_size, no_id=no_id
+        ):
+            f.writelines(
+                json_util.dumps(doc, json_options=_JSON_OPTIONS) + "\n" for doc in batch
+            )
+            progress.add(len(batch))
+    progress.log()
+    return progress.count
+
+
+def _iter_ndjson(f: IO[str], progress: _Progress) -> Iterator[dict]:
+    """Yield each doc in the NDJSON file, skipping blank lines."""
+    for i, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            doc = json_util.loads(line, json_options=_JSON_OPTIONS)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON on line {i}: {e}") from e
+        progress.add(1)
+        yield doc
+
+
+async def import_ndjson(
+    coll: MongoJSONSchemaValidatedCollection,
+    path: Union[str, Path],
+    chunk_size: int = 1_000,
+    max_in_flight: int = 4,
+    compress: Union[bool, None] = None,
+    progress_seconds: float = 10.0,
+) -> int:
+    """Validate & insert each doc in the NDJSON file, via `insert_many_chunked`.
+
+    The file is read only as fast as the chunks are inserted. Chunks are
+    independent writes: if one fails validation (or insertion), the ones
+    before it remain inserted.
+
+    Returns the number of docs inserted.
+    """
+    progress = _Progress("read", progress_seconds, LOGGER)
+    with _open(Path(path), "r", compress) as f:
+        n_inserted = await coll.insert_many_chunked(
+            _iter_ndjson(f, progress),
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+        )
+    progress.log()
+    LOGGER.info("imported %s docs", n_inserted)
+    return n_inserted
+
+
+########################################################################################
+# command-line
+
+
+def _open_collection(
+    args: argparse.Namespace,
+) -> tuple[Any, MongoJSONSchemaValidatedCollection]:
+    """Connect to the collection, wrapped with the schema -- also return the client."""
+    with open(args.schema, encoding="utf-8") as f:
+        schema = json.load(f)
+
+    # FUTURE DEV: once motor is deprecated, we can remove this
+    if _IS_MOTOR_IMPORTED:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client: Any = AsyncIOMotorClient(args.mongo_url)
+    else:
+        from pymongo import AsyncMongoClient
+
+        client = AsyncMongoClient(args.mongo_url)
+
+    return client, MongoJSONSchemaValidatedCollection(
+        client[args.database][args.collection],
+        schema,
+        parent_logger=LOGGER,
+    )
+
+
+async def _close_client(client: Any) -> None:
+    """Close the client -- pymongo's async client closes async, motor's doesn't."""
+    res = client.close()
+    if inspect.isawaitable(res):
+        await res
+
+
+def _json_query(value: str) -> dict:
+    """Parse the query like the NDJSON, so it can use extended json (ex: '$date')."""
+    return json_util.loads(value, json_options=_JSON_OPTIONS)  # type: ignore[no-any-return]
+
+
+def _parse_args(argv: Union[list[str], None] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export/import a jsonschema-validated mongo collection as NDJSON "
+        "(gzip'd if the file ends in '.gz')",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("path", type=Path, help="the NDJSON file")
+    common.add_argument("--mongo-url", required=True, help="ex: mongodb://host:27017")
+    common.add_argument("--database", required=True)
+    common.add_argument("--collection", required=True)
+    common.add_argument(
+        "--schema",
+        required=True,
+        type=Path,
+        help="the collection's jsonschema (a json file)",
+    )
+    common.add_argument(
+        "--progress-seconds",
+        type=float,
+        default=10.0,
+        help="how often to log progress",
+    )
+
+    export = subparsers.add_parser(
+        "export", parents=[common], help="stream the collection to a file"
+    )
+    export.add_argument(
+        "--query",
+        type=_json_query,
+        default={},
+        help="a json query to filter by (extended json, ex: '$date', is ok)",
+    )
+    export.add_argument("--batch-size", type=int, default=1_000)
+    export.add_argument(
+        "--keep-id",
+        action="store_true",
+        help="include each doc's '_id' (excluded by default)",
+    )
+
+    import_ = subparsers.add_parser(
+        "import", parents=[common], help="stream a file into the collection"
+    )
+    import_.add_argument("--chunk-size", type=int, default=1_000)
+    import_.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="the max number of chunks being inserted concurrently",
+    )
+
+    return parser.parse_args(argv)
+
+
+async def main(argv: Union[list[str], None] = None) -> int:
+    """Run the command; return the number of docs exported/imported."""
+    args = _parse_args(argv)
+    client, coll = _open_collection(args)
+
+    try:
+        if args.command == "export":
+            return await export_ndjson(
+                coll,
+                args.path,
+                query=args.query,
+                batch_size=args.batch_size,
+                no_id=not args.keep_id,
+                progress_seconds=args.progress_seconds,
+            )
+        else:
+            return await import_ndjson(
+                coll,
+                args.path,
+                chunk_size=args.chunk_size,
+                max_in_flight=args.max_in_flight,
+                progress_seconds=args.progress_seconds,
+            )
+    finally:
+        await _close_client(client)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())